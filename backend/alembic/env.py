@@ -9,15 +9,20 @@ from alembic import context
 
 # Import the Base and all models
 from app.database import Base
-from app.models import User, Task  # noqa: F401
+from app.models import User, Task, ShardAssignment  # noqa: F401
 from app.config import settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url with the one from settings
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# Override sqlalchemy.url with the one from settings. Shards are migrated one
+# at a time with: alembic -x shard=<name> upgrade head
+shard = context.get_x_argument(as_dictionary=True).get("shard", "default")
+if shard == "default":
+    config.set_main_option("sqlalchemy.url", settings.database_url)
+else:
+    config.set_main_option("sqlalchemy.url", settings.shard_urls_map[shard])
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,33 @@
+"""Add shard assignments table
+
+Revision ID: 5c1e7a9d2b40
+Revises: bf8ec1b3afed
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9d2b40'
+down_revision: Union[str, None] = 'bf8ec1b3afed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('shard_assignments',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(length=50), nullable=False),
+    sa.Column('moving', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('shard_assignments')
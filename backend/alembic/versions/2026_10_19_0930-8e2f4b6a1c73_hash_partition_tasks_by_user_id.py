@@ -0,0 +1,116 @@
+"""Hash partition tasks by user_id
+
+Revision ID: 8e2f4b6a1c73
+Revises: 5c1e7a9d2b40
+Create Date: 2026-10-19 09:30:00.000000
+
+Converts ``tasks`` into a PostgreSQL table partitioned by HASH (user_id).
+The primary key becomes (id, user_id) because it must contain the partition
+key, and the id/user_id indexes are created on the parent so every
+partition gets its own local index. The number of partitions defaults to 16
+and can be changed with ``alembic -x tasks_partitions=N upgrade head``.
+
+Rows are copied into the new table inside the migration transaction, which
+holds an exclusive lock on ``tasks`` for the duration of the copy.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f4b6a1c73'
+down_revision: Union[str, None] = '5c1e7a9d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_PARTITIONS = 16
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if not _is_postgresql():
+        return
+
+    partitions = int(
+        context.get_x_argument(as_dictionary=True).get(
+            "tasks_partitions", DEFAULT_PARTITIONS
+        )
+    )
+
+    # Detach the old heap, keeping its sequence alive for the new table
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_unpartitioned")
+    op.execute("ALTER TABLE tasks_unpartitioned RENAME CONSTRAINT tasks_pkey TO tasks_unpartitioned_pkey")
+    op.execute("DROP INDEX ix_tasks_id")
+    op.execute("DROP INDEX ix_tasks_user_id")
+
+    op.execute(
+        """
+        CREATE TABLE tasks (
+            id INTEGER NOT NULL DEFAULT nextval('tasks_id_seq'),
+            title VARCHAR(200) NOT NULL,
+            description TEXT,
+            completed BOOLEAN NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT tasks_pkey PRIMARY KEY (id, user_id)
+        ) PARTITION BY HASH (user_id)
+        """
+    )
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE tasks_p{remainder} PARTITION OF tasks "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    op.execute("CREATE INDEX ix_tasks_id ON tasks (id)")
+    op.execute("CREATE INDEX ix_tasks_user_id ON tasks (user_id)")
+
+    op.execute(
+        "INSERT INTO tasks (id, title, description, completed, user_id, created_at, updated_at) "
+        "SELECT id, title, description, completed, user_id, created_at, updated_at "
+        "FROM tasks_unpartitioned"
+    )
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("DROP TABLE tasks_unpartitioned")
+
+
+def downgrade() -> None:
+    if not _is_postgresql():
+        return
+
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_partitioned")
+    op.execute("ALTER TABLE tasks_partitioned RENAME CONSTRAINT tasks_pkey TO tasks_partitioned_pkey")
+    op.execute("DROP INDEX ix_tasks_id")
+    op.execute("DROP INDEX ix_tasks_user_id")
+
+    op.execute(
+        """
+        CREATE TABLE tasks (
+            id INTEGER NOT NULL DEFAULT nextval('tasks_id_seq'),
+            title VARCHAR(200) NOT NULL,
+            description TEXT,
+            completed BOOLEAN NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT tasks_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("CREATE INDEX ix_tasks_id ON tasks (id)")
+    op.execute("CREATE INDEX ix_tasks_user_id ON tasks (user_id)")
+
+    op.execute(
+        "INSERT INTO tasks (id, title, description, completed, user_id, created_at, updated_at) "
+        "SELECT id, title, description, completed, user_id, created_at, updated_at "
+        "FROM tasks_partitioned"
+    )
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("DROP TABLE tasks_partitioned")
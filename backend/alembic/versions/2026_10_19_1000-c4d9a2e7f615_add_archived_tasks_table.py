@@ -0,0 +1,38 @@
+"""Add archived tasks table
+
+Revision ID: c4d9a2e7f615
+Revises: 8e2f4b6a1c73
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d9a2e7f615'
+down_revision: Union[str, None] = '8e2f4b6a1c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('archived_tasks',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'id')
+    )
+    op.create_index('ix_tasks_completed_updated_at', 'tasks', ['updated_at'], unique=False, postgresql_where=sa.text('completed IS true'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_completed_updated_at', table_name='tasks', postgresql_where=sa.text('completed IS true'))
+    op.drop_table('archived_tasks')
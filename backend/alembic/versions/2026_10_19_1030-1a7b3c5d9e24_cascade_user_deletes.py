@@ -0,0 +1,38 @@
+"""Cascade user deletes and track deletion requests
+
+Revision ID: 1a7b3c5d9e24
+Revises: c4d9a2e7f615
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a7b3c5d9e24'
+down_revision: Union[str, None] = 'c4d9a2e7f615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+USER_FOREIGN_KEYS = [
+    ('tasks_user_id_fkey', 'tasks'),
+    ('archived_tasks_user_id_fkey', 'archived_tasks'),
+    ('shard_assignments_user_id_fkey', 'shard_assignments'),
+]
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('deletion_requested_at', sa.DateTime(), nullable=True))
+    for name, table in USER_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    for name, table in USER_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, 'users', ['user_id'], ['id'])
+    op.drop_column('users', 'deletion_requested_at')
@@ -0,0 +1,32 @@
+"""Add task order key
+
+Revision ID: 3d8b5f2a7e61
+Revises: 9f3e6d1b8a52
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8b5f2a7e61'
+down_revision: Union[str, None] = '9f3e6d1b8a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('order_key', sa.String(length=255, collation='C'), nullable=True))
+    # Existing tasks keep their ID order: the zero-padded hex ID plus a
+    # non-zero final digit is a valid base-36 order key
+    op.execute("UPDATE tasks SET order_key = lpad(to_hex(id), 8, '0') || 'i'")
+    op.alter_column('tasks', 'order_key', existing_type=sa.String(length=255, collation='C'), nullable=False)
+    op.create_index('ix_tasks_user_id_order_key', 'tasks', ['user_id', 'order_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_id_order_key', table_name='tasks')
+    op.drop_column('tasks', 'order_key')
@@ -0,0 +1,34 @@
+"""Add task parent id
+
+Revision ID: 7b2e9c4f1d36
+Revises: 3d8b5f2a7e61
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9c4f1d36'
+down_revision: Union[str, None] = '3d8b5f2a7e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_index('ix_tasks_user_id_parent_id', 'tasks', ['user_id', 'parent_id'], unique=False)
+    op.create_foreign_key(
+        'tasks_parent_id_user_id_fkey', 'tasks', 'tasks',
+        ['parent_id', 'user_id'], ['id', 'user_id'],
+        ondelete='CASCADE', deferrable=True, initially='DEFERRED',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('tasks_parent_id_user_id_fkey', 'tasks', type_='foreignkey')
+    op.drop_index('ix_tasks_user_id_parent_id', table_name='tasks')
+    op.drop_column('tasks', 'parent_id')
@@ -0,0 +1,44 @@
+"""Add tags
+
+Revision ID: e5a1c8d3b947
+Revises: 7b2e9c4f1d36
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c8d3b947'
+down_revision: Union[str, None] = '7b2e9c4f1d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'name', name='uq_tags_user_id_name')
+    )
+    op.create_table('task_tags',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['task_id', 'user_id'], ['tasks.id', 'tasks.user_id'], name='task_tags_task_id_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'task_id', 'tag_id')
+    )
+    op.create_index('ix_task_tags_user_id_tag_id_task_id', 'task_tags', ['user_id', 'tag_id', 'task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_tags_user_id_tag_id_task_id', table_name='task_tags')
+    op.drop_table('task_tags')
+    op.drop_table('tags')
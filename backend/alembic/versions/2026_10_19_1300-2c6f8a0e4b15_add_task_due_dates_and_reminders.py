@@ -0,0 +1,34 @@
+"""Add task due dates and reminders
+
+Revision ID: 2c6f8a0e4b15
+Revises: e5a1c8d3b947
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c6f8a0e4b15'
+down_revision: Union[str, None] = 'e5a1c8d3b947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('due_at', sa.DateTime(), nullable=True))
+    op.add_column('tasks', sa.Column('remind_at', sa.DateTime(), nullable=True))
+    op.add_column('tasks', sa.Column('reminded_at', sa.DateTime(), nullable=True))
+    op.add_column('tasks', sa.Column('reminder_claimed_until', sa.DateTime(), nullable=True))
+    op.create_index('ix_tasks_remind_at_pending', 'tasks', ['remind_at'], unique=False, postgresql_where=sa.text('remind_at IS NOT NULL AND reminded_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_remind_at_pending', table_name='tasks', postgresql_where=sa.text('remind_at IS NOT NULL AND reminded_at IS NULL'))
+    op.drop_column('tasks', 'reminder_claimed_until')
+    op.drop_column('tasks', 'reminded_at')
+    op.drop_column('tasks', 'remind_at')
+    op.drop_column('tasks', 'due_at')
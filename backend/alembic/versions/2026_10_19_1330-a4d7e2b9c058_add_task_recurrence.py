@@ -0,0 +1,28 @@
+"""Add task recurrence
+
+Revision ID: a4d7e2b9c058
+Revises: 2c6f8a0e4b15
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7e2b9c058'
+down_revision: Union[str, None] = '2c6f8a0e4b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('recurrence', sa.String(length=255), nullable=True))
+    op.add_column('tasks', sa.Column('recurrence_start', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'recurrence_start')
+    op.drop_column('tasks', 'recurrence')
@@ -0,0 +1,51 @@
+"""Add shared task lists
+
+Revision ID: 6b9d3f1e7a28
+Revises: a4d7e2b9c058
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b9d3f1e7a28'
+down_revision: Union[str, None] = 'a4d7e2b9c058'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_lists',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_lists_owner_id'), 'task_lists', ['owner_id'], unique=False)
+    op.create_table('list_members',
+    sa.Column('list_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['list_id'], ['task_lists.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('list_id', 'user_id')
+    )
+    op.create_index(op.f('ix_list_members_user_id'), 'list_members', ['user_id'], unique=False)
+    op.add_column('tasks', sa.Column('list_id', sa.Integer(), nullable=True))
+    op.create_index('ix_tasks_user_id_list_id_order_key', 'tasks', ['user_id', 'list_id', 'order_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_id_list_id_order_key', table_name='tasks')
+    op.drop_column('tasks', 'list_id')
+    op.drop_index(op.f('ix_list_members_user_id'), table_name='list_members')
+    op.drop_table('list_members')
+    op.drop_index(op.f('ix_task_lists_owner_id'), table_name='task_lists')
+    op.drop_table('task_lists')
@@ -0,0 +1,70 @@
+"""Add task events table
+
+Revision ID: d3a8f6c2e914
+Revises: 6b9d3f1e7a28
+Create Date: 2026-10-19 14:30:00.000000
+
+Creates ``task_events`` as a PostgreSQL table partitioned by RANGE
+(occurred_at), with a default partition and monthly partitions for the
+current month and the next 3 months (change with
+``alembic -x history_partitions_ahead=N upgrade head``). Later partitions
+are created by ``python -m app.cli maintain-history``.
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f6c2e914'
+down_revision: Union[str, None] = '6b9d3f1e7a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_PARTITIONS_AHEAD = 3
+
+
+def _month_start(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE task_events (
+            id BIGSERIAL NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            task_id INTEGER NOT NULL,
+            actor_id INTEGER,
+            action VARCHAR(20) NOT NULL,
+            changes JSONB NOT NULL,
+            occurred_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT task_events_pkey PRIMARY KEY (id, occurred_at)
+        ) PARTITION BY RANGE (occurred_at)
+        """
+    )
+    op.execute("CREATE TABLE task_events_default PARTITION OF task_events DEFAULT")
+    months_ahead = int(
+        context.get_x_argument(as_dictionary=True).get(
+            "history_partitions_ahead", DEFAULT_PARTITIONS_AHEAD
+        )
+    )
+    today = date.today()
+    for offset in range(months_ahead + 1):
+        start = _month_start(today, offset)
+        op.execute(
+            f"CREATE TABLE task_events_y{start.year}m{start.month:02d} "
+            f"PARTITION OF task_events "
+            f"FOR VALUES FROM ('{start}') TO ('{_month_start(start, 1)}')"
+        )
+    op.execute(
+        "CREATE INDEX ix_task_events_user_id_task_id_id "
+        "ON task_events (user_id, task_id, id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE task_events")
@@ -0,0 +1,77 @@
+"""Add task stats tables
+
+Revision ID: c5f2a8d1e407
+Revises: 7e1c4b9a2f63
+Create Date: 2026-10-19 15:30:00.000000
+
+Adds ``completed_at`` to tasks and archived tasks, backfilled from
+``updated_at`` for completed rows, and creates the ``user_task_stats`` and
+``task_daily_stats`` counter tables filled from the existing rows.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f2a8d1e407'
+down_revision: Union[str, None] = '7e1c4b9a2f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE tasks SET completed_at = updated_at WHERE completed")
+    op.execute("UPDATE archived_tasks SET completed_at = updated_at")
+
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('task_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    op.execute(
+        """
+        INSERT INTO user_task_stats (user_id, total, completed, updated_at)
+        SELECT user_id, count(*), count(*) FILTER (WHERE completed), now()
+        FROM (
+            SELECT user_id, completed FROM tasks
+            UNION ALL
+            SELECT user_id, true FROM archived_tasks
+        ) AS all_tasks
+        GROUP BY user_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO task_daily_stats (user_id, day, completed)
+        SELECT user_id, completed_at::date, count(*)
+        FROM (
+            SELECT user_id, completed_at FROM tasks WHERE completed
+            UNION ALL
+            SELECT user_id, completed_at FROM archived_tasks
+        ) AS completions
+        GROUP BY user_id, completed_at::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_daily_stats')
+    op.drop_table('user_task_stats')
+    op.drop_column('archived_tasks', 'completed_at')
+    op.drop_column('tasks', 'completed_at')
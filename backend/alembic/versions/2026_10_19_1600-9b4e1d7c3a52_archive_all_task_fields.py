@@ -0,0 +1,47 @@
+"""Archive all task fields
+
+Revision ID: 9b4e1d7c3a52
+Revises: c5f2a8d1e407
+Create Date: 2026-10-19 16:00:00.000000
+
+Adds the task fields that archiving used to drop to ``archived_tasks``, so
+a restored task gets back its position, parent, list, dates, recurrence and
+tags (kept by name). Rows archived before this revision keep empty values.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e1d7c3a52'
+down_revision: Union[str, None] = 'c5f2a8d1e407'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('archived_tasks', sa.Column('order_key', sa.String(length=255), nullable=True))
+    op.add_column('archived_tasks', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('list_id', sa.Integer(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('due_at', sa.DateTime(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('recurrence', sa.String(length=255), nullable=True))
+    op.add_column('archived_tasks', sa.Column('recurrence_start', sa.DateTime(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('remind_at', sa.DateTime(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('reminded_at', sa.DateTime(), nullable=True))
+    op.add_column('archived_tasks', sa.Column('tags', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('archived_tasks', 'tags')
+    op.drop_column('archived_tasks', 'reminded_at')
+    op.drop_column('archived_tasks', 'remind_at')
+    op.drop_column('archived_tasks', 'recurrence_start')
+    op.drop_column('archived_tasks', 'recurrence')
+    op.drop_column('archived_tasks', 'due_at')
+    op.drop_column('archived_tasks', 'list_id')
+    op.drop_column('archived_tasks', 'parent_id')
+    op.drop_column('archived_tasks', 'order_key')
@@ -0,0 +1,338 @@
+"""Command-line entry point for maintenance and tooling commands.
+
+Usage:
+    python -m app.cli <command> [options]
+"""
+
+import argparse
+import csv
+import sys
+
+from app.config import settings
+from app.database import SessionLocal
+
+
+def _warn_per_process_cache() -> None:
+    """Warn that task changes made here cannot invalidate the API's memory cache."""
+    if settings.task_cache_url.startswith("memory://"):
+        print(
+            "Warning: TASK_CACHE_URL=memory:// is per process, so the API serves "
+            "lists cached before these changes until they expire "
+            f"({settings.task_cache_ttl_seconds}s); use a redis:// cache",
+            file=sys.stderr,
+        )
+
+
+def seed_command(args: argparse.Namespace) -> None:
+    """Generate a synthetic dataset and write access tokens to a CSV file."""
+    from app.services.seed import mint_tokens, seed_database
+
+    db = SessionLocal()
+    try:
+        users = seed_database(
+            db,
+            users=args.users,
+            tasks=args.tasks,
+            seed=args.seed,
+            skew=args.skew,
+            completed_ratio=args.completed_ratio,
+            batch_size=args.batch_size,
+        )
+        tokens = mint_tokens(users, args.token_minutes)
+    finally:
+        db.close()
+
+    with open(args.tokens_out, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["user_id", "username", "access_token"])
+        writer.writerows(tokens)
+
+    print(f"Seeded {len(users)} users and {args.tasks} tasks; tokens in {args.tokens_out}")
+
+
+def rebalance_shard_command(args: argparse.Namespace) -> None:
+    """Move one user's task data to another shard."""
+    from app.sharding import rebalance_user
+
+    moved = rebalance_user(
+        args.user_id, args.to, batch_size=args.batch_size, wait=not args.no_wait
+    )
+    print(f"Moved {moved} tasks of user {args.user_id} to shard '{args.to}'")
+
+
+def assign_id_ranges_command(args: argparse.Namespace) -> None:
+    """Give every shard's ID sequences a disjoint range."""
+    from app.sharding import assign_id_ranges
+
+    for name, first, last in assign_id_ranges(args.range_size):
+        print(f"Shard '{name}' hands out IDs {first}-{last}")
+
+
+def archive_tasks_command(args: argparse.Namespace) -> None:
+    """Move old completed tasks into the archive table."""
+    from datetime import timedelta
+
+    from app.services.archive import archive_completed_tasks
+    from app.sharding import get_sessionmaker
+
+    _warn_per_process_cache()
+    db = get_sessionmaker(args.shard)()
+    try:
+        archived = archive_completed_tasks(
+            db, timedelta(days=args.older_than_days), batch_size=args.batch_size
+        )
+    finally:
+        db.close()
+    print(f"Archived {archived} tasks on shard '{args.shard}'")
+
+
+def purge_deleted_accounts_command(args: argparse.Namespace) -> None:
+    """Finish deleting accounts whose deletion was requested."""
+    from app.services.accounts import pending_account_deletions, purge_user_account
+
+    db = SessionLocal()
+    try:
+        user_ids = pending_account_deletions(db)
+    finally:
+        db.close()
+
+    for user_id in user_ids:
+        purge_user_account(user_id, SessionLocal, batch_size=args.batch_size)
+    print(f"Purged {len(user_ids)} accounts")
+
+
+def purge_idempotency_keys_command(args: argparse.Namespace) -> None:
+    """Delete expired idempotency keys."""
+    from app.services.idempotency import purge_expired_keys
+    from app.sharding import get_sessionmaker
+
+    db = get_sessionmaker(args.shard)()
+    try:
+        purged = purge_expired_keys(db)
+    finally:
+        db.close()
+    print(f"Purged {purged} expired idempotency keys on shard '{args.shard}'")
+
+
+def purge_refresh_tokens_command(args: argparse.Namespace) -> None:
+    """Delete expired refresh tokens."""
+    from app.services.refresh_tokens import purge_expired_refresh_tokens
+
+    db = SessionLocal()
+    try:
+        purged = purge_expired_refresh_tokens(db)
+    finally:
+        db.close()
+    print(f"Purged {purged} expired refresh tokens")
+
+
+def rebalance_order_command(args: argparse.Namespace) -> None:
+    """Rewrite the order keys of users whose keys grew too long."""
+    from app.services.ordering import rebalance_long_keys
+    from app.sharding import get_sessionmaker
+
+    _warn_per_process_cache()
+    db = get_sessionmaker(args.shard)()
+    try:
+        rebalanced = rebalance_long_keys(db, args.max_length)
+    finally:
+        db.close()
+    print(f"Rebalanced task order of {rebalanced} users on shard '{args.shard}'")
+
+
+def dispatch_reminders_command(args: argparse.Namespace) -> None:
+    """Run the reminder dispatcher until interrupted."""
+    from app.services.reminders import create_dispatcher
+    from app.sharding import get_sessionmaker
+
+    _warn_per_process_cache()
+    dispatcher = create_dispatcher(get_sessionmaker(args.shard))
+    if args.once:
+        delivered = dispatcher.tick()
+        print(f"Delivered {delivered} reminders on shard '{args.shard}'")
+        return
+    try:
+        dispatcher.run(settings.reminder_poll_seconds)
+    except KeyboardInterrupt:
+        pass
+
+
+def maintain_history_command(args: argparse.Namespace) -> None:
+    """Create upcoming task history partitions and drop expired ones."""
+    from datetime import date
+
+    from app.services.history import maintain_partitions
+    from app.sharding import get_sessionmaker
+
+    db = get_sessionmaker(args.shard)()
+    try:
+        created, dropped = maintain_partitions(
+            db, date.today(), args.months_ahead, args.retention_months
+        )
+    finally:
+        db.close()
+    print(
+        f"Created {len(created)} and dropped {len(dropped)} history partitions "
+        f"on shard '{args.shard}'"
+    )
+
+
+def reconcile_stats_command(args: argparse.Namespace) -> None:
+    """Recompute the task counters and repair drift."""
+    from app.services.stats import reconcile_stats
+    from app.sharding import get_sessionmaker
+
+    db = get_sessionmaker(args.shard)()
+    try:
+        repaired = reconcile_stats(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Repaired the task counters of {repaired} users on shard '{args.shard}'")
+
+
+def benchmark_formats_command(args: argparse.Namespace) -> None:
+    """Compare JSON, MessagePack and CBOR on a large task list."""
+    from app.negotiation import benchmark_formats
+
+    rows = benchmark_formats(args.tasks, args.repeat)
+    print(f"{args.tasks} tasks, fastest of {args.repeat} runs")
+    print(
+        f"{'format':<22}{'bytes':>12}{'vs json':>9}"
+        f"{'encode ms':>11}{'decode ms':>11}"
+    )
+    for row in rows:
+        ratio = row["bytes"] / rows[0]["bytes"]
+        print(
+            f"{row['format']:<22}{row['bytes']:>12}{ratio:>9.2f}"
+            f"{row['encode_ms']:>11.1f}{row['decode_ms']:>11.1f}"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed = subparsers.add_parser("seed", help="Generate a synthetic load-test dataset")
+    seed.add_argument("--users", type=int, default=1000)
+    seed.add_argument("--tasks", type=int, default=100_000)
+    seed.add_argument("--seed", type=int, default=42)
+    seed.add_argument("--skew", type=float, default=1.1, help="Zipf exponent")
+    seed.add_argument("--completed-ratio", type=float, default=0.6)
+    seed.add_argument("--batch-size", type=int, default=10_000)
+    seed.add_argument(
+        "--token-minutes",
+        type=int,
+        default=settings.access_token_expire_minutes,
+        help="Lifetime of the minted access tokens",
+    )
+    seed.add_argument("--tokens-out", default="tokens.csv")
+    seed.set_defaults(handler=seed_command)
+
+    rebalance = subparsers.add_parser(
+        "rebalance-shard", help="Move a user's tasks to another shard"
+    )
+    rebalance.add_argument("--user-id", type=int, required=True)
+    rebalance.add_argument("--to", required=True, help="Destination shard name")
+    rebalance.add_argument("--batch-size", type=int, default=5000)
+    rebalance.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Skip waiting for workers' cached shard assignments to expire",
+    )
+    rebalance.set_defaults(handler=rebalance_shard_command)
+
+    id_ranges = subparsers.add_parser(
+        "assign-id-ranges", help="Give each shard a disjoint range of IDs"
+    )
+    id_ranges.add_argument(
+        "--range-size", type=int, default=100_000_000, help="IDs per shard"
+    )
+    id_ranges.set_defaults(handler=assign_id_ranges_command)
+
+    archive = subparsers.add_parser(
+        "archive-tasks", help="Move old completed tasks into the archive"
+    )
+    archive.add_argument(
+        "--older-than-days", type=int, default=settings.archive_after_days
+    )
+    archive.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    archive.add_argument("--shard", default="default")
+    archive.set_defaults(handler=archive_tasks_command)
+
+    purge = subparsers.add_parser(
+        "purge-deleted-accounts",
+        help="Finish account deletions interrupted before completion",
+    )
+    purge.add_argument(
+        "--batch-size", type=int, default=settings.account_deletion_batch_size
+    )
+    purge.set_defaults(handler=purge_deleted_accounts_command)
+
+    purge_keys = subparsers.add_parser(
+        "purge-idempotency-keys", help="Delete expired idempotency keys"
+    )
+    purge_keys.add_argument("--shard", default="default")
+    purge_keys.set_defaults(handler=purge_idempotency_keys_command)
+
+    purge_refresh = subparsers.add_parser(
+        "purge-refresh-tokens", help="Delete expired refresh tokens"
+    )
+    purge_refresh.set_defaults(handler=purge_refresh_tokens_command)
+
+    rebalance_order = subparsers.add_parser(
+        "rebalance-order", help="Shorten task order keys that grew too long"
+    )
+    rebalance_order.add_argument(
+        "--max-length", type=int, default=settings.order_key_max_length
+    )
+    rebalance_order.add_argument("--shard", default="default")
+    rebalance_order.set_defaults(handler=rebalance_order_command)
+
+    reminders = subparsers.add_parser(
+        "dispatch-reminders", help="Deliver task reminders as they come due"
+    )
+    reminders.add_argument("--shard", default="default")
+    reminders.add_argument(
+        "--once", action="store_true", help="Run a single tick and exit"
+    )
+    reminders.set_defaults(handler=dispatch_reminders_command)
+
+    history = subparsers.add_parser(
+        "maintain-history", help="Manage the monthly task history partitions"
+    )
+    history.add_argument(
+        "--months-ahead", type=int, default=settings.history_partitions_ahead
+    )
+    history.add_argument(
+        "--retention-months", type=int, default=settings.history_retention_months
+    )
+    history.add_argument("--shard", default="default")
+    history.set_defaults(handler=maintain_history_command)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-stats", help="Recompute task counters and repair drift"
+    )
+    reconcile.add_argument("--batch-size", type=int, default=1000)
+    reconcile.add_argument("--shard", default="default")
+    reconcile.set_defaults(handler=reconcile_stats_command)
+
+    formats = subparsers.add_parser(
+        "benchmark-formats",
+        help="Compare response formats on a large task list",
+    )
+    formats.add_argument("--tasks", type=int, default=10_000)
+    formats.add_argument("--repeat", type=int, default=5)
+    formats.set_defaults(handler=benchmark_formats_command)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse arguments and run the selected command."""
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
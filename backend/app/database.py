@@ -1,19 +1,93 @@
 """Database connection and session management."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import random
+import time
+from typing import Annotated
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.config import settings
+from app.profiling import current_profile
+
+# Cookie and header carrying the time of the client's last write, for
+# read-your-writes; cross-site clients echo the header on their reads
+LAST_WRITE_COOKIE = "last_write_at"
+LAST_WRITE_HEADER = "X-Last-Write-At"
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.database_url,
     echo=settings.debug,
     pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
 )
 
+# Read replica engines; empty when no replicas are configured
+replica_engines = [
+    create_engine(
+        url,
+        echo=settings.debug,
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
+    for url in settings.read_replica_urls_list
+]
+
+
+# Start times of the statements running on a connection, by execution
+# context, so a statement that raises cannot leave a time for the next one
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("query_started", {})[context] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    """Attach SQL timings to the request profile, if one is active."""
+    started = conn.info.get("query_started", {}).pop(context, None)
+    profile = current_profile.get()
+    if profile is not None and started is not None:
+        profile.record_sql(statement, started, time.perf_counter())
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context):
+    """Forget the start time of a statement that raised."""
+    connection = exception_context.connection
+    if connection is not None:
+        connection.info.get("query_started", {}).pop(
+            exception_context.execution_context, None
+        )
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when one has been assigned.
+
+    A replica is assigned per session through ``session.info["replica"]``
+    (see ``get_read_db``). Flushes and any session holding pending changes
+    always use the primary engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is not None and not (
+            self._flushing or self.new or self.dirty or self.deleted
+        ):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
 
 # Base class for models
 Base = declarative_base()
@@ -22,7 +96,7 @@ Base = declarative_base()
 def get_db():
     """
     Dependency that provides a database session.
-    
+
     Yields:
         Session: SQLAlchemy database session
     """
@@ -31,3 +105,85 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Dependency that provides the session factory for work outside a request.
+
+    Returns:
+        sessionmaker: Factory for primary database sessions
+    """
+    return SessionLocal
+
+
+def get_read_db(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+) -> Session:
+    """
+    Dependency that provides a session whose reads may go to a replica.
+
+    Clients that wrote within the last ``read_your_writes_seconds`` (per the
+    ``last_write_at`` cookie or the ``X-Last-Write-At`` header, whichever is
+    later) keep reading from the primary so they always see their own
+    changes.
+
+    Args:
+        request: Incoming request
+        db: Database session
+
+    Returns:
+        Session: Database session routed to a replica when possible
+    """
+    if not replica_engines:
+        return db
+
+    last_write = 0.0
+    for value in (
+        request.cookies.get(LAST_WRITE_COOKIE),
+        request.headers.get(LAST_WRITE_HEADER),
+    ):
+        try:
+            last_write = max(last_write, float(value or 0))
+        except ValueError:
+            pass
+
+    if time.time() - last_write >= settings.read_your_writes_seconds:
+        db.info["replica"] = random.choice(replica_engines)
+    return db
+
+
+def get_write_db(
+    response: Response,
+    db: Annotated[Session, Depends(get_db)],
+) -> Session:
+    """
+    Dependency that provides a primary session and records the write time.
+
+    Sets the ``last_write_at`` cookie and the ``X-Last-Write-At`` header so
+    the client's following reads are served by the primary until replicas
+    have caught up. Browsers do not send the ``SameSite=Lax`` cookie on
+    cross-site requests; such clients echo the header back, or set
+    ``READ_YOUR_WRITES_CROSS_SITE`` to send the cookie with
+    ``SameSite=None; Secure``.
+
+    Args:
+        response: Outgoing response
+        db: Database session
+
+    Returns:
+        Session: Database session bound to the primary
+    """
+    if replica_engines:
+        last_write = f"{time.time():.3f}"
+        response.headers[LAST_WRITE_HEADER] = last_write
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            last_write,
+            max_age=max(1, int(settings.read_your_writes_seconds)),
+            httponly=True,
+            secure=settings.read_your_writes_cross_site,
+            samesite="none" if settings.read_your_writes_cross_site else "lax",
+        )
+    return db
@@ -1,10 +1,58 @@
 """FastAPI application entry point."""
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.routers import auth_router, tasks_router
+from app.database import LAST_WRITE_HEADER, engine, replica_engines
+from app.middleware import ProfilingMiddleware
+from app.routers import (
+    auth_router,
+    tasks_router,
+    archive_router,
+    tags_router,
+    lists_router,
+)
+from app.services.coalescing import write_coalescer
+from app.services.history import history_recorder
+from app.services.readiness import READY, readiness_probe
+from app.services.reminders import create_dispatcher
+from app.services.warmup import warm_up
+from app.sharding import get_sessionmaker, shard_engines, shard_names
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warm the worker before it reports ready and start the history writer and
+    the optional reminder dispatchers; on exit, stop them (writing out the
+    coalesced updates and queued history) and release connections.
+    """
+    if settings.warm_up_on_startup:
+        await run_in_threadpool(warm_up, app)
+    if history_recorder.enabled:
+        history_recorder.start()
+    dispatchers = []
+    if settings.reminders_in_process:
+        dispatchers = [
+            create_dispatcher(get_sessionmaker(shard)) for shard in shard_names()
+        ]
+        for dispatcher in dispatchers:
+            dispatcher.start(settings.reminder_poll_seconds)
+    yield
+    for dispatcher in dispatchers:
+        await run_in_threadpool(dispatcher.stop)
+    if write_coalescer.enabled:
+        await run_in_threadpool(write_coalescer.stop)
+    if history_recorder.enabled:
+        await run_in_threadpool(history_recorder.stop)
+    for db_engine in [engine, *replica_engines, *shard_engines.values()]:
+        db_engine.dispose()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -13,6 +61,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -22,11 +71,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
+# Profile requests on demand (see PROFILING_TOKEN / PROFILING_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(tasks_router)
+app.include_router(archive_router)
+app.include_router(tags_router)
+app.include_router(lists_router)
 
 
 @app.get("/")
@@ -45,3 +101,19 @@ def root() -> dict:
 def health_check() -> dict:
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+@app.head("/ready")
+def readiness_check(response: Response) -> dict:
+    """
+    Readiness endpoint for load balancers.
+
+    Checks database connectivity and pool headroom (cached for
+    ``ready_cache_seconds``) and returns 503 when a database is unreachable
+    or degraded, so traffic shifts to healthier workers.
+    """
+    result = readiness_probe.check()
+    if result["status"] != READY:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
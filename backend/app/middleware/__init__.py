@@ -0,0 +1,5 @@
+"""ASGI middleware."""
+
+from app.middleware.profiling import ProfilingMiddleware
+
+__all__ = ["ProfilingMiddleware"]
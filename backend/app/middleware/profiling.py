@@ -0,0 +1,77 @@
+"""Middleware profiling selected requests."""
+
+import hmac
+import logging
+import random
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.profiling import RequestProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+
+def should_profile(headers: Headers) -> bool:
+    """
+    Decide whether to profile a request.
+
+    Requests carrying ``X-Profile-Token`` equal to ``PROFILING_TOKEN`` are
+    always profiled; others are sampled at ``PROFILING_SAMPLE_RATE``.
+
+    Args:
+        headers: Request headers
+
+    Returns:
+        bool: True if the request should be profiled
+    """
+    token = headers.get(PROFILE_TOKEN_HEADER)
+    if token is not None and settings.profiling_token:
+        if hmac.compare_digest(token.encode(), settings.profiling_token.encode()):
+            return True
+    return (
+        settings.profiling_sample_rate > 0
+        and random.random() < settings.profiling_sample_rate
+    )
+
+
+class ProfilingMiddleware:
+    """
+    Runs selected requests under the sampling profiler.
+
+    The profile is written to ``PROFILING_OUTPUT_DIR`` once the response has
+    been sent, and its file name is returned in ``X-Profile-File``.
+    Unprofiled requests pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not should_profile(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            f"{scope['method']} {scope['path']}", settings.profiling_interval_ms
+        )
+
+        async def send_with_profile_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[PROFILE_FILE_HEADER] = profile.file_name
+            await send(message)
+
+        reset_token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_header)
+        finally:
+            profile.stop()
+            current_profile.reset(reset_token)
+            path = profile.save(settings.profiling_output_dir)
+            logger.info("Saved request profile to %s", path)
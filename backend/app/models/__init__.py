@@ -2,5 +2,27 @@
 
 from app.models.user import User
 from app.models.task import Task
+from app.models.shard import ShardAssignment
+from app.models.archive import ArchivedTask
+from app.models.idempotency import IdempotencyKey
+from app.models.tag import Tag, task_tags
+from app.models.task_list import ListMember, TaskList
+from app.models.task_event import TaskEvent
+from app.models.refresh_token import RefreshToken
+from app.models.stats import TaskDailyStats, UserTaskStats
 
-__all__ = ["User", "Task"]
+__all__ = [
+    "User",
+    "Task",
+    "ShardAssignment",
+    "ArchivedTask",
+    "IdempotencyKey",
+    "Tag",
+    "task_tags",
+    "TaskList",
+    "ListMember",
+    "TaskEvent",
+    "RefreshToken",
+    "UserTaskStats",
+    "TaskDailyStats",
+]
@@ -0,0 +1,47 @@
+"""Archived task database model."""
+
+from datetime import datetime
+from sqlalchemy import JSON, Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+class ArchivedTask(Base):
+    """Completed task moved out of the hot ``tasks`` table.
+
+    Rows keep their original task ID and every field of the task, so they
+    can be restored in place. Tags are kept by name.
+    """
+
+    __tablename__ = "archived_tasks"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+    order_key = Column(String(255), nullable=True)
+    parent_id = Column(Integer, nullable=True)
+    list_id = Column(Integer, nullable=True)
+    due_at = Column(DateTime, nullable=True)
+    recurrence = Column(String(255), nullable=True)
+    recurrence_start = Column(DateTime, nullable=True)
+    remind_at = Column(DateTime, nullable=True)
+    reminded_at = Column(DateTime, nullable=True)
+    tags = Column(
+        JSON().with_variant(JSONB, "postgresql"),
+        nullable=False,
+        default=list,
+        server_default="[]",
+    )
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Archived tasks are always completed
+    completed = True
+    archived = True
+
+    def __repr__(self) -> str:
+        return f"<ArchivedTask(id={self.id}, title='{self.title}')>"
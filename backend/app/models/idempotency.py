@@ -0,0 +1,23 @@
+"""Idempotency key database model."""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """Stored response of a write request, replayed when the key is retried."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey(user_id={self.user_id}, key='{self.key}')>"
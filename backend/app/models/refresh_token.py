@@ -0,0 +1,33 @@
+"""Refresh token database model."""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """Long-lived token exchanged for new access tokens at ``/api/auth/refresh``.
+
+    Only an HMAC-SHA256 of the token is stored. Every refresh replaces the
+    token with a new one of the same ``family_id``; presenting a replaced
+    token again revokes the whole family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # Set when the token is exchanged for its successor
+    used_at = Column(DateTime, nullable=True)
+    # Set on every token of a family revoked by logout or reuse
+    revoked_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken(id={self.id}, family_id='{self.family_id}')>"
@@ -0,0 +1,22 @@
+"""Shard assignment database model."""
+
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+
+from app.database import Base
+
+
+class ShardAssignment(Base):
+    """Directory entry mapping a user to the shard holding their tasks."""
+
+    __tablename__ = "shard_assignments"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(String(50), nullable=False)
+    moving = Column(Boolean, default=False, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ShardAssignment(user_id={self.user_id}, shard='{self.shard}')>"
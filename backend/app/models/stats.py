@@ -0,0 +1,50 @@
+"""Task statistics database models."""
+
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer
+
+from app.database import Base
+
+
+class UserTaskStats(Base):
+    """Running task counts of a user, including archived tasks.
+
+    Kept on the user's shard and adjusted in the same transaction as every
+    task write (see ``app.services.stats``), so reading them is one primary
+    key lookup however many tasks the user has.
+    """
+
+    __tablename__ = "user_task_stats"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserTaskStats(user_id={self.user_id}, total={self.total}, "
+            f"completed={self.completed})>"
+        )
+
+
+class TaskDailyStats(Base):
+    """Number of a user's tasks completed on a day (UTC), by ``completed_at``."""
+
+    __tablename__ = "task_daily_stats"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    completed = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TaskDailyStats(user_id={self.user_id}, day={self.day}, "
+            f"completed={self.completed})>"
+        )
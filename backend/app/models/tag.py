@@ -0,0 +1,53 @@
+"""Tag database models."""
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    Table,
+    UniqueConstraint,
+)
+
+from app.database import Base
+
+# Association between tasks and tags. ``user_id`` leads the primary key and
+# the tag index so lookups stay within one user's rows (and one partition).
+task_tags = Table(
+    "task_tags",
+    Base.metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("task_id", Integer, primary_key=True),
+    Column(
+        "tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    ),
+    ForeignKeyConstraint(
+        ["task_id", "user_id"],
+        ["tasks.id", "tasks.user_id"],
+        name="task_tags_task_id_user_id_fkey",
+        ondelete="CASCADE",
+    ),
+    # Tasks carrying a tag, used by tag filters
+    Index("ix_task_tags_user_id_tag_id_task_id", "user_id", "tag_id", "task_id"),
+)
+
+
+class Tag(Base):
+    """Label a user can attach to any number of tasks."""
+
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    name = Column(String(50), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_tags_user_id_name"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Tag(id={self.id}, name='{self.name}')>"
@@ -1,14 +1,32 @@
 """Task database model."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 
 class Task(Base):
-    """Task model for todo items."""
+    """Task model for todo items.
+
+    On PostgreSQL the ``tasks`` table is hash-partitioned on ``user_id`` with
+    a ``(id, user_id)`` primary key. The mapper identity includes ``user_id``
+    so ORM-issued UPDATE and DELETE statements prune to a single partition.
+
+    Subtasks reference their parent through ``(parent_id, user_id)``, so a
+    task can only be nested under a task of the same user.
+    """
 
     __tablename__ = "tasks"
 
@@ -16,14 +34,76 @@ class Task(Base):
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
     completed = Column(Boolean, default=False, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # When the task was last completed; None while it is open
+    completed_at = Column(DateTime, nullable=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # Fractional position in the user's list, compared bytewise (see
+    # app.services.ordering)
+    order_key = Column(
+        String(255).with_variant(String(255, collation="C"), "postgresql"),
+        nullable=False,
+    )
+    parent_id = Column(Integer, nullable=True)
+    # Shared list (app.models.task_list) the task belongs to, if any
+    list_id = Column(Integer, nullable=True)
+    due_at = Column(DateTime, nullable=True)
+    # RRULE of a recurring task; this row is the occurrence at ``due_at``
+    # (see app.services.recurrence)
+    recurrence = Column(String(255), nullable=True)
+    recurrence_start = Column(DateTime, nullable=True)
+    # Reminder state, see app.services.reminders
+    remind_at = Column(DateTime, nullable=True)
+    reminded_at = Column(DateTime, nullable=True)
+    reminder_claimed_until = Column(DateTime, nullable=True)
 
     # Relationship to user
     owner = relationship("User", back_populates="tasks")
+    # Tags; load with selectinload() when listing tasks
+    tags = relationship(
+        "Tag",
+        secondary="task_tags",
+        primaryjoin="and_(Task.id == task_tags.c.task_id, "
+        "Task.user_id == task_tags.c.user_id)",
+        secondaryjoin="Tag.id == task_tags.c.tag_id",
+        order_by="Tag.name",
+    )
+
+    __table_args__ = (
+        # Completed tasks by age, scanned by the archival job
+        Index(
+            "ix_tasks_completed_updated_at",
+            "updated_at",
+            postgresql_where=completed.is_(True),
+        ),
+        # Ordered task lists
+        Index("ix_tasks_user_id_order_key", "user_id", "order_key"),
+        # Pending reminders, scanned by the reminder dispatcher
+        Index(
+            "ix_tasks_remind_at_pending",
+            "remind_at",
+            postgresql_where=remind_at.isnot(None) & reminded_at.is_(None),
+        ),
+        # Tasks of a shared list, in list order
+        Index("ix_tasks_user_id_list_id_order_key", "user_id", "list_id", "order_key"),
+        # Children of a task, walked by the subtree queries
+        Index("ix_tasks_user_id_parent_id", "user_id", "parent_id"),
+        # Deferred so a user's tasks can be copied between shards in any order
+        ForeignKeyConstraint(
+            ["parent_id", "user_id"],
+            ["tasks.id", "tasks.user_id"],
+            name="tasks_parent_id_user_id_fkey",
+            ondelete="CASCADE",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+    )
+    __mapper_args__ = {"primary_key": [id, user_id]}
 
     def __repr__(self) -> str:
         status = "✓" if self.completed else " "
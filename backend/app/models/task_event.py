@@ -0,0 +1,52 @@
+"""Task activity history database model."""
+
+from datetime import datetime
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+class TaskEvent(Base):
+    """Append-only record of a change to a task.
+
+    On PostgreSQL the ``task_events`` table is range-partitioned by month on
+    ``occurred_at`` with an ``(id, occurred_at)`` primary key, so old history
+    is dropped a partition at a time. Rows are written in batches by
+    ``app.services.history.HistoryRecorder`` and never updated.
+    """
+
+    __tablename__ = "task_events"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    task_id = Column(Integer, nullable=False)
+    # User who made the change (the owner, or a member of a shared list)
+    actor_id = Column(Integer, nullable=True)
+    # created, updated or deleted
+    action = Column(String(20), nullable=False)
+    # Changed fields as {field: [old, new]}
+    changes = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # History of a task, newest first
+        Index("ix_task_events_user_id_task_id_id", "user_id", "task_id", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<TaskEvent(id={self.id}, task_id={self.task_id}, "
+            f"action='{self.action}')>"
+        )
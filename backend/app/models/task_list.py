@@ -0,0 +1,50 @@
+"""Shared task list database models."""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.database import Base
+
+
+class TaskList(Base):
+    """Named list of an owner's tasks that other users can be invited to.
+
+    Lists and memberships live in the primary database with the users; the
+    tasks stay on the owner's shard and reference the list by ``list_id``.
+    """
+
+    __tablename__ = "task_lists"
+
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TaskList(id={self.id}, name='{self.name}')>"
+
+
+class ListMember(Base):
+    """Membership of a user in a shared list, with a viewer or editor role."""
+
+    __tablename__ = "list_members"
+
+    list_id = Column(
+        Integer, ForeignKey("task_lists.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    role = Column(String(20), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ListMember(list_id={self.list_id}, user_id={self.user_id}, "
+            f"role='{self.role}')>"
+        )
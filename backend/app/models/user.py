@@ -20,9 +20,16 @@ class User(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
-
-    # Relationship to tasks
-    tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
+    # Set when the account is scheduled for deletion; the user can no longer log in
+    deletion_requested_at = Column(DateTime, nullable=True)
+
+    # Relationship to tasks; rows are removed by ON DELETE CASCADE, not loaded
+    tasks = relationship(
+        "Task",
+        back_populates="owner",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
@@ -0,0 +1,392 @@
+"""Content negotiation between JSON, MessagePack and CBOR.
+
+Routes of routers built with ``route_class=NegotiatedRoute`` accept request
+bodies in any of the formats (by ``Content-Type``) and answer in the format
+preferred by the ``Accept`` header, JSON being the default. Timestamps are
+encoded natively: the MessagePack timestamp extension type and CBOR epoch
+timestamps (tag 1), always in UTC. Error responses stay JSON. Every response
+of such a route carries ``Vary: Accept`` so shared caches keep the formats
+apart.
+
+JSON responses take FastAPI's own path. For a binary format, the endpoint's
+return value is validated against the response model and encoded once, in
+place of FastAPI's JSON serialization; headers, cookies and the status code
+set on the injected ``Response`` are kept. Only a ``Response`` returned
+as-is with a JSON body (an idempotent replay) is re-read to be re-encoded.
+
+The binary formats need the optional ``msgpack`` and ``cbor2`` packages
+(``pip install todo-backend[formats]``); a format whose package is missing
+is never negotiated.
+"""
+
+import functools
+import importlib.util
+import inspect
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Any, Callable, Coroutine
+
+from fastapi import Depends, Request, Response
+from fastapi.exceptions import RequestValidationError, ResponseValidationError
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# Other names clients use for the same formats
+ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+_MODULES = {MSGPACK: "msgpack", CBOR: "cbor2"}
+
+# Media types whose encoder is installed, JSON first; looked up once
+_AVAILABLE = [JSON] + [
+    media_type
+    for media_type, module in _MODULES.items()
+    if importlib.util.find_spec(module) is not None
+]
+
+
+def available_formats() -> list[str]:
+    """Return the media types whose encoder is installed, JSON first."""
+    return list(_AVAILABLE)
+
+
+def _media_type(value: str) -> str:
+    media_type = value.split(";", 1)[0].strip().lower()
+    return ALIASES.get(media_type, media_type)
+
+
+def negotiate(accept: str | None) -> str:
+    """
+    Pick the response format for an ``Accept`` header.
+
+    Args:
+        accept: Header value, e.g. ``application/msgpack, application/json;q=0.5``
+
+    Returns:
+        str: Media type of the best supported format; JSON when nothing
+        supported is asked for
+    """
+    if not accept:
+        return JSON
+    supported = _AVAILABLE
+    best, best_quality = JSON, 0.0
+    for entry in accept.split(","):
+        media_type = _media_type(entry)
+        quality = 1.0
+        for parameter in entry.split(";")[1:]:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in ("*/*", "application/*"):
+            media_type = JSON
+        if media_type in supported and quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def get_response_format(request: Request) -> str:
+    """Dependency returning the negotiated response media type."""
+    return negotiate(request.headers.get("accept"))
+
+
+@dataclass(frozen=True)
+class Negotiation:
+    """Negotiated response format and the response whose headers to keep."""
+
+    media_type: str
+    response: Response
+
+
+def get_negotiation(request: Request, response: Response) -> Negotiation:
+    """Dependency pairing the negotiated format with the injected response."""
+    return Negotiation(negotiate(request.headers.get("accept")), response)
+
+
+def _timestamp_default(value: Any) -> Any:
+    import msgpack
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    """
+    Encode Python data (as dumped by pydantic in python mode).
+
+    Naive datetimes are taken as UTC.
+
+    Args:
+        content: Data to encode
+        media_type: ``application/msgpack`` or ``application/cbor``
+
+    Returns:
+        bytes: Encoded body
+    """
+    if media_type == MSGPACK:
+        import msgpack
+
+        return msgpack.packb(content, default=_timestamp_default)
+    if media_type == CBOR:
+        import cbor2
+
+        return cbor2.dumps(content, timezone=timezone.utc, datetime_as_timestamp=True)
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def decode(body: bytes, media_type: str) -> Any:
+    """
+    Decode a MessagePack or CBOR body.
+
+    Args:
+        body: Encoded body
+        media_type: ``application/msgpack`` or ``application/cbor``
+
+    Returns:
+        Any: Decoded data, timestamps as UTC datetimes
+    """
+    if media_type == MSGPACK:
+        import msgpack
+
+        return msgpack.unpackb(body, timestamp=3)
+    if media_type == CBOR:
+        import cbor2
+
+        return cbor2.loads(body)
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def serialize(adapter: TypeAdapter, value: Any, media_type: str) -> bytes:
+    """
+    Serialize a validated value in a negotiated format.
+
+    Args:
+        adapter: Type adapter of the value
+        value: Value to serialize
+        media_type: Negotiated media type
+
+    Returns:
+        bytes: Response body
+    """
+    if media_type == JSON:
+        return adapter.dump_json(value)
+    return encode(adapter.dump_python(value), media_type)
+
+
+def vary_on_accept(response: Response) -> None:
+    """Add ``Accept`` to a response's ``Vary`` header."""
+    vary = response.headers.get("vary")
+    if vary is None:
+        response.headers["vary"] = "Accept"
+    elif "accept" not in {value.strip().lower() for value in vary.split(",")}:
+        response.headers["vary"] = f"{vary}, Accept"
+
+
+class DecodedRequest(Request):
+    """Request whose binary body has been decoded and is read as JSON."""
+
+    def __init__(self, request: Request, body: bytes, content: Any) -> None:
+        headers = [
+            (name, value)
+            for name, value in request.scope["headers"]
+            if name != b"content-type"
+        ]
+        headers.append((b"content-type", JSON.encode()))
+        super().__init__({**request.scope, "headers": headers}, request.receive)
+        self._body = body
+        self._content = content
+
+    async def json(self) -> Any:
+        return self._content
+
+
+class NegotiatedRoute(APIRoute):
+    """Route speaking JSON, MessagePack or CBOR (see module docstring)."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        self._adapter: TypeAdapter | None = None
+        super().__init__(path, self._negotiated_endpoint(endpoint), **kwargs)
+
+    def _negotiated_endpoint(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an endpoint to encode its return value in the negotiated format."""
+
+        def encoded(result: Any, negotiation: Negotiation) -> Any:
+            if (
+                negotiation.media_type == JSON
+                or self._adapter is None
+                or isinstance(result, Response)
+            ):
+                return result
+            try:
+                value = self._adapter.validate_python(result, from_attributes=True)
+            except ValidationError as exc:
+                raise ResponseValidationError(
+                    exc.errors(include_url=False), body=result
+                ) from exc
+            response = Response(
+                content=serialize(self._adapter, value, negotiation.media_type),
+                status_code=negotiation.response.status_code or self.status_code or 200,
+                media_type=negotiation.media_type,
+            )
+            response.headers.raw.extend(
+                (name, value)
+                for name, value in negotiation.response.headers.raw
+                if name not in (b"content-type", b"content-length")
+            )
+            return response
+
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def wrapper(
+                *args: Any, negotiation: Negotiation, **kwargs: Any
+            ) -> Any:
+                return encoded(await endpoint(*args, **kwargs), negotiation)
+
+        else:
+
+            @functools.wraps(endpoint)
+            def wrapper(*args: Any, negotiation: Negotiation, **kwargs: Any) -> Any:
+                return encoded(endpoint(*args, **kwargs), negotiation)
+
+        signature = inspect.signature(endpoint)
+        wrapper.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    "negotiation",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Annotated[Negotiation, Depends(get_negotiation)],
+                ),
+            ]
+        )
+        return wrapper
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        adapter = TypeAdapter(self.response_model) if self.response_model else None
+        self._adapter = adapter
+
+        async def negotiated_handler(request: Request) -> Response:
+            content_type = _media_type(request.headers.get("content-type", ""))
+            if content_type in _MODULES and content_type in _AVAILABLE:
+                body = await request.body()
+                try:
+                    content = decode(body, content_type) if body else None
+                except Exception:
+                    raise RequestValidationError(
+                        [
+                            {
+                                "type": "body_invalid",
+                                "loc": ("body",),
+                                "msg": f"Invalid {content_type} body",
+                                "input": {},
+                            }
+                        ]
+                    )
+                request = DecodedRequest(request, body, content)
+
+            response = await handler(request)
+            vary_on_accept(response)
+            media_type = negotiate(request.headers.get("accept"))
+            if (
+                media_type == JSON
+                or adapter is None
+                or not response.body
+                or not response.headers.get("content-type", "").startswith(JSON)
+            ):
+                return response
+
+            # A JSON Response returned as-is (an idempotent replay): re-read
+            # it with the response model so timestamps are encoded natively
+            content = adapter.validate_json(response.body)
+            negotiated = Response(
+                content=serialize(adapter, content, media_type),
+                status_code=response.status_code,
+                media_type=media_type,
+            )
+            negotiated.headers.raw.extend(
+                (name, value)
+                for name, value in response.headers.raw
+                if name not in (b"content-type", b"content-length")
+            )
+            return negotiated
+
+        return negotiated_handler
+
+
+def benchmark_formats(tasks: int, repeat: int = 5) -> list[dict[str, Any]]:
+    """
+    Compare body size and encode/decode time of each format on a task list.
+
+    The list is synthetic, shaped like ``GET /api/{user_id}/tasks`` output:
+    every task has timestamps and tags, a third have a due date.
+
+    Args:
+        tasks: Number of tasks in the list
+        repeat: Runs per measurement; the fastest is reported
+
+    Returns:
+        list[dict[str, Any]]: One row per available format with
+        ``format``, ``bytes``, ``encode_ms`` and ``decode_ms``
+    """
+    from app.schemas.task import TaskResponse
+
+    adapter = TypeAdapter(list[TaskResponse])
+    start = datetime(2026, 1, 1)
+    value = adapter.validate_python(
+        [
+            {
+                "id": number,
+                "title": f"Task {number}",
+                "description": "Synthetic task description" if number % 2 else None,
+                "completed": number % 3 == 0,
+                "user_id": 1,
+                "created_at": start + timedelta(minutes=number),
+                "updated_at": start + timedelta(minutes=number, seconds=30),
+                "order_key": f"a{number:06d}",
+                "tags": ["work", "urgent"][: number % 3],
+                "due_at": start + timedelta(days=number) if number % 3 == 1 else None,
+            }
+            for number in range(1, tasks + 1)
+        ]
+    )
+
+    def fastest(run: Callable[[], Any]) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    rows = []
+    for media_type in available_formats():
+        body = serialize(adapter, value, media_type)
+
+        def parse(body: bytes = body, media_type: str = media_type) -> Any:
+            if media_type == JSON:
+                return adapter.validate_json(body)
+            return adapter.validate_python(decode(body, media_type))
+
+        rows.append(
+            {
+                "format": media_type,
+                "bytes": len(body),
+                "encode_ms": fastest(lambda: serialize(adapter, value, media_type)),
+                "decode_ms": fastest(parse),
+            }
+        )
+    return rows
@@ -0,0 +1,157 @@
+"""On-demand statistical request profiling with speedscope output.
+
+A profiled request is sampled by a background thread that records the
+Python stacks of all threads currently running application code, every
+``profiling_interval_ms``. SQL statements executed while the profile is
+active are timed through engine events (see ``app.database``). Because
+stacks are sampled per process, concurrent requests on the same worker can
+show up in a profile.
+
+The result is written as a speedscope file (https://www.speedscope.app)
+containing a sampled CPU profile and an evented SQL timeline.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+current_profile: ContextVar["RequestProfile | None"] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class RequestProfile:
+    """Stack samples and SQL timings collected for one request."""
+
+    def __init__(self, name: str, interval_ms: float) -> None:
+        self.name = name
+        self.interval = interval_ms / 1000
+        self.samples: list[tuple[tuple[str, str, int], ...]] = []
+        self.sql: list[tuple[float, float, str]] = []
+        self._started = 0.0
+        self._stopped = 0.0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        slug = "".join(char if char.isalnum() else "_" for char in name)[:80]
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        self.file_name = f"{stamp}-{slug}.speedscope.json"
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._sample_loop, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stopped = time.perf_counter()
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def record_sql(self, statement: str, started: float, finished: float) -> None:
+        """Record a SQL statement's perf_counter start and end times."""
+        self.sql.append((started, finished, " ".join(statement.split())))
+
+    def _sample_loop(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+                # Skip idle threads (event loop waiting, empty thread pool)
+                if in_app:
+                    stack.reverse()
+                    self.samples.append(tuple(stack))
+
+    def to_speedscope(self) -> dict:
+        """Build the speedscope document for this profile."""
+        frames: list[dict] = []
+        frame_index: dict[tuple, int] = {}
+
+        def index_of(key: tuple, frame: dict) -> int:
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append(frame)
+            return frame_index[key]
+
+        interval_ms = self.interval * 1000
+        duration_ms = (self._stopped - self._started) * 1000
+        samples = [
+            [
+                index_of(
+                    (name, filename, line),
+                    {"name": name, "file": filename, "line": line},
+                )
+                for name, filename, line in stack
+            ]
+            for stack in self.samples
+        ]
+
+        events = []
+        cursor_ms = 0.0
+        for started, finished, statement in sorted(self.sql):
+            frame = index_of(("sql", statement), {"name": f"SQL: {statement[:200]}"})
+            opened = max((started - self._started) * 1000, cursor_ms)
+            closed = max((finished - self._started) * 1000, opened)
+            events.append({"type": "O", "frame": frame, "at": opened})
+            events.append({"type": "C", "frame": frame, "at": closed})
+            cursor_ms = closed
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "todo-api",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{self.name} (CPU samples)",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": duration_ms,
+                    "samples": samples,
+                    "weights": [interval_ms] * len(samples),
+                },
+                {
+                    "type": "evented",
+                    "name": f"{self.name} (SQL)",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": max(duration_ms, cursor_ms),
+                    "events": events,
+                },
+            ],
+        }
+
+    def save(self, directory: str) -> Path:
+        """
+        Write the profile as a speedscope JSON file.
+
+        Args:
+            directory: Output directory, created if missing
+
+        Returns:
+            Path: Path of the written file
+        """
+        output_dir = Path(directory)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / self.file_name
+        path.write_text(json.dumps(self.to_speedscope()))
+        return path
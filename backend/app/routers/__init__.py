@@ -2,5 +2,14 @@
 
 from app.routers.auth import router as auth_router
 from app.routers.tasks import router as tasks_router
+from app.routers.archive import router as archive_router
+from app.routers.tags import router as tags_router
+from app.routers.lists import router as lists_router
 
-__all__ = ["auth_router", "tasks_router"]
+__all__ = [
+    "auth_router",
+    "tasks_router",
+    "archive_router",
+    "tags_router",
+    "lists_router",
+]
@@ -0,0 +1,76 @@
+"""Archived task endpoints."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.orm import Session
+
+from app.models.archive import ArchivedTask
+from app.models.task import Task
+from app.models.user import User
+from app.routers.tasks import verify_user_access
+from app.schemas.task import TaskResponse
+from app.services.archive import list_archived_tasks, restore_archived_task
+from app.services.auth import get_current_user
+from app.sharding import get_shard_db, get_shard_read_db
+
+router = APIRouter(prefix="/api/{user_id}/archive", tags=["Archive"])
+
+
+@router.get("", response_model=list[TaskResponse])
+def get_archived_tasks(
+    user_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    before_id: Annotated[int | None, Query()] = None,
+) -> list[ArchivedTask]:
+    """
+    List archived tasks, newest first.
+
+    Args:
+        user_id: User ID from path
+        current_user: Current authenticated user
+        db: Database session
+        limit: Maximum number of tasks to return
+        before_id: Return tasks with a smaller ID than this (next page)
+
+    Returns:
+        list[TaskResponse]: Archived tasks
+    """
+    verify_user_access(user_id, current_user)
+    return list_archived_tasks(db, user_id, limit, before_id)
+
+
+@router.post("/{task_id}/restore", response_model=TaskResponse)
+def restore_task(
+    user_id: Annotated[int, Path()],
+    task_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_db)],
+) -> Task:
+    """
+    Restore an archived task to the active task list.
+
+    Args:
+        user_id: User ID from path
+        task_id: Archived task ID
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskResponse: Restored task
+
+    Raises:
+        HTTPException: If the task is not archived
+    """
+    verify_user_access(user_id, current_user)
+
+    task = restore_archived_task(db, user_id, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived task not found",
+        )
+
+    return task
@@ -1,29 +1,40 @@
 """Authentication endpoints."""
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_session_factory, get_write_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
+from app.negotiation import NegotiatedRoute
+from app.schemas.user import RefreshRequest, Token, UserCreate, UserLogin, UserResponse
 from app.services.auth import (
     get_password_hash,
     verify_password,
     create_access_token,
     get_current_user,
 )
+from app.services.accounts import purge_user_account
+from app.services.refresh_tokens import (
+    find_family,
+    issue_refresh_token,
+    revoke_family,
+    rotate_refresh_token,
+)
+from app.sharding import assign_shard
 
-router = APIRouter(prefix="/api/auth", tags=["Authentication"])
+router = APIRouter(
+    prefix="/api/auth", tags=["Authentication"], route_class=NegotiatedRoute
+)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register_user(
     user_data: UserCreate,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session, Depends(get_write_db)],
 ) -> User:
     """
     Register a new user.
@@ -62,10 +73,34 @@ def register_user(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    assign_shard(db, db_user)
 
     return db_user
 
 
+def issue_tokens(user: User, refresh_token: str, family_id: str) -> dict:
+    """
+    Build the token response for a login or refresh.
+
+    Args:
+        user: Authenticated user
+        refresh_token: Refresh token to return
+        family_id: Family of the refresh token, embedded in the access token
+
+    Returns:
+        dict: Access token and refresh token
+    """
+    access_token = create_access_token(
+        data={"sub": str(user.id), "fam": family_id},
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
 @router.post("/login", response_model=Token)
 def login_user(
     credentials: UserLogin,
@@ -79,7 +114,7 @@ def login_user(
         db: Database session
 
     Returns:
-        Token: JWT access token
+        Token: JWT access token and a refresh token starting a new family
 
     Raises:
         HTTPException: If credentials are invalid
@@ -90,20 +125,68 @@ def login_user(
     ).first()
 
     # Verify password
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if (
+        not user
+        or user.deletion_requested_at is not None
+        or not verify_password(credentials.password, user.hashed_password)
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    refresh_token, family_id = issue_refresh_token(db, user.id)
+    db.commit()
+
+    return issue_tokens(user, refresh_token, family_id)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(
+    refresh_data: RefreshRequest,
+    db: Annotated[Session, Depends(get_db)],
+) -> dict:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    The presented refresh token is used up. Presenting it again revokes
+    its family, logging out every holder.
+
+    Args:
+        refresh_data: Refresh token from login or the previous refresh
+        db: Database session
+
+    Returns:
+        Token: New access token and refresh token
+
+    Raises:
+        HTTPException: If the refresh token is invalid, expired or reused
+    """
+    user, refresh_token, family_id = rotate_refresh_token(
+        db, refresh_data.refresh_token
     )
+    return issue_tokens(user, refresh_token, family_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+def logout_user(
+    refresh_data: RefreshRequest,
+    db: Annotated[Session, Depends(get_db)],
+) -> None:
+    """
+    Revoke a refresh token's family and the access tokens issued with it.
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    Other workers reject the access tokens within
+    ``REVOKED_FAMILY_CACHE_SECONDS``.
+
+    Args:
+        refresh_data: Refresh token to revoke
+        db: Database session
+    """
+    family_id = find_family(db, refresh_data.refresh_token)
+    if family_id is not None:
+        revoke_family(db, family_id)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -120,3 +203,37 @@ def get_current_user_info(
         UserResponse: Current user information
     """
     return current_user
+
+
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+def delete_current_user(
+    current_user: Annotated[User, Depends(get_current_user)],
+    background_tasks: BackgroundTasks,
+    db: Annotated[Session, Depends(get_write_db)],
+    session_factory: Annotated[sessionmaker, Depends(get_session_factory)],
+) -> dict:
+    """
+    Schedule deletion of the current user's account.
+
+    The account is disabled immediately; the user and their tasks are
+    deleted in bounded batches after the response has been sent.
+
+    Args:
+        current_user: Current authenticated user from token
+        background_tasks: Background task queue
+        db: Database session
+        session_factory: Factory for sessions used by the deletion job
+
+    Returns:
+        dict: Confirmation message
+    """
+    current_user.deletion_requested_at = datetime.utcnow()
+    db.commit()
+
+    background_tasks.add_task(
+        purge_user_account,
+        current_user.id,
+        session_factory,
+        settings.account_deletion_batch_size,
+    )
+    return {"detail": "Account deletion scheduled"}
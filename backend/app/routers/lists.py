@@ -0,0 +1,453 @@
+"""Shared task list endpoints."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import get_db, get_read_db, get_write_db
+from app.models.task import Task
+from app.models.task_list import TaskList
+from app.models.user import User
+from app.negotiation import NegotiatedRoute, get_response_format, serialize
+from app.routers.tasks import commit_write, task_list_adapter
+from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+from app.schemas.task_list import ListMemberSet, TaskListCreate, TaskListResponse
+from app.services.auth import get_current_user
+from app.services.cache import task_list_cache
+from app.services.hierarchy import delete_subtree, subtree_leaves_list
+from app.services.history import CREATED, DELETED, created_changes, stage_event
+from app.services.ordering import next_order_key
+from app.services.sharing import (
+    EDITOR,
+    OWNER,
+    VIEWER,
+    Membership,
+    create_list,
+    delete_list,
+    get_memberships,
+    remove_member,
+    set_member,
+)
+from app.services.stats import adjust_stats
+from app.services.tags import normalize_tag_names, resolve_tags
+from app.services.task_updates import apply_task_update
+from app.sharding import shard_session
+
+router = APIRouter(prefix="/api/lists", tags=["Lists"], route_class=NegotiatedRoute)
+
+
+def get_membership(
+    list_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> Membership:
+    """
+    Dependency that resolves the current user's access to the path list.
+
+    Served from the per-process membership cache, so it queries the
+    database only when the user's memberships are not cached.
+
+    Raises:
+        HTTPException: If the user cannot see the list
+    """
+    membership = get_memberships(db, current_user.id).get(list_id)
+    if membership is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="List not found",
+        )
+    return membership
+
+
+def require_role(membership: Membership, role: str) -> None:
+    """
+    Verify that a membership grants at least a role.
+
+    Args:
+        membership: Current user's membership
+        role: Least role required
+
+    Raises:
+        HTTPException: If the role is insufficient
+    """
+    if not membership.allows(role):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Requires the {role} role on this list",
+        )
+
+
+def get_list_shard_db(
+    membership: Annotated[Membership, Depends(get_membership)],
+    db: Annotated[Session, Depends(get_write_db)],
+):
+    """
+    Dependency that provides a primary session on the list owner's shard.
+
+    Yields:
+        Session: Session bound to the shard holding the list's tasks
+    """
+    yield from shard_session(db, membership.owner_id)
+
+
+def get_list_shard_read_db(
+    membership: Annotated[Membership, Depends(get_membership)],
+    db: Annotated[Session, Depends(get_read_db)],
+):
+    """
+    Dependency that provides a read session on the list owner's shard.
+
+    Yields:
+        Session: Session bound to the shard holding the list's tasks
+    """
+    yield from shard_session(db, membership.owner_id)
+
+
+def get_list_task(db: Session, membership: Membership, task_id: int) -> Task:
+    """
+    Load a task of a list.
+
+    Raises:
+        HTTPException: If the list has no such task
+    """
+    task = (
+        db.query(Task)
+        .filter(
+            Task.id == task_id,
+            Task.user_id == membership.owner_id,
+            Task.list_id == membership.list_id,
+        )
+        .first()
+    )
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+    return task
+
+
+@router.post("", response_model=TaskListResponse, status_code=status.HTTP_201_CREATED)
+def create_task_list(
+    list_data: TaskListCreate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_write_db)],
+) -> TaskListResponse:
+    """
+    Create a list owned by the authenticated user.
+
+    Args:
+        list_data: List creation data
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskListResponse: Created list
+    """
+    task_list = create_list(db, current_user.id, list_data.name)
+    return TaskListResponse(
+        id=task_list.id, owner_id=task_list.owner_id, name=task_list.name, role=OWNER
+    )
+
+
+@router.get("", response_model=list[TaskListResponse])
+def get_task_lists(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> list[TaskListResponse]:
+    """
+    List the lists the authenticated user owns or is a member of.
+
+    Args:
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        list[TaskListResponse]: Lists with the user's role, by ID
+    """
+    memberships = get_memberships(db, current_user.id)
+    return [
+        TaskListResponse(
+            id=membership.list_id,
+            owner_id=membership.owner_id,
+            name=membership.name,
+            role=membership.role,
+        )
+        for _, membership in sorted(memberships.items())
+    ]
+
+
+@router.put(
+    "/{list_id}/members", status_code=status.HTTP_204_NO_CONTENT, response_model=None
+)
+def set_list_member(
+    member_data: ListMemberSet,
+    membership: Annotated[Membership, Depends(get_membership)],
+    db: Annotated[Session, Depends(get_write_db)],
+) -> None:
+    """
+    Add a user to a list, or change their role (owner only).
+
+    Args:
+        member_data: Username and role of the member
+        membership: Current user's membership
+        db: Database session
+
+    Raises:
+        HTTPException: If the user is not the owner or the member is unknown
+    """
+    require_role(membership, OWNER)
+
+    member = db.query(User).filter(User.username == member_data.username).first()
+    if member is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    if member.id == membership.owner_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The owner cannot be added as a member",
+        )
+    set_member(db, membership.list_id, member.id, member_data.role)
+
+
+@router.delete(
+    "/{list_id}/members/{member_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_model=None,
+)
+def remove_list_member(
+    member_id: Annotated[int, Path()],
+    membership: Annotated[Membership, Depends(get_membership)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_write_db)],
+) -> None:
+    """
+    Remove a member from a list; members may remove themselves.
+
+    Args:
+        member_id: User ID of the member
+        membership: Current user's membership
+        current_user: Current authenticated user
+        db: Database session
+
+    Raises:
+        HTTPException: If not allowed or the user is not a member
+    """
+    if member_id != current_user.id:
+        require_role(membership, OWNER)
+
+    if not remove_member(db, membership.list_id, member_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Member not found",
+        )
+
+
+@router.delete(
+    "/{list_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None
+)
+def delete_task_list(
+    membership: Annotated[Membership, Depends(get_membership)],
+    db: Annotated[Session, Depends(get_write_db)],
+    shard_db: Annotated[Session, Depends(get_list_shard_db)],
+) -> None:
+    """
+    Delete a list (owner only); its tasks are kept outside of any list.
+
+    Args:
+        membership: Current user's membership
+        db: Database session
+        shard_db: Session on the owner's shard
+
+    Raises:
+        HTTPException: If the user is not the owner
+    """
+    require_role(membership, OWNER)
+
+    task_list = db.get(TaskList, membership.list_id)
+    if task_list is not None:
+        delete_list(db, shard_db, task_list)
+
+
+@router.get("/{list_id}/tasks", response_model=list[TaskResponse])
+def get_list_tasks(
+    membership: Annotated[Membership, Depends(get_membership)],
+    db: Annotated[Session, Depends(get_list_shard_read_db)],
+    response_format: Annotated[str, Depends(get_response_format)],
+) -> Response:
+    """
+    Get the tasks of a list in the owner's manual order.
+
+    One query on the ``(user_id, list_id, order_key)`` index, cached with
+    the owner's task lists until the owner's next task write.
+
+    Args:
+        membership: Current user's membership
+        db: Session on the owner's shard
+        response_format: Negotiated response media type
+
+    Returns:
+        list[TaskResponse]: Tasks of the list
+    """
+    require_role(membership, VIEWER)
+
+    owner_id = membership.owner_id
+    params = f"list={membership.list_id}&format={response_format}"
+    body, version = task_list_cache.lookup(owner_id, params)
+    if body is None:
+        tasks = (
+            db.query(Task)
+            .options(selectinload(Task.tags))
+            .filter(Task.user_id == owner_id, Task.list_id == membership.list_id)
+            .order_by(Task.order_key, Task.id)
+            .all()
+        )
+        body = serialize(
+            task_list_adapter,
+            task_list_adapter.validate_python(tasks, from_attributes=True),
+            response_format,
+        )
+        # A replica may lag behind the write that produced this version
+        if not db.info.get("replica"):
+            task_list_cache.store(owner_id, params, version, body)
+
+    return Response(content=body, media_type=response_format)
+
+
+@router.post(
+    "/{list_id}/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED
+)
+def create_list_task(
+    task_data: TaskCreate,
+    membership: Annotated[Membership, Depends(get_membership)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_list_shard_db)],
+) -> Task:
+    """
+    Create a task in a list; it is owned by the list's owner.
+
+    Args:
+        task_data: Task creation data
+        membership: Current user's membership
+        current_user: Current authenticated user
+        db: Session on the owner's shard
+
+    Returns:
+        TaskResponse: Created task
+
+    Raises:
+        HTTPException: If the role is insufficient or the parent task is
+            not in the list
+    """
+    require_role(membership, EDITOR)
+
+    owner_id = membership.owner_id
+    if task_data.parent_id is not None:
+        get_list_task(db, membership, task_data.parent_id)
+
+    db_task = Task(
+        title=task_data.title,
+        description=task_data.description,
+        user_id=owner_id,
+        list_id=membership.list_id,
+        parent_id=task_data.parent_id,
+        due_at=task_data.due_at,
+        remind_at=task_data.remind_at,
+        recurrence=task_data.recurrence,
+        recurrence_start=task_data.due_at if task_data.recurrence else None,
+        order_key=next_order_key(db, owner_id),
+        tags=resolve_tags(db, owner_id, normalize_tag_names(task_data.tags)),
+    )
+    db.add(db_task)
+    db.flush()
+    adjust_stats(db, owner_id, total=1)
+    stage_event(
+        db, owner_id, db_task.id, CREATED, created_changes(db_task), current_user.id
+    )
+    commit_write(db, owner_id, None, status.HTTP_201_CREATED)
+    db.refresh(db_task)
+
+    return db_task
+
+
+@router.put("/{list_id}/tasks/{task_id}", response_model=TaskResponse)
+def update_list_task(
+    task_id: Annotated[int, Path()],
+    task_data: TaskUpdate,
+    membership: Annotated[Membership, Depends(get_membership)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_list_shard_db)],
+) -> Task:
+    """
+    Update a task of a list.
+
+    Args:
+        task_id: Task ID to update
+        task_data: Task update data
+        membership: Current user's membership
+        current_user: Current authenticated user
+        db: Session on the owner's shard
+
+    Returns:
+        TaskResponse: Updated task
+
+    Raises:
+        HTTPException: If the role is insufficient or the task is not found
+    """
+    require_role(membership, EDITOR)
+
+    task = get_list_task(db, membership, task_id)
+    apply_task_update(db, membership.owner_id, task, task_data, current_user.id)
+    commit_write(db, membership.owner_id, None, status.HTTP_200_OK)
+    db.refresh(task)
+
+    return task
+
+
+@router.delete(
+    "/{list_id}/tasks/{task_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_model=None,
+)
+def delete_list_task(
+    task_id: Annotated[int, Path()],
+    membership: Annotated[Membership, Depends(get_membership)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_list_shard_db)],
+) -> None:
+    """
+    Delete a task of a list together with all its subtasks.
+
+    Args:
+        task_id: Task ID to delete
+        membership: Current user's membership
+        current_user: Current authenticated user
+        db: Session on the owner's shard
+
+    Raises:
+        HTTPException: If the role is insufficient, the task is not found, or
+            a member would delete subtasks that are not in the list
+    """
+    require_role(membership, EDITOR)
+
+    task = get_list_task(db, membership, task_id)
+    if membership.role != OWNER and subtree_leaves_list(
+        db, membership.owner_id, task_id, membership.list_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Task has subtasks outside this list",
+        )
+    stage_event(
+        db,
+        membership.owner_id,
+        task_id,
+        DELETED,
+        {"title": [task.title, None]},
+        current_user.id,
+    )
+    delete_subtree(db, membership.owner_id, task_id)
+    commit_write(db, membership.owner_id, None, status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,40 @@
+"""Tag endpoints."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.routers.tasks import verify_user_access
+from app.schemas.tag import TagResponse
+from app.services.auth import get_current_user
+from app.services.tags import list_tag_counts
+from app.sharding import get_shard_read_db
+
+router = APIRouter(prefix="/api/{user_id}/tags", tags=["Tags"])
+
+
+@router.get("", response_model=list[TagResponse])
+def get_tags(
+    user_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+) -> list[TagResponse]:
+    """
+    List the user's tags with the number of tasks carrying each.
+
+    Args:
+        user_id: User ID from path
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        list[TagResponse]: Tags ordered by name
+    """
+    verify_user_access(user_id, current_user)
+
+    return [
+        TagResponse(name=name, task_count=count)
+        for name, count in list_tag_counts(db, user_id)
+    ]
@@ -1,17 +1,63 @@
 """Task CRUD endpoints."""
 
+from datetime import datetime, timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
+from app.config import settings
 from app.database import get_db
+from app.models.archive import ArchivedTask
 from app.models.task import Task
+from app.models.task_event import TaskEvent
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.negotiation import NegotiatedRoute, get_response_format, serialize
+from app.schemas.task import (
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskCreate,
+    TaskUpdate,
+    TaskMove,
+    TaskParent,
+    TaskResponse,
+    naive_utc,
+)
+from app.schemas.stats import DailyCompletions, TaskStatsResponse
+from app.schemas.task_event import TaskEventResponse
 from app.services.auth import get_current_user
-
-router = APIRouter(prefix="/api/{user_id}/tasks", tags=["Tasks"])
+from app.services.cache import task_list_cache
+from app.services.coalescing import write_coalescer
+from app.services.hierarchy import (
+    delete_subtree,
+    get_subtree,
+    is_in_subtree,
+    set_subtree_completed,
+)
+from app.services.history import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    created_changes,
+    list_task_events,
+    stage_event,
+)
+from app.services.idempotency import IdempotentRequest, get_idempotent_request
+from app.services.ordering import next_order_key, reposition_task
+from app.services.recurrence import advance_recurring_task, upcoming_occurrences
+from app.services.stats import adjust_stats, get_stats
+from app.services.tags import TagMatch, normalize_tag_names, resolve_tags, tag_filter
+from app.services.task_updates import apply_task_update
+from app.sharding import get_shard_db, get_shard_read_db
+
+router = APIRouter(
+    prefix="/api/{user_id}/tasks", tags=["Tasks"], route_class=NegotiatedRoute
+)
+
+task_list_adapter = TypeAdapter(list[TaskResponse])
 
 
 def verify_user_access(
@@ -35,26 +81,169 @@ def verify_user_access(
         )
 
 
+def task_exists(db: Session, user_id: int, task_id: int) -> bool:
+    """Check whether a user has a task with the given ID."""
+    return db.query(
+        db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).exists()
+    ).scalar()
+
+
+def commit_write(
+    db: Session,
+    user_id: int,
+    idempotency: IdempotentRequest | None,
+    status_code: int,
+    task: Task | None = None,
+) -> Response | None:
+    """
+    Commit a task write, storing its response under the Idempotency-Key.
+
+    The stored response is committed in the same transaction as the write.
+    If a concurrent retry with the same key committed first, the write is
+    rolled back and that request's response is returned instead. Cached
+    task lists of the user are invalidated once the write is committed.
+
+    Args:
+        db: Database session holding the pending write
+        user_id: Owner of the written task
+        idempotency: Idempotency key of the request, if any
+        status_code: Status code of the response
+        task: Task returned in the response body, if any
+
+    Returns:
+        Response | None: Response to replay instead, or None when committed
+    """
+    if idempotency is not None:
+        db.flush()
+        body = TaskResponse.model_validate(task).model_dump_json() if task else None
+        idempotency.save(db, status_code, body)
+
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        replayed = idempotency.replay(db) if idempotency else None
+        if replayed is None:
+            raise
+        return replayed
+
+    task_list_cache.invalidate(user_id)
+    return None
+
+
+def with_upcoming_occurrences(
+    tasks: list[Task], until: datetime
+) -> list[Task | TaskResponse]:
+    """Insert the computed upcoming occurrences after each recurring task."""
+    expanded: list[Task | TaskResponse] = []
+    for task in tasks:
+        expanded.append(task)
+        occurrences = upcoming_occurrences(
+            task, until, settings.recurrence_max_occurrences
+        )
+        if occurrences:
+            current = TaskResponse.model_validate(task)
+            expanded.extend(
+                current.model_copy(
+                    update={
+                        "due_at": occurrence,
+                        "remind_at": None,
+                        "reminded_at": None,
+                        "completed": False,
+                        "completed_at": None,
+                        "virtual": True,
+                    }
+                )
+                for occurrence in occurrences
+            )
+    return expanded
+
+
 @router.get("", response_model=list[TaskResponse])
 def get_all_tasks(
     user_id: Annotated[int, Path()],
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
-) -> list[Task]:
+    db: Annotated[Session, Depends(get_shard_read_db)],
+    response_format: Annotated[str, Depends(get_response_format)],
+    include_archived: Annotated[bool, Query()] = False,
+    tag: Annotated[list[str], Query()] = [],
+    match: Annotated[TagMatch, Query()] = "any",
+    occurrences_until: Annotated[datetime | None, Query()] = None,
+) -> Response:
     """
-    Get all tasks for the authenticated user.
+    Get all tasks for the authenticated user in their manual order.
+
+    Serialized responses are cached per user, query parameters and
+    response format until the user's next task write. Tags are loaded with
+    one extra query for the whole list.
 
     Args:
         user_id: User ID from path
         current_user: Current authenticated user
         db: Database session
+        response_format: Negotiated response media type
+        include_archived: Also return archived tasks (queried only when set
+            and no tag filter is given; archived tags are not indexed)
+        tag: Only return tasks carrying these tags (repeatable)
+        match: ``any`` to match tasks with one of the tags, ``all`` for
+            tasks carrying every tag
+        occurrences_until: Also list the upcoming occurrences of recurring
+            tasks up to this time, marked ``virtual`` and placed after their
+            task (at most ``RECURRENCE_MAX_OCCURRENCES`` per task)
 
     Returns:
         list[TaskResponse]: List of all tasks
+
+    Raises:
+        HTTPException: If ``occurrences_until`` is too far in the future
     """
     verify_user_access(user_id, current_user)
-    tasks = db.query(Task).filter(Task.user_id == user_id).all()
-    return tasks
+
+    if occurrences_until is not None:
+        occurrences_until = naive_utc(occurrences_until)
+        horizon = timedelta(days=settings.recurrence_max_window_days)
+        if occurrences_until > datetime.utcnow() + horizon:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="occurrences_until is too far in the future",
+            )
+
+    tag_names = normalize_tag_names(tag)
+    params = (
+        f"archived={include_archived}&tags={','.join(sorted(tag_names))}"
+        f"&match={match}&until={occurrences_until}&format={response_format}"
+    )
+    body, version = task_list_cache.lookup(user_id, params)
+    if body is None:
+        query = (
+            db.query(Task)
+            .options(selectinload(Task.tags))
+            .filter(Task.user_id == user_id)
+        )
+        if tag_names:
+            query = query.filter(tag_filter(user_id, tag_names, match))
+        tasks: list[Task | ArchivedTask | TaskResponse] = query.order_by(
+            Task.order_key, Task.id
+        ).all()
+        if occurrences_until is not None:
+            tasks = with_upcoming_occurrences(tasks, occurrences_until)
+        if include_archived and not tag_names:
+            tasks += (
+                db.query(ArchivedTask)
+                .filter(ArchivedTask.user_id == user_id)
+                .order_by(ArchivedTask.id)
+                .all()
+            )
+        body = serialize(
+            task_list_adapter,
+            task_list_adapter.validate_python(tasks, from_attributes=True),
+            response_format,
+        )
+        # A replica may lag behind the write that produced this version
+        if not db.info.get("replica"):
+            task_list_cache.store(user_id, params, version, body)
+
+    return Response(content=body, media_type=response_format)
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -62,40 +251,200 @@ def create_task(
     user_id: Annotated[int, Path()],
     task_data: TaskCreate,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
-) -> Task:
+    db: Annotated[Session, Depends(get_shard_db)],
+    idempotency: Annotated[
+        IdempotentRequest | None, Depends(get_idempotent_request)
+    ],
+) -> Task | Response:
     """
     Create a new task for the authenticated user.
 
+    Retries carrying the same ``Idempotency-Key`` header replay the original
+    response instead of creating a duplicate. Set ``parent_id`` to create a
+    subtask.
+
     Args:
         user_id: User ID from path
         task_data: Task creation data
         current_user: Current authenticated user
         db: Database session
+        idempotency: Idempotency key of the request, if any
 
     Returns:
         TaskResponse: Created task
+
+    Raises:
+        HTTPException: If the parent task is not found
     """
     verify_user_access(user_id, current_user)
 
+    if idempotency and (replayed := idempotency.replay(db)):
+        return replayed
+
+    if task_data.parent_id is not None and not task_exists(
+        db, user_id, task_data.parent_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Parent task not found",
+        )
+
     db_task = Task(
         title=task_data.title,
         description=task_data.description,
         user_id=user_id,
+        parent_id=task_data.parent_id,
+        due_at=task_data.due_at,
+        remind_at=task_data.remind_at,
+        recurrence=task_data.recurrence,
+        recurrence_start=task_data.due_at if task_data.recurrence else None,
+        order_key=next_order_key(db, user_id),
+        tags=resolve_tags(db, user_id, normalize_tag_names(task_data.tags)),
     )
     db.add(db_task)
-    db.commit()
+    db.flush()
+    adjust_stats(db, user_id, total=1)
+    stage_event(
+        db, user_id, db_task.id, CREATED, created_changes(db_task), current_user.id
+    )
+    if replayed := commit_write(
+        db, user_id, idempotency, status.HTTP_201_CREATED, db_task
+    ):
+        return replayed
     db.refresh(db_task)
 
     return db_task
 
 
+@router.get("/stats", response_model=TaskStatsResponse)
+def get_task_stats(
+    user_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+    days: Annotated[int, Query(ge=1, le=366)] = 30,
+) -> TaskStatsResponse:
+    """
+    Get the user's task counts and the tasks completed per day.
+
+    Served from counters maintained by every task write, so the cost does
+    not depend on the number of tasks. Archived tasks are included.
+
+    Args:
+        user_id: User ID from path
+        current_user: Current authenticated user
+        db: Database session
+        days: Number of days of completions to return, ending today (UTC)
+
+    Returns:
+        TaskStatsResponse: Total, completed and open counts and daily
+        completions
+    """
+    verify_user_access(user_id, current_user)
+
+    total, completed, daily = get_stats(db, user_id, datetime.utcnow().date(), days)
+    return TaskStatsResponse(
+        total=total,
+        completed=completed,
+        open=total - completed,
+        daily=[DailyCompletions(day=day, completed=count) for day, count in daily],
+    )
+
+
+def fetch_task_batch(db: Session, user_id: int, ids: list[int]) -> TaskBatchResponse:
+    """
+    Load several of a user's tasks with one query.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        ids: Task IDs, at most ``TASK_BATCH_MAX_IDS`` (checked by
+            ``TaskBatchRequest``); repeated IDs are returned once
+
+    Returns:
+        TaskBatchResponse: Found tasks in the order of ``ids`` and the IDs
+        of the tasks that do not exist
+    """
+    ids = list(dict.fromkeys(ids))
+    tasks = {
+        task.id: task
+        for task in db.query(Task)
+        .options(selectinload(Task.tags))
+        .filter(Task.user_id == user_id, Task.id.in_(ids))
+    }
+    return TaskBatchResponse(
+        tasks=[
+            TaskResponse.model_validate(tasks[task_id])
+            for task_id in ids
+            if task_id in tasks
+        ],
+        missing=[task_id for task_id in ids if task_id not in tasks],
+    )
+
+
+@router.get("/batch", response_model=TaskBatchResponse)
+def get_task_batch(
+    user_id: Annotated[int, Path()],
+    ids: Annotated[str, Query(pattern=r"^\d+(,\d+)*$")],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+) -> TaskBatchResponse:
+    """
+    Get several tasks by ID, e.g. ``?ids=12,7,31``.
+
+    Args:
+        user_id: User ID from path
+        ids: Comma-separated task IDs
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskBatchResponse: Found tasks in request order and missing IDs
+
+    Raises:
+        RequestValidationError: If too many IDs are given or an ID is out
+            of range
+    """
+    verify_user_access(user_id, current_user)
+
+    try:
+        batch = TaskBatchRequest(ids=ids.split(","))
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("query", *error["loc"])} for error in exc.errors()]
+        )
+    return fetch_task_batch(db, user_id, batch.ids)
+
+
+@router.post("/batch", response_model=TaskBatchResponse)
+def post_task_batch(
+    user_id: Annotated[int, Path()],
+    batch: TaskBatchRequest,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+) -> TaskBatchResponse:
+    """
+    Get several tasks by ID, for ID lists too long for a URL.
+
+    Args:
+        user_id: User ID from path
+        batch: Task IDs
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskBatchResponse: Found tasks in request order and missing IDs
+    """
+    verify_user_access(user_id, current_user)
+
+    return fetch_task_batch(db, user_id, batch.ids)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     user_id: Annotated[int, Path()],
     task_id: Annotated[int, Path()],
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
 ) -> Task:
     """
     Get a specific task by ID.
@@ -130,17 +479,29 @@ def update_task(
     task_id: Annotated[int, Path()],
     task_data: TaskUpdate,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
-) -> Task:
+    db: Annotated[Session, Depends(get_shard_db)],
+    request_db: Annotated[Session, Depends(get_db)],
+    idempotency: Annotated[
+        IdempotentRequest | None, Depends(get_idempotent_request)
+    ],
+) -> Task | TaskResponse | Response:
     """
     Update an existing task.
 
+    Completing an occurrence of a recurring task creates the next
+    occurrence, placed right after it. With ``WRITE_COALESCING_WINDOW_MS``
+    set, requests without an ``Idempotency-Key`` are merged with concurrent
+    updates and committed in groups (see ``app.services.coalescing``).
+
     Args:
         user_id: User ID from path
         task_id: Task ID to update
         task_data: Task update data
         current_user: Current authenticated user
         db: Database session
+        request_db: Session on the primary database used for authentication
+            (the same session as ``db`` on the default shard)
+        idempotency: Idempotency key of the request, if any
 
     Returns:
         TaskResponse: Updated task
@@ -150,6 +511,18 @@ def update_task(
     """
     verify_user_access(user_id, current_user)
 
+    if idempotency is None and write_coalescer.enabled:
+        # Return the request's connections to the pool before waiting, so
+        # the coalescer's writer never waits for a connection held by a
+        # request that is waiting for the writer
+        actor_id = current_user.id
+        db.close()
+        request_db.close()
+        return write_coalescer.submit(user_id, task_id, task_data, actor_id).result()
+
+    if idempotency and (replayed := idempotency.replay(db)):
+        return replayed
+
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
     if not task:
         raise HTTPException(
@@ -157,41 +530,317 @@ def update_task(
             detail="Task not found",
         )
 
-    # Update only provided fields
-    if task_data.title is not None:
-        task.title = task_data.title
-    if task_data.description is not None:
-        task.description = task_data.description
-    if task_data.completed is not None:
-        task.completed = task_data.completed
+    apply_task_update(db, user_id, task, task_data, current_user.id)
+
+    if replayed := commit_write(db, user_id, idempotency, status.HTTP_200_OK, task):
+        return replayed
+    db.refresh(task)
+
+    return task
+
+
+@router.post("/{task_id}/move", response_model=TaskResponse)
+def move_task(
+    user_id: Annotated[int, Path()],
+    task_id: Annotated[int, Path()],
+    move: TaskMove,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_db)],
+    idempotency: Annotated[
+        IdempotentRequest | None, Depends(get_idempotent_request)
+    ],
+) -> Task | Response:
+    """
+    Move a task directly after ``after_id`` and/or before ``before_id``.
+
+    Only the moved task's order key is rewritten.
+
+    Args:
+        user_id: User ID from path
+        task_id: Task ID to move
+        move: Neighbouring tasks at the new position
+        current_user: Current authenticated user
+        db: Database session
+        idempotency: Idempotency key of the request, if any
+
+    Returns:
+        TaskResponse: Moved task
+
+    Raises:
+        HTTPException: If a task is not found or the neighbours are invalid
+    """
+    verify_user_access(user_id, current_user)
+
+    if idempotency and (replayed := idempotency.replay(db)):
+        return replayed
+
+    tasks = {
+        task.id: task
+        for task in db.query(Task).filter(
+            Task.user_id == user_id,
+            Task.id.in_({task_id, move.after_id, move.before_id} - {None}),
+        )
+    }
+    if any(
+        requested is not None and requested not in tasks
+        for requested in (task_id, move.after_id, move.before_id)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+    if task_id in (move.after_id, move.before_id):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="A task cannot be moved next to itself",
+        )
+
+    task = tasks[task_id]
+    old_key = task.order_key
+    try:
+        reposition_task(db, task, tasks.get(move.after_id), tasks.get(move.before_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="after_id must come before before_id",
+        )
+    stage_event(
+        db,
+        user_id,
+        task_id,
+        UPDATED,
+        {"order_key": [old_key, task.order_key]},
+        current_user.id,
+    )
+
+    if replayed := commit_write(db, user_id, idempotency, status.HTTP_200_OK, task):
+        return replayed
+    db.refresh(task)
+
+    return task
+
+
+@router.get("/{task_id}/subtree", response_model=list[TaskResponse])
+def get_task_subtree(
+    user_id: Annotated[int, Path()],
+    task_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+) -> list[Task]:
+    """
+    Get a task and all its subtasks, at any depth, in a single query.
+
+    Args:
+        user_id: User ID from path
+        task_id: Root task ID
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        list[TaskResponse]: The task first, then its descendants level by level
+
+    Raises:
+        HTTPException: If task not found
+    """
+    verify_user_access(user_id, current_user)
+
+    tasks = get_subtree(db, user_id, task_id)
+    if not tasks:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+
+    return tasks
+
+
+@router.get("/{task_id}/history", response_model=list[TaskEventResponse])
+def get_task_history(
+    user_id: Annotated[int, Path()],
+    task_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_read_db)],
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    before_id: Annotated[int | None, Query()] = None,
+) -> list[TaskEvent]:
+    """
+    List the changes made to a task, newest first.
+
+    Events are written in the background, so the latest changes may take up
+    to ``HISTORY_FLUSH_SECONDS`` to appear. The history of a deleted task
+    remains available.
+
+    Args:
+        user_id: User ID from path
+        task_id: Task ID
+        current_user: Current authenticated user
+        db: Database session
+        limit: Maximum number of events to return
+        before_id: Return events with a smaller ID than this (next page)
+
+    Returns:
+        list[TaskEventResponse]: Events of the task
+    """
+    verify_user_access(user_id, current_user)
+    return list_task_events(db, user_id, task_id, limit, before_id)
+
+
+@router.put("/{task_id}/parent", response_model=TaskResponse)
+def set_task_parent(
+    user_id: Annotated[int, Path()],
+    task_id: Annotated[int, Path()],
+    parent: TaskParent,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_db)],
+) -> Task | Response:
+    """
+    Move a task and its whole subtree under another parent.
+
+    Only the task's own ``parent_id`` changes; its descendants move with it.
+    A ``parent_id`` of null makes the task a top-level task.
+
+    Args:
+        user_id: User ID from path
+        task_id: Task ID to move
+        parent: New parent task
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskResponse: Moved task
+
+    Raises:
+        HTTPException: If a task is not found or the move would create a cycle
+    """
+    verify_user_access(user_id, current_user)
+
+    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
 
-    db.commit()
+    if parent.parent_id is not None:
+        if not task_exists(db, user_id, parent.parent_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Parent task not found",
+            )
+        if is_in_subtree(db, user_id, task_id, parent.parent_id):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="A task cannot be moved under itself or its subtasks",
+            )
+
+    if task.parent_id != parent.parent_id:
+        stage_event(
+            db,
+            user_id,
+            task_id,
+            UPDATED,
+            {"parent_id": [task.parent_id, parent.parent_id]},
+            current_user.id,
+        )
+    task.parent_id = parent.parent_id
+    commit_write(db, user_id, None, status.HTTP_200_OK, task)
     db.refresh(task)
 
     return task
 
 
-@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.post("/{task_id}/complete", response_model=list[TaskResponse])
+def complete_task_subtree(
+    user_id: Annotated[int, Path()],
+    task_id: Annotated[int, Path()],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_shard_db)],
+    completed: Annotated[bool, Query()] = True,
+) -> list[Task]:
+    """
+    Mark a task and all its subtasks completed with a single UPDATE.
+
+    Recurring tasks in the subtree advance to their next occurrence.
+
+    Args:
+        user_id: User ID from path
+        task_id: Root task ID
+        current_user: Current authenticated user
+        db: Database session
+        completed: Set to false to reopen the subtree instead
+
+    Returns:
+        list[TaskResponse]: The updated subtree
+
+    Raises:
+        HTTPException: If task not found
+    """
+    verify_user_access(user_id, current_user)
+
+    changed = [
+        task for task in get_subtree(db, user_id, task_id) if task.completed != completed
+    ]
+    recurring = [task for task in changed if completed and task.recurrence]
+    for task in changed:
+        stage_event(
+            db,
+            user_id,
+            task.id,
+            UPDATED,
+            {"completed": [task.completed, completed]},
+            current_user.id,
+        )
+    if not set_subtree_completed(db, user_id, task_id, completed):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+    for task in recurring:
+        next_task = advance_recurring_task(db, task)
+        if next_task is not None:
+            stage_event(
+                db,
+                user_id,
+                next_task.id,
+                CREATED,
+                created_changes(next_task),
+                current_user.id,
+            )
+    commit_write(db, user_id, None, status.HTTP_200_OK)
+
+    return get_subtree(db, user_id, task_id)
+
+
+@router.delete(
+    "/{task_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None
+)
 def delete_task(
     user_id: Annotated[int, Path()],
     task_id: Annotated[int, Path()],
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
-) -> None:
+    db: Annotated[Session, Depends(get_shard_db)],
+    idempotency: Annotated[
+        IdempotentRequest | None, Depends(get_idempotent_request)
+    ],
+) -> Response | None:
     """
-    Delete a task.
+    Delete a task together with all its subtasks.
 
     Args:
         user_id: User ID from path
         task_id: Task ID to delete
         current_user: Current authenticated user
         db: Database session
+        idempotency: Idempotency key of the request, if any
 
     Raises:
         HTTPException: If task not found
     """
     verify_user_access(user_id, current_user)
 
+    if idempotency and (replayed := idempotency.replay(db)):
+        return replayed
+
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
     if not task:
         raise HTTPException(
@@ -199,5 +848,8 @@ def delete_task(
             detail="Task not found",
         )
 
-    db.delete(task)
-    db.commit()
+    stage_event(
+        db, user_id, task_id, DELETED, {"title": [task.title, None]}, current_user.id
+    )
+    delete_subtree(db, user_id, task_id)
+    return commit_write(db, user_id, idempotency, status.HTTP_204_NO_CONTENT)
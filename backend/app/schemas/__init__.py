@@ -1,7 +1,17 @@
 """Pydantic schemas for request/response validation."""
 
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskMove,
+    TaskParent,
+    TaskResponse,
+)
+from app.schemas.tag import TagResponse
+from app.schemas.stats import DailyCompletions, TaskStatsResponse
+from app.schemas.task_event import TaskEventResponse
+from app.schemas.task_list import TaskListCreate, TaskListResponse, ListMemberSet
 
 __all__ = [
     "UserCreate",
@@ -10,5 +20,14 @@ __all__ = [
     "Token",
     "TaskCreate",
     "TaskUpdate",
+    "TaskMove",
+    "TaskParent",
     "TaskResponse",
+    "TagResponse",
+    "DailyCompletions",
+    "TaskStatsResponse",
+    "TaskEventResponse",
+    "TaskListCreate",
+    "TaskListResponse",
+    "ListMemberSet",
 ]
@@ -0,0 +1,22 @@
+"""Task statistics Pydantic schemas."""
+
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DailyCompletions(BaseModel):
+    """Number of tasks completed on one day (UTC)."""
+
+    day: date
+    completed: int
+
+
+class TaskStatsResponse(BaseModel):
+    """Schema for a user's task counts."""
+
+    total: int
+    completed: int
+    open: int
+    # One entry per day, oldest first
+    daily: list[DailyCompletions]
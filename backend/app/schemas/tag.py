@@ -0,0 +1,10 @@
+"""Tag-related Pydantic schemas."""
+
+from pydantic import BaseModel
+
+
+class TagResponse(BaseModel):
+    """Schema for a tag with its usage count."""
+
+    name: str
+    task_count: int
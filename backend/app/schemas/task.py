@@ -1,7 +1,31 @@
 """Task-related Pydantic schemas."""
 
-from datetime import datetime
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import Annotated, Any
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.config import settings
+from app.services.recurrence import parse_rule
+
+TagName = Annotated[str, Field(min_length=1, max_length=50)]
+# Task IDs are 32-bit integers in the database
+TaskId = Annotated[int, Field(ge=1, le=2**31 - 1)]
+
+
+def _valid_rule(value: str | None) -> str | None:
+    """Reject recurrence rules the scheduler cannot expand."""
+    if value is not None:
+        parse_rule(value)
+        return value.strip().removeprefix("RRULE:").upper()
+    return value
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    """Store timestamps as naive UTC, like the rest of the schema."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class TaskCreate(BaseModel):
@@ -9,6 +33,22 @@ class TaskCreate(BaseModel):
 
     title: str = Field(..., min_length=1, max_length=200)
     description: str | None = Field(None, max_length=2000)
+    parent_id: int | None = None
+    tags: list[TagName] = Field(default_factory=list, max_length=20)
+    due_at: datetime | None = None
+    remind_at: datetime | None = None
+    # RRULE such as FREQ=WEEKLY;BYDAY=MO,WE; the series starts at due_at
+    recurrence: str | None = Field(None, max_length=255)
+
+    _utc = field_validator("due_at", "remind_at")(naive_utc)
+    _rule = field_validator("recurrence")(_valid_rule)
+
+    @model_validator(mode="after")
+    def recurrence_needs_due_date(self) -> "TaskCreate":
+        """Require a due date to anchor a recurring series."""
+        if self.recurrence is not None and self.due_at is None:
+            raise ValueError("due_at is required for a recurring task")
+        return self
 
 
 class TaskUpdate(BaseModel):
@@ -17,6 +57,35 @@ class TaskUpdate(BaseModel):
     title: str | None = Field(None, min_length=1, max_length=200)
     description: str | None = Field(None, max_length=2000)
     completed: bool | None = None
+    # Replaces the task's tags when given
+    tags: list[TagName] | None = Field(None, max_length=20)
+    # Set to null to clear
+    due_at: datetime | None = None
+    remind_at: datetime | None = None
+    recurrence: str | None = Field(None, max_length=255)
+
+    _utc = field_validator("due_at", "remind_at")(naive_utc)
+    _rule = field_validator("recurrence")(_valid_rule)
+
+
+class TaskMove(BaseModel):
+    """Schema for moving a task between two neighbouring tasks."""
+
+    after_id: int | None = None
+    before_id: int | None = None
+
+    @model_validator(mode="after")
+    def require_neighbor(self) -> "TaskMove":
+        """Require at least one neighbour."""
+        if self.after_id is None and self.before_id is None:
+            raise ValueError("after_id or before_id is required")
+        return self
+
+
+class TaskParent(BaseModel):
+    """Schema for moving a task (with its subtasks) under another parent."""
+
+    parent_id: int | None = None
 
 
 class TaskResponse(BaseModel):
@@ -26,8 +95,41 @@ class TaskResponse(BaseModel):
     title: str
     description: str | None
     completed: bool
+    completed_at: datetime | None = None
     user_id: int
     created_at: datetime
     updated_at: datetime
+    order_key: str | None = None
+    parent_id: int | None = None
+    list_id: int | None = None
+    tags: list[str] = []
+    due_at: datetime | None = None
+    remind_at: datetime | None = None
+    reminded_at: datetime | None = None
+    recurrence: str | None = None
+    # Upcoming occurrence of a recurring task, computed but not stored
+    virtual: bool = False
+    archived: bool = False
 
     model_config = {"from_attributes": True}
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tag_names(cls, tags: Any) -> Any:
+        """Accept ``Tag`` objects as well as names."""
+        return [getattr(tag, "name", tag) for tag in tags]
+
+
+class TaskBatchRequest(BaseModel):
+    """Schema for fetching several tasks by ID."""
+
+    ids: list[TaskId] = Field(
+        ..., min_length=1, max_length=settings.task_batch_max_ids
+    )
+
+
+class TaskBatchResponse(BaseModel):
+    """Schema for a batch fetch: found tasks in request order, missing IDs."""
+
+    tasks: list[TaskResponse]
+    missing: list[int]
@@ -0,0 +1,20 @@
+"""Task history Pydantic schemas."""
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class TaskEventResponse(BaseModel):
+    """Schema for an entry of a task's history."""
+
+    id: int
+    task_id: int
+    actor_id: int | None
+    action: str
+    # Changed fields as {field: [old, new]}
+    changes: dict[str, list[Any]]
+    occurred_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,29 @@
+"""Shared task list Pydantic schemas."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class TaskListCreate(BaseModel):
+    """Schema for creating a shared list."""
+
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class TaskListResponse(BaseModel):
+    """Schema for a list with the current user's role in it."""
+
+    id: int
+    owner_id: int
+    name: str
+    role: str
+
+    model_config = {"from_attributes": True}
+
+
+class ListMemberSet(BaseModel):
+    """Schema for adding a member to a list or changing their role."""
+
+    username: str = Field(..., min_length=1, max_length=50)
+    role: Literal["viewer", "editor"] = "viewer"
@@ -36,6 +36,13 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
+
+
+class RefreshRequest(BaseModel):
+    """Schema for refresh token exchange and logout."""
+
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -0,0 +1,65 @@
+"""Production server launcher.
+
+Usage:
+    python -m app.server
+
+Runs uvicorn with one worker per usable CPU (override with WEB_CONCURRENCY),
+uvloop and httptools when available, and a graceful shutdown window during
+which in-flight requests are drained after SIGTERM.
+"""
+
+import importlib.util
+import os
+
+import uvicorn
+
+from app.config import settings
+
+
+def worker_count() -> int:
+    """Return the configured worker count, defaulting to the usable CPUs."""
+    if settings.web_concurrency:
+        return settings.web_concurrency
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def main() -> None:
+    """
+    Start uvicorn with production settings.
+
+    Raises:
+        SystemExit: If the per-process task cache is combined with several
+            workers, which would serve lists other workers already changed
+    """
+    workers = worker_count()
+    if workers > 1 and settings.task_cache_url.startswith("memory://"):
+        raise SystemExit(
+            f"TASK_CACHE_URL=memory:// cannot be shared by {workers} workers; "
+            "use a redis:// cache, leave TASK_CACHE_URL empty or set "
+            "WEB_CONCURRENCY=1"
+        )
+
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        loop="uvloop" if has_uvloop else "asyncio",
+        http="httptools" if has_httptools else "h11",
+        lifespan="on",
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keep_alive_timeout,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.forwarded_allow_ips,
+        access_log=settings.debug,
+    )
+
+
+if __name__ == "__main__":
+    main()
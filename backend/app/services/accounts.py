@@ -0,0 +1,90 @@
+"""Account lifecycle services."""
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.user import User
+from app.sharding import (
+    DEFAULT_SHARD,
+    SHARDED_TABLES,
+    get_sessionmaker,
+    invalidate_shard_cache,
+    lookup_shard,
+)
+
+
+def _delete_user_rows(db: Session, user_id: int, batch_size: int) -> int:
+    """Delete a user's rows from every sharded table in bounded batches."""
+    deleted = 0
+    for table in reversed(SHARDED_TABLES):
+        primary_key = tuple_(*table.primary_key.columns)
+        batch = (
+            select(*table.primary_key.columns)
+            .where(table.c.user_id == user_id)
+            .limit(batch_size)
+        )
+        while True:
+            result = db.execute(delete(table).where(primary_key.in_(batch)))
+            db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+    return deleted
+
+
+def purge_user_account(
+    user_id: int,
+    session_factory: sessionmaker,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Delete a user and all of their data.
+
+    Task data is deleted in batches of ``batch_size`` rows, each in its own
+    transaction, so no long-running lock is taken and nothing is loaded into
+    memory. The user row is deleted last; any remaining dependent rows are
+    removed by ``ON DELETE CASCADE``. Safe to re-run after an interruption.
+
+    Args:
+        user_id: User to delete
+        session_factory: Factory for primary database sessions
+        batch_size: Rows deleted per transaction
+
+    Returns:
+        int: Number of task data rows deleted
+    """
+    directory_db = session_factory()
+    try:
+        shard, _ = lookup_shard(directory_db, user_id)
+        if shard == DEFAULT_SHARD:
+            deleted = _delete_user_rows(directory_db, user_id, batch_size)
+        else:
+            shard_db = get_sessionmaker(shard)()
+            try:
+                deleted = _delete_user_rows(shard_db, user_id, batch_size)
+                shard_db.execute(delete(User).where(User.id == user_id))
+                shard_db.commit()
+            finally:
+                shard_db.close()
+
+        directory_db.execute(delete(User).where(User.id == user_id))
+        directory_db.commit()
+        invalidate_shard_cache(user_id)
+        return deleted
+    finally:
+        directory_db.close()
+
+
+def pending_account_deletions(db: Session) -> list[int]:
+    """
+    List users whose account deletion was requested but not completed.
+
+    Args:
+        db: Database session
+
+    Returns:
+        list[int]: User IDs awaiting deletion
+    """
+    return list(
+        db.scalars(select(User.id).where(User.deletion_requested_at.is_not(None)))
+    )
@@ -0,0 +1,175 @@
+"""Archival of completed tasks into the cold ``archived_tasks`` table."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, insert, select, tuple_
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from app.models.archive import ArchivedTask
+from app.models.tag import task_tags
+from app.models.task import Task
+from app.services.cache import task_list_cache
+from app.services.ordering import next_order_key
+from app.services.tags import resolve_tags
+
+# Task columns copied to the archive and back; tags are kept by name and
+# reminder leases are dropped
+ARCHIVED_COLUMNS = [
+    "id",
+    "user_id",
+    "title",
+    "description",
+    "created_at",
+    "updated_at",
+    "completed_at",
+    "order_key",
+    "parent_id",
+    "list_id",
+    "due_at",
+    "recurrence",
+    "recurrence_start",
+    "remind_at",
+    "reminded_at",
+]
+
+
+def archive_completed_tasks(
+    db: Session,
+    older_than: timedelta,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Move completed tasks older than a cutoff into the archive.
+
+    Each batch is selected with ``FOR UPDATE SKIP LOCKED``, copied and
+    deleted in its own short transaction, so rows being edited are skipped
+    and no lock is held across batches. Tasks with subtasks stay in place,
+    since deleting them would cascade to their children.
+
+    Args:
+        db: Database session
+        older_than: Minimum age since the task was last updated
+        batch_size: Tasks moved per transaction
+
+    Returns:
+        int: Number of tasks archived
+    """
+    cutoff = datetime.utcnow() - older_than
+    archived = 0
+    child = aliased(Task)
+    has_children = exists().where(
+        child.user_id == Task.user_id, child.parent_id == Task.id
+    )
+
+    while True:
+        tasks = db.scalars(
+            select(Task)
+            .options(selectinload(Task.tags))
+            .where(Task.completed.is_(True), Task.updated_at < cutoff, ~has_children)
+            .order_by(Task.updated_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not tasks:
+            break
+
+        now = datetime.utcnow()
+        db.execute(
+            insert(ArchivedTask),
+            [
+                {
+                    **{column: getattr(task, column) for column in ARCHIVED_COLUMNS},
+                    "tags": [tag.name for tag in task.tags],
+                    "archived_at": now,
+                }
+                for task in tasks
+            ],
+        )
+        user_ids = {task.user_id for task in tasks}
+        keys = [(task.user_id, task.id) for task in tasks]
+        # The foreign key cascades too; the user_id predicates let
+        # PostgreSQL prune partitions
+        db.execute(
+            delete(task_tags).where(
+                task_tags.c.user_id.in_(user_ids),
+                tuple_(task_tags.c.user_id, task_tags.c.task_id).in_(keys),
+            )
+        )
+        db.execute(
+            delete(Task).where(
+                Task.user_id.in_(user_ids), tuple_(Task.user_id, Task.id).in_(keys)
+            )
+        )
+        db.commit()
+        for user_id in user_ids:
+            task_list_cache.invalidate(user_id)
+        archived += len(tasks)
+
+    return archived
+
+
+def list_archived_tasks(
+    db: Session,
+    user_id: int,
+    limit: int,
+    before_id: int | None = None,
+) -> list[ArchivedTask]:
+    """
+    List a user's archived tasks, newest task ID first.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        limit: Maximum number of tasks to return
+        before_id: Only return tasks with a smaller ID (keyset pagination)
+
+    Returns:
+        list[ArchivedTask]: Archived tasks
+    """
+    query = select(ArchivedTask).where(ArchivedTask.user_id == user_id)
+    if before_id is not None:
+        query = query.where(ArchivedTask.id < before_id)
+    return list(db.scalars(query.order_by(ArchivedTask.id.desc()).limit(limit)))
+
+
+def restore_archived_task(db: Session, user_id: int, task_id: int) -> Task | None:
+    """
+    Move an archived task back into the ``tasks`` table.
+
+    The task returns to its position unless another task has taken its
+    order key meanwhile, in which case it goes to the end of the user's
+    list. It is restored under its parent only if the parent is still a
+    live task.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+        task_id: ID of the archived task
+
+    Returns:
+        Task | None: The restored task, or None if it is not archived
+    """
+    archived = db.get(ArchivedTask, (user_id, task_id))
+    if archived is None:
+        return None
+
+    task = Task(
+        **{column: getattr(archived, column) for column in ARCHIVED_COLUMNS},
+        completed=True,
+    )
+    position_taken = task.order_key is None or db.scalar(
+        select(
+            exists().where(Task.user_id == user_id, Task.order_key == task.order_key)
+        )
+    )
+    if position_taken:
+        task.order_key = next_order_key(db, user_id)
+    if task.parent_id is not None and db.get(Task, (task.parent_id, user_id)) is None:
+        task.parent_id = None
+    task.tags = resolve_tags(db, user_id, archived.tags or [])
+    db.delete(archived)
+    db.add(task)
+    db.commit()
+    task_list_cache.invalidate(user_id)
+    db.refresh(task)
+    return task
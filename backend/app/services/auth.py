@@ -13,6 +13,7 @@ from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.services.refresh_tokens import is_family_revoked
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -78,6 +79,9 @@ def get_current_user(
     """
     Get the current authenticated user from JWT token.
 
+    Tokens issued with a refresh token family (``fam`` claim) are rejected
+    once the family is revoked, checked against a per-process cache.
+
     Args:
         token: JWT token from request header
         db: Database session
@@ -107,8 +111,12 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    family_id = payload.get("fam")
+    if family_id is not None and is_family_revoked(db, family_id):
+        raise credentials_exception
+
     user = db.query(User).filter(User.id == token_data.user_id).first()
-    if user is None:
+    if user is None or user.deletion_requested_at is not None:
         raise credentials_exception
 
     return user
@@ -0,0 +1,254 @@
+"""Response cache for task lists with version-based invalidation.
+
+Every user has a version counter that task writes increment. Cached list
+responses are keyed by user, version and query parameters, so bumping the
+version invalidates all of a user's entries at once; stale entries are never
+read again and age out of the LRU. A response computed while a write is in
+flight is stored under the version read before the query, which the write
+has already superseded, so it can never be served after the write. Bodies
+read from a replica are not stored at all, as the replica may not have
+applied a write whose version bump the lookup already saw.
+
+Versions are kept per key (``tasks:<user_id>``), and other per-process
+caches use the same store to learn about changes made by other processes;
+shared-list memberships are versioned as ``memberships:<user_id>``.
+
+``TASK_CACHE_URL`` selects the backend:
+
+* ``redis://host:port/db`` - shared by all workers and CLI jobs (requires
+  ``redis``); keys are prefixed with ``todo:``.
+* ``memory://`` - per-process LRU, bounded by ``TASK_CACHE_MAX_BYTES``.
+  Invalidation is only visible to the process that made the change, so the
+  server refuses it with several workers, and changes made by CLI jobs are
+  only picked up once entries expire after ``TASK_CACHE_TTL_SECONDS``.
+* empty (default) - caching disabled.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.config import settings
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache bounded by total value size.
+
+    Versions come from one counter shared by all keys, so a version is never
+    reused. Keys without a version of their own read ``_base``. The versions
+    are kept in LRU order too and, past ``max_versions``, the least recently
+    used half is dropped and ``_base`` moves past every version handed out so
+    far, so entries stored under those versions are not read again.
+    """
+
+    def __init__(
+        self, max_bytes: int, ttl_seconds: int, max_versions: int = 100_000
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_versions = max_versions
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._counter = 0
+        self._base = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._size -= len(value)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def get_version(self, key: str) -> int:
+        with self._lock:
+            version = self._versions.get(key)
+            if version is None:
+                return self._base
+            self._versions.move_to_end(key)
+            return version
+
+    def bump_version(self, key: str) -> None:
+        with self._lock:
+            self._counter += 1
+            self._versions[key] = self._counter
+            self._versions.move_to_end(key)
+            if len(self._versions) > self.max_versions:
+                for _ in range(len(self._versions) - self.max_versions // 2):
+                    self._versions.popitem(last=False)
+                self._counter += 1
+                self._base = self._counter
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._size = 0
+            # Keep the counter, so versions read before the clear stay stale
+            self._counter += 1
+            self._base = self._counter
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "versions": len(self._versions),
+            }
+
+
+class RedisCacheBackend:
+    """
+    Redis cache shared by all workers; memory is bounded by Redis eviction.
+
+    Keys live under ``namespace`` so ``clear`` leaves the rest of the database
+    alone. A version key that is missing (never written, evicted, or lost on
+    a restart or ``FLUSHDB``) is seeded with a random 62-bit value rather than
+    counting up from 0 again, so versions handed out before are not reused.
+    """
+
+    def __init__(
+        self, client: Any, ttl_seconds: int, namespace: str = "todo:"
+    ) -> None:
+        """Wrap a ``redis.Redis`` client."""
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(self.namespace + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._client.set(self.namespace + key, value, ex=self.ttl_seconds)
+
+    def get_version(self, key: str) -> int:
+        key = f"{self.namespace}{key}:version"
+        version = self._client.get(key)
+        if version is None:
+            self._client.set(key, secrets.randbits(62), nx=True)
+            version = self._client.get(key)
+        return int(version)
+
+    def bump_version(self, key: str) -> None:
+        key = f"{self.namespace}{key}:version"
+        if not self._client.set(key, secrets.randbits(62), nx=True):
+            self._client.incr(key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=f"{self.namespace}*"):
+            self._client.delete(key)
+
+    def stats(self) -> dict:
+        info = self._client.info("memory")
+        return {"bytes": info.get("used_memory"), "max_bytes": info.get("maxmemory")}
+
+
+class TaskListCache:
+    """Cache of serialized task list responses."""
+
+    def __init__(self, backend: MemoryCacheBackend | RedisCacheBackend | None) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, user_id: int, params: str) -> tuple[bytes | None, int]:
+        """
+        Look up a cached list response.
+
+        Args:
+            user_id: Owner of the tasks
+            params: Canonical form of the query parameters
+
+        Returns:
+            tuple[bytes | None, int]: Cached body (None on a miss) and the
+            version to store a freshly computed body under
+        """
+        if self.backend is None:
+            return None, 0
+
+        version = self.backend.get_version(f"tasks:{user_id}")
+        body = self.backend.get(f"tasks:{user_id}:{version}:{params}")
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body, version
+
+    def store(self, user_id: int, params: str, version: int, body: bytes) -> None:
+        """Store a list response computed under ``version``."""
+        if self.backend is not None:
+            self.backend.set(f"tasks:{user_id}:{version}:{params}", body)
+
+    def invalidate(self, user_id: int) -> None:
+        """Invalidate every cached list of a user."""
+        if self.backend is not None:
+            self.backend.bump_version(f"tasks:{user_id}")
+
+    def clear(self) -> None:
+        """Drop all entries and reset the metrics."""
+        self.hits = 0
+        self.misses = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss metrics and backend memory usage."""
+        total = self.hits + self.misses
+        backend_stats = self.backend.stats() if self.backend is not None else {}
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            **backend_stats,
+        }
+
+
+def create_task_list_cache(url: str) -> TaskListCache:
+    """Build the task list cache for a ``TASK_CACHE_URL``."""
+    if not url:
+        return TaskListCache(None)
+    if url.startswith("memory://"):
+        return TaskListCache(
+            MemoryCacheBackend(
+                settings.task_cache_max_bytes, settings.task_cache_ttl_seconds
+            )
+        )
+    if url.startswith(("redis://", "rediss://")):
+        import redis
+
+        return TaskListCache(
+            RedisCacheBackend(
+                redis.Redis.from_url(url), settings.task_cache_ttl_seconds
+            )
+        )
+    raise ValueError(f"Unsupported TASK_CACHE_URL: {url}")
+
+
+task_list_cache = create_task_list_cache(settings.task_cache_url)
@@ -0,0 +1,301 @@
+"""Write coalescing for task updates (opt-in, ``WRITE_COALESCING_WINDOW_MS``).
+
+Instead of running its own transaction, a coalesced ``PUT`` hands its update
+to the process-wide ``write_coalescer`` and waits. A background thread
+collects updates for ``window`` seconds after the first one arrives, then
+writes the whole batch in one transaction per shard: one SELECT for all the
+tasks, one UPDATE per changed task and a single commit.
+
+Consistency semantics:
+
+* A request returns only once its batch has committed, so an acknowledged
+  update is durable and visible to any later read, as without coalescing.
+* Updates to the same task within a window are checked one after the other
+  against the task as the earlier ones leave it; an update that would fail
+  on its own (a recurrence without a due date) fails alone and the others
+  are merged in arrival order, the last value of each field winning. Every
+  merged request receives the task's final state, and an update that
+  cancels out (a checkbox toggled twice) writes nothing.
+* Each task's merged update runs in its own savepoint, so the tasks of a
+  batch fail independently (a missing task fails only its own requests).
+  Should a merged update still fail when written, whether it is rejected or
+  the database raises (a constraint violation, a deadlock), its requests
+  share that outcome and the rest of the batch commits.
+* ``updated_at`` is set when the batch is written, so it follows commit order
+  like any other write and is never earlier than the request.
+* Only updates handled by the same worker are merged. Other writes to the
+  task (moves, deletes, non-coalesced updates) commit independently; as
+  without coalescing, the last commit wins.
+* Requests carrying an ``Idempotency-Key`` are never coalesced.
+
+Each coalesced request waits up to one window before its batch is written.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.task import Task
+from app.schemas.task import TaskResponse, TaskUpdate
+from app.services.cache import task_list_cache
+from app.services.task_updates import apply_task_update, check_task_update
+from app.sharding import DEFAULT_SHARD, get_sessionmaker, lookup_shard
+
+logger = logging.getLogger(__name__)
+
+
+def merge_updates(first: TaskUpdate, second: TaskUpdate) -> TaskUpdate:
+    """
+    Merge two updates of a task, the second one's fields winning.
+
+    Args:
+        first: Earlier update
+        second: Later update
+
+    Returns:
+        TaskUpdate: Update with the fields set by either
+    """
+    return TaskUpdate.model_validate(
+        {
+            **first.model_dump(include=first.model_fields_set),
+            **second.model_dump(include=second.model_fields_set),
+        }
+    )
+
+
+@dataclass
+class _PendingUpdate:
+    user_id: int
+    task_id: int
+    # Update, actor and future of each request, in arrival order
+    requests: list[tuple[TaskUpdate, int | None, Future]] = field(
+        default_factory=list
+    )
+
+    @property
+    def futures(self) -> list[Future]:
+        return [future for _, _, future in self.requests]
+
+
+class WriteCoalescer:
+    """Merges concurrent task updates and commits them in groups."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        window: float = 0.0,
+        max_batch: int = 500,
+    ) -> None:
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[tuple[int, int], _PendingUpdate] = {}
+        self._lock = threading.Lock()
+        self._arrived = threading.Event()
+        self._full = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether updates should be coalesced."""
+        return self.window > 0
+
+    def submit(
+        self,
+        user_id: int,
+        task_id: int,
+        data: TaskUpdate,
+        actor_id: int | None = None,
+    ) -> Future:
+        """
+        Queue a task update for the next batch.
+
+        The writer thread is started on first use.
+
+        Args:
+            user_id: Owner of the task
+            task_id: Task to update
+            data: Task update data
+            actor_id: User making the change
+
+        Returns:
+            Future: Resolves to the task's ``TaskResponse`` once the batch is
+            committed, or to the ``HTTPException`` the update failed with
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self.start()
+            pending = self._pending.get((user_id, task_id))
+            if pending is None:
+                pending = _PendingUpdate(user_id, task_id)
+                self._pending[(user_id, task_id)] = pending
+            pending.requests.append((data, actor_id, future))
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+        self._arrived.set()
+        return future
+
+    def flush(self) -> int:
+        """
+        Write every pending update, one transaction per shard.
+
+        Returns:
+            int: Number of tasks in the batch
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._arrived.clear()
+            self._full.clear()
+        if not batch:
+            return 0
+
+        by_shard: dict[str, list[_PendingUpdate]] = {}
+        directory_db = self.session_factory()
+        try:
+            for pending in batch.values():
+                shard, _ = lookup_shard(directory_db, pending.user_id)
+                by_shard.setdefault(shard, []).append(pending)
+        finally:
+            directory_db.close()
+
+        for shard, updates in by_shard.items():
+            factory = (
+                self.session_factory
+                if shard == DEFAULT_SHARD
+                else get_sessionmaker(shard)
+            )
+            db = factory()
+            try:
+                self._write(db, updates)
+            except Exception as exc:
+                logger.exception("Coalesced write of %s tasks failed", len(updates))
+                for pending in updates:
+                    for future in pending.futures:
+                        if not future.done():
+                            future.set_exception(exc)
+            finally:
+                db.close()
+        return len(batch)
+
+    def _write(self, db: Session, updates: list[_PendingUpdate]) -> None:
+        """Apply a shard's updates, commit once and resolve the futures."""
+        keys = [(pending.user_id, pending.task_id) for pending in updates]
+        tasks = {
+            (task.user_id, task.id): task
+            for task in db.scalars(
+                select(Task).where(tuple_(Task.user_id, Task.id).in_(keys))
+            )
+        }
+
+        failed: dict[tuple[int, int], Exception] = {}
+        rejected: dict[Future, HTTPException] = {}
+        # A fixed lock order keeps concurrent batches from deadlocking
+        for pending in sorted(updates, key=lambda p: (p.user_id, p.task_id)):
+            key = (pending.user_id, pending.task_id)
+            task = tasks.get(key)
+            if task is None:
+                failed[key] = HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Task not found",
+                )
+                continue
+
+            merged: TaskUpdate | None = None
+            actor_id = None
+            due_at = task.due_at
+            for data, request_actor_id, future in pending.requests:
+                try:
+                    check_task_update(due_at, data)
+                except HTTPException as exc:
+                    rejected[future] = exc
+                    continue
+                if "due_at" in data.model_fields_set:
+                    due_at = data.due_at
+                merged = data if merged is None else merge_updates(merged, data)
+                actor_id = request_actor_id
+            if merged is None:
+                continue
+            try:
+                with db.begin_nested():
+                    apply_task_update(db, pending.user_id, task, merged, actor_id)
+            except HTTPException as exc:
+                failed[key] = exc
+            except SQLAlchemyError as exc:
+                logger.exception("Coalesced update of task %s failed", pending.task_id)
+                failed[key] = exc
+        db.commit()
+        for user_id in {pending.user_id for pending in updates}:
+            task_list_cache.invalidate(user_id)
+
+        written = {
+            (task.user_id, task.id): TaskResponse.model_validate(task)
+            for task in db.scalars(
+                select(Task)
+                .options(selectinload(Task.tags))
+                .where(tuple_(Task.user_id, Task.id).in_(list(tasks)))
+                .execution_options(populate_existing=True)
+            )
+        }
+        for pending in updates:
+            key = (pending.user_id, pending.task_id)
+            for future in pending.futures:
+                if future in rejected:
+                    future.set_exception(rejected[future])
+                elif key in failed:
+                    future.set_exception(failed[key])
+                elif key in written:
+                    future.set_result(written[key])
+                else:
+                    # Deleted by another request after the batch's SELECT
+                    future.set_exception(
+                        HTTPException(
+                            status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Task not found",
+                        )
+                    )
+
+    def run(self) -> None:
+        """Write batches until ``stop`` is called."""
+        while not self._stop.is_set():
+            self._arrived.wait()
+            # Collect updates for one window, or until the batch is full
+            self._full.wait(self.window)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Coalesced write failed")
+
+    def start(self) -> None:
+        """Run the writer in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="write-coalescer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread once the pending updates are written."""
+        self._stop.set()
+        self._arrived.set()
+        self._full.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+write_coalescer = WriteCoalescer(
+    SessionLocal,
+    window=settings.write_coalescing_window_ms / 1000,
+    max_batch=settings.write_coalescing_max_batch,
+)
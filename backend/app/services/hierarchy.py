@@ -0,0 +1,171 @@
+"""Subtask trees queried with recursive CTEs.
+
+Every operation on a subtree is a single statement: the recursive CTE walks
+``(user_id, parent_id)`` with the ``ix_tasks_user_id_parent_id`` index, one
+level per iteration, inside the database.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import CTE, case, delete, exists, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.services.stats import track_bulk_completion, track_bulk_delete
+
+
+def subtree_cte(user_id: int, task_id: int) -> CTE:
+    """
+    Build a recursive CTE of a task and all its descendants.
+
+    Args:
+        user_id: Owner of the tasks
+        task_id: Root of the subtree
+
+    Returns:
+        CTE: Rows of ``(id, depth)``, the root having depth 0
+    """
+    tree = (
+        select(Task.id, literal(0).label("depth"))
+        .where(Task.user_id == user_id, Task.id == task_id)
+        .cte("subtree", recursive=True)
+    )
+    return tree.union_all(
+        select(Task.id, (tree.c.depth + 1).label("depth")).where(
+            Task.user_id == user_id, Task.parent_id == tree.c.id
+        )
+    )
+
+
+def get_subtree(db: Session, user_id: int, task_id: int) -> list[Task]:
+    """
+    Fetch a task and all its descendants in one query.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        task_id: Root of the subtree
+
+    Returns:
+        list[Task]: Tasks ordered by depth, then by their order key; empty if
+        the root does not exist
+    """
+    tree = subtree_cte(user_id, task_id)
+    return list(
+        db.scalars(
+            select(Task)
+            .join(tree, Task.id == tree.c.id)
+            .where(Task.user_id == user_id)
+            .order_by(tree.c.depth, Task.order_key, Task.id)
+        )
+    )
+
+
+def is_in_subtree(db: Session, user_id: int, task_id: int, candidate_id: int) -> bool:
+    """
+    Check whether a task is ``task_id`` itself or one of its descendants.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        task_id: Root of the subtree
+        candidate_id: Task to look for
+
+    Returns:
+        bool: True if ``candidate_id`` is in the subtree
+    """
+    tree = subtree_cte(user_id, task_id)
+    return db.scalar(select(tree.c.id).where(tree.c.id == candidate_id)) is not None
+
+
+def subtree_leaves_list(db: Session, user_id: int, task_id: int, list_id: int) -> bool:
+    """
+    Check whether any task of a subtree is outside a list.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        task_id: Root of the subtree
+        list_id: List the subtree is expected to belong to
+
+    Returns:
+        bool: True if a task of the subtree is in another list or in none
+    """
+    tree = subtree_cte(user_id, task_id)
+    return db.scalar(
+        select(
+            exists().where(
+                Task.user_id == user_id,
+                Task.id.in_(select(tree.c.id)),
+                Task.list_id.is_distinct_from(list_id),
+            )
+        )
+    )
+
+
+def set_subtree_completed(
+    db: Session, user_id: int, task_id: int, completed: bool
+) -> int:
+    """
+    Mark a task and all its descendants completed (or not) in one UPDATE.
+
+    The owner's counters are adjusted for the tasks that change state. The
+    caller commits.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        task_id: Root of the subtree
+        completed: New completion state
+
+    Returns:
+        int: Number of tasks updated
+    """
+    tree = subtree_cte(user_id, task_id)
+    in_tree = Task.id.in_(select(tree.c.id))
+    now = datetime.utcnow()
+    track_bulk_completion(db, user_id, in_tree, completed, now)
+    result = db.execute(
+        update(Task)
+        .where(Task.user_id == user_id, in_tree)
+        .values(
+            completed=completed,
+            # Tasks already in the requested state keep their completion time
+            completed_at=case(
+                (Task.completed.is_(completed), Task.completed_at),
+                else_=now if completed else None,
+            ),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.expire_all()
+    return result.rowcount
+
+
+def delete_subtree(db: Session, user_id: int, task_id: int) -> int:
+    """
+    Delete a task and all its descendants in one DELETE.
+
+    The foreign key also cascades, but deleting the subtree explicitly keeps
+    the behaviour independent of foreign key enforcement. The owner's
+    counters are adjusted. The caller commits.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        task_id: Root of the subtree
+
+    Returns:
+        int: Number of tasks deleted
+    """
+    tree = subtree_cte(user_id, task_id)
+    in_tree = Task.id.in_(select(tree.c.id))
+    track_bulk_delete(db, user_id, in_tree)
+    result = db.execute(
+        delete(Task)
+        .where(Task.user_id == user_id, in_tree)
+        .execution_options(synchronize_session=False)
+    )
+    db.expire_all()
+    return result.rowcount
@@ -0,0 +1,542 @@
+"""Task activity history, written off the request path.
+
+Task writes stage each change as an event on their session with
+``stage_event``; once the session commits, the events are handed to the
+process-wide ``history_recorder`` (and discarded on rollback). Recording only
+appends the event to a bounded in-memory queue; a background thread writes
+the queue in batches of ``HISTORY_BATCH_SIZE`` (one multi-row INSERT per
+shard) at least every ``HISTORY_FLUSH_SECONDS``.
+
+Delivery is at least once: a batch that fails because the database cannot
+be reached is kept and retried, and on shutdown the queue is drained, with
+events that still cannot be written spooled to ``HISTORY_SPOOL_DIR`` and
+picked up by the next start. A batch the database rejects for its content is
+split in halves until the offending events are isolated; those are
+dead-lettered (logged with their content and counted) so they cannot hold
+back the events queued behind them.
+When the queue is full, recording waits up to ``HISTORY_ENQUEUE_TIMEOUT_MS``
+for room and then drops the event (logged and counted), so a database outage
+cannot stall task writes.
+
+On PostgreSQL ``task_events`` is partitioned by month; ``maintain_partitions``
+creates the upcoming partitions and drops those past the retention period.
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.sharding import DEFAULT_SHARD, get_sessionmaker, lookup_shard
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# Task fields whose changes are recorded
+TRACKED_FIELDS = (
+    "title",
+    "description",
+    "completed",
+    "parent_id",
+    "list_id",
+    "order_key",
+    "tags",
+    "due_at",
+    "remind_at",
+    "recurrence",
+)
+
+# Session.info key of the events staged until commit
+STAGED_EVENTS = "history_events"
+
+PARTITION_NAME = re.compile(r"^task_events_y(\d{4})m(\d{2})$")
+
+
+def task_values(task: Task, fields: Iterable[str]) -> dict[str, Any]:
+    """
+    Read task fields as JSON-compatible values.
+
+    Args:
+        task: Task to read
+        fields: Field names (tags are read as a sorted list of names)
+
+    Returns:
+        dict[str, Any]: Values by field name
+    """
+    values = {}
+    for field in fields:
+        value = getattr(task, field)
+        if field == "tags":
+            value = sorted(tag.name for tag in value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        values[field] = value
+    return values
+
+
+def diff_values(before: dict[str, Any], after: dict[str, Any]) -> dict[str, list]:
+    """
+    Compare two sets of field values.
+
+    Args:
+        before: Values before the change
+        after: Values after the change
+
+    Returns:
+        dict[str, list]: ``[old, new]`` of every field that changed
+    """
+    return {
+        field: [before.get(field), value]
+        for field, value in after.items()
+        if before.get(field) != value
+    }
+
+
+def created_changes(task: Task) -> dict[str, list]:
+    """
+    Describe a new task as changes from nothing.
+
+    Args:
+        task: Flushed new task
+
+    Returns:
+        dict[str, list]: ``[None, value]`` of every field that is set
+    """
+    return {
+        field: [None, value]
+        for field, value in task_values(task, TRACKED_FIELDS).items()
+        if value is not None and value != []
+    }
+
+
+def is_transient(exc: Exception) -> bool:
+    """
+    Check whether a failed write may succeed later as it is.
+
+    Args:
+        exc: Exception raised by the write
+
+    Returns:
+        bool: True for lost connections and timeouts, False for errors
+        caused by the data written
+    """
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated or isinstance(
+            exc, (OperationalError, InterfaceError)
+        )
+    return isinstance(exc, (OSError, PoolTimeoutError))
+
+
+class HistoryRecorder:
+    """Buffers task events in memory and writes them in batches."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        max_events: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 0.05,
+        spool_dir: str = "history-spool",
+        enabled: bool = True,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.spool_dir = Path(spool_dir)
+        self.enabled = enabled
+        self.dropped = 0
+        self.dead_lettered = 0
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_events)
+        # Events taken from the queue but not written yet
+        self._backlog: list[dict[str, Any]] = []
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting to be written."""
+        return self._queue.qsize() + len(self._backlog)
+
+    def record(
+        self,
+        user_id: int,
+        task_id: int,
+        action: str,
+        changes: dict[str, Any],
+        actor_id: int | None = None,
+        occurred_at: datetime | None = None,
+    ) -> bool:
+        """
+        Queue an event for a task write that has been committed.
+
+        Args:
+            user_id: Owner of the task
+            task_id: Task that changed
+            action: ``created``, ``updated`` or ``deleted``
+            changes: Changed fields as ``{field: [old, new]}``
+            actor_id: User who made the change
+            occurred_at: Time of the change; defaults to now
+
+        Returns:
+            bool: False if the event was dropped
+        """
+        if not self.enabled:
+            return False
+        entry = {
+            "user_id": user_id,
+            "task_id": task_id,
+            "actor_id": actor_id,
+            "action": action,
+            "changes": changes,
+            "occurred_at": occurred_at or datetime.utcnow(),
+        }
+        try:
+            self._queue.put(entry, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("History queue full; dropped event for task %s", task_id)
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _write(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Insert events on their owners' shards; return those not written."""
+        by_shard: dict[str, list[dict[str, Any]]] = {}
+        directory_db = self.session_factory()
+        try:
+            for entry in events:
+                shard, _ = lookup_shard(directory_db, entry["user_id"])
+                by_shard.setdefault(shard, []).append(entry)
+        finally:
+            directory_db.close()
+
+        failed = []
+        for shard, shard_events in by_shard.items():
+            factory = (
+                self.session_factory
+                if shard == DEFAULT_SHARD
+                else get_sessionmaker(shard)
+            )
+            failed.extend(self._insert(factory, shard_events))
+        return failed
+
+    def _insert(
+        self, factory: sessionmaker, events: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Insert events on one shard; return those to retry.
+
+        A rejected batch is bisected; a single rejected event is
+        dead-lettered.
+        """
+        try:
+            db = factory()
+            try:
+                db.execute(insert(TaskEvent), events)
+                db.commit()
+            finally:
+                db.close()
+        except Exception as exc:
+            if is_transient(exc):
+                logger.exception("Writing %s history events failed", len(events))
+                return events
+            if len(events) > 1:
+                middle = len(events) // 2
+                return self._insert(factory, events[:middle]) + self._insert(
+                    factory, events[middle:]
+                )
+            self.dead_lettered += 1
+            logger.exception(
+                "Dead-lettered history event %s",
+                json.dumps(events[0], default=str),
+            )
+        return []
+
+    def flush(self) -> int:
+        """
+        Write one batch of events.
+
+        Events that could not be written because the database was
+        unreachable stay in the backlog for the next flush.
+
+        Returns:
+            int: Number of events written
+        """
+        with self._flush_lock:
+            while len(self._backlog) < self.batch_size:
+                try:
+                    self._backlog.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = self._backlog[: self.batch_size]
+            if not batch:
+                return 0
+            dead_lettered = self.dead_lettered
+            failed = self._write(batch)
+            self._backlog = failed + self._backlog[self.batch_size :]
+            return len(batch) - len(failed) - (self.dead_lettered - dead_lettered)
+
+    def drain(self) -> int:
+        """
+        Write batches until nothing is left or a batch fails.
+
+        Returns:
+            int: Number of events written
+        """
+        written = 0
+        while self.pending:
+            dead_lettered = self.dead_lettered
+            count = self.flush()
+            if count == 0 and self.dead_lettered == dead_lettered:
+                break
+            written += count
+        return written
+
+    def run(self) -> None:
+        """Flush until ``stop`` is called."""
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("History flush failed")
+
+    def start(self) -> None:
+        """Queue spooled events from a previous run and start the writer."""
+        self._load_spool()
+        self._thread = threading.Thread(target=self.run, name="history", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer, write what is queued and spool the rest."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.drain()
+        except Exception:
+            logger.exception("History drain failed")
+        self._spool()
+
+    def clear(self) -> None:
+        """Discard every queued event."""
+        with self._flush_lock:
+            self._backlog = []
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _spool(self) -> None:
+        """Save the events that could not be written to a spool file."""
+        with self._flush_lock:
+            events = self._backlog
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._backlog = []
+        if not events:
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spool_dir / f"{os.getpid()}-{time.time_ns()}.jsonl"
+        with path.open("w") as spool:
+            for entry in events:
+                spool.write(json.dumps(entry, default=datetime.isoformat) + "\n")
+        logger.warning("Spooled %s unwritten history events to %s", len(events), path)
+
+    def _load_spool(self) -> None:
+        """Move the events of spool files left by previous runs to the backlog."""
+        if not self.spool_dir.is_dir():
+            return
+        for path in sorted(self.spool_dir.glob("*.jsonl")):
+            claimed = path.with_suffix(f".{os.getpid()}")
+            try:
+                # Another worker starting at the same time may claim it first
+                path.rename(claimed)
+            except OSError:
+                continue
+            with claimed.open() as spool:
+                for line in spool:
+                    entry = json.loads(line)
+                    entry["occurred_at"] = datetime.fromisoformat(entry["occurred_at"])
+                    self._backlog.append(entry)
+            claimed.unlink()
+
+
+def stage_event(
+    db: Session,
+    user_id: int,
+    task_id: int,
+    action: str,
+    changes: dict[str, Any],
+    actor_id: int | None = None,
+) -> None:
+    """
+    Record a task event once the session's transaction commits.
+
+    Args:
+        db: Session holding the task write
+        user_id: Owner of the task
+        task_id: Task that changed
+        action: ``created``, ``updated`` or ``deleted``
+        changes: Changed fields as ``{field: [old, new]}``
+        actor_id: User who made the change
+    """
+    db.info.setdefault(STAGED_EVENTS, []).append(
+        {
+            "user_id": user_id,
+            "task_id": task_id,
+            "actor_id": actor_id,
+            "action": action,
+            "changes": changes,
+            "occurred_at": datetime.utcnow(),
+        }
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _record_staged_events(session: Session) -> None:
+    """Queue the staged events once the outermost transaction commits."""
+    if session.in_nested_transaction():
+        return
+    for staged in session.info.pop(STAGED_EVENTS, []):
+        history_recorder.record(**staged)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged_events(session: Session, previous_transaction) -> None:
+    """Drop the staged events when the outermost transaction rolls back."""
+    if previous_transaction.parent is None:
+        session.info.pop(STAGED_EVENTS, None)
+
+
+def list_task_events(
+    db: Session,
+    user_id: int,
+    task_id: int,
+    limit: int,
+    before_id: int | None = None,
+) -> list[TaskEvent]:
+    """
+    List the history of a task, newest first.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+        task_id: Task ID
+        limit: Maximum number of events to return
+        before_id: Only return events with a smaller ID (keyset pagination)
+
+    Returns:
+        list[TaskEvent]: Events of the task
+    """
+    query = select(TaskEvent).where(
+        TaskEvent.user_id == user_id, TaskEvent.task_id == task_id
+    )
+    if before_id is not None:
+        query = query.where(TaskEvent.id < before_id)
+    return list(db.scalars(query.order_by(TaskEvent.id.desc()).limit(limit)))
+
+
+def _month_start(day: date, months: int = 0) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def maintain_partitions(
+    db: Session, today: date, months_ahead: int, retention_months: int
+) -> tuple[list[str], list[str]]:
+    """
+    Create upcoming monthly partitions and drop expired ones (PostgreSQL).
+
+    Partitions must exist before their month starts: once rows of a month
+    have landed in the default partition, its partition can no longer be
+    created.
+
+    Args:
+        db: Session on a shard
+        today: Current date
+        months_ahead: Months after the current one to create partitions for
+        retention_months: Months of history to keep, or 0 to keep everything
+
+    Returns:
+        tuple[list[str], list[str]]: Names of the created and dropped
+        partitions
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return [], []
+
+    existing = set(
+        db.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = 'task_events'"
+            )
+        )
+    )
+
+    created = []
+    for offset in range(months_ahead + 1):
+        start = _month_start(today, offset)
+        name = f"task_events_y{start.year}m{start.month:02d}"
+        if name not in existing:
+            db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF task_events "
+                    f"FOR VALUES FROM ('{start}') TO ('{_month_start(start, 1)}')"
+                )
+            )
+            created.append(name)
+
+    dropped = []
+    if retention_months > 0:
+        cutoff = _month_start(today, -retention_months)
+        for name in sorted(existing):
+            match = PARTITION_NAME.match(name)
+            if match and date(int(match[1]), int(match[2]), 1) < cutoff:
+                db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+
+    db.commit()
+    return created, dropped
+
+
+history_recorder = HistoryRecorder(
+    SessionLocal,
+    max_events=settings.history_buffer_size,
+    batch_size=settings.history_batch_size,
+    flush_interval=settings.history_flush_seconds,
+    enqueue_timeout=settings.history_enqueue_timeout_ms / 1000,
+    spool_dir=settings.history_spool_dir,
+    enabled=settings.history_enabled,
+)
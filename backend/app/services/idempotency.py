@@ -0,0 +1,128 @@
+"""Idempotency-Key handling for task write endpoints."""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Annotated
+
+from fastapi import Header, HTTPException, Path, Request, Response, status
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.idempotency import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotentRequest:
+    """A write request carrying an ``Idempotency-Key`` header."""
+
+    def __init__(self, user_id: int, key: str, fingerprint: str) -> None:
+        self.user_id = user_id
+        self.key = key
+        self.fingerprint = fingerprint
+
+    def replay(self, db: Session) -> Response | None:
+        """
+        Return the stored response for this key, if any.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Response | None: The original response, or None on first use
+
+        Raises:
+            HTTPException: If the key was used for a different request
+        """
+        record = db.get(IdempotencyKey, (self.user_id, self.key))
+        if record is None:
+            return None
+
+        if record.expires_at < datetime.utcnow():
+            db.delete(record)
+            db.flush()
+            return None
+
+        if record.fingerprint != self.fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            )
+
+        return Response(
+            content=record.response_body,
+            status_code=record.status_code,
+            media_type="application/json" if record.response_body else None,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    def save(self, db: Session, status_code: int, body: str | None = None) -> None:
+        """
+        Stage the response for this key in the caller's transaction.
+
+        Args:
+            db: Database session performing the write
+            status_code: Response status code
+            body: Serialized JSON response body
+        """
+        now = datetime.utcnow()
+        db.add(
+            IdempotencyKey(
+                user_id=self.user_id,
+                key=self.key,
+                fingerprint=self.fingerprint,
+                status_code=status_code,
+                response_body=body,
+                created_at=now,
+                expires_at=now + timedelta(hours=settings.idempotency_key_ttl_hours),
+            )
+        )
+
+
+async def get_idempotent_request(
+    request: Request,
+    user_id: Annotated[int, Path()],
+    idempotency_key: Annotated[
+        str | None, Header(alias="Idempotency-Key", max_length=255)
+    ] = None,
+) -> IdempotentRequest | None:
+    """
+    Dependency that reads the ``Idempotency-Key`` header.
+
+    The request fingerprint covers the method, path and body, so a key
+    reused for a different request is rejected instead of replayed.
+
+    Args:
+        request: Incoming request
+        user_id: User ID from path
+        idempotency_key: Client-chosen key for this write
+
+    Returns:
+        IdempotentRequest | None: None when the header is absent
+    """
+    if idempotency_key is None:
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.url.path.encode())
+    digest.update(await request.body())
+    return IdempotentRequest(user_id, idempotency_key, digest.hexdigest())
+
+
+def purge_expired_keys(db: Session) -> int:
+    """
+    Delete expired idempotency keys.
+
+    Args:
+        db: Database session
+
+    Returns:
+        int: Number of keys deleted
+    """
+    result = db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,272 @@
+"""Manual task ordering with fractional (lexicographic) order keys.
+
+Tasks are listed by ``order_key``, a string of base-36 digits (``0-9a-z``)
+compared lexicographically. A key never ends in ``0``, so there is always
+room for another key between any two, and moving a task only rewrites that
+task's key. Appending increments the last key as a fixed-width number, so
+keys only grow when tasks are repeatedly dropped into the same gap; the
+``rebalance-order`` command rewrites the keys of users whose keys grew
+longer than ``ORDER_KEY_MAX_LENGTH``.
+"""
+
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.services.cache import task_list_cache
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Key of a user's first task: mid-range, with room to increment and decrement
+FIRST_KEY = "i0000001"
+
+
+def _check_key(key: str) -> None:
+    if not key or key[-1] == "0" or any(char not in DIGITS for char in key):
+        raise ValueError(f"Invalid order key: {key!r}")
+
+
+def key_between(lower: str | None, upper: str | None) -> str:
+    """
+    Return a key sorting strictly between two keys.
+
+    Args:
+        lower: Key to sort after, or None for no lower bound
+        upper: Key to sort before, or None for no upper bound
+
+    Returns:
+        str: The shortest midpoint key
+
+    Raises:
+        ValueError: If a key is invalid or ``lower`` does not sort before
+            ``upper``
+    """
+    for key in (lower, upper):
+        if key is not None:
+            _check_key(key)
+    if lower is not None and upper is not None and lower >= upper:
+        raise ValueError(f"{lower!r} does not sort before {upper!r}")
+
+    lower = lower or ""
+    digits = []
+    index = 0
+    while True:
+        low = DIGITS.index(lower[index]) if index < len(lower) else 0
+        high = (
+            DIGITS.index(upper[index])
+            if upper is not None and index < len(upper)
+            else BASE
+        )
+        if high - low > 1:
+            digits.append(DIGITS[(low + high) // 2])
+            return "".join(digits)
+        digits.append(DIGITS[low])
+        if high - low == 1:
+            # The prefix is now below ``upper``; only ``lower`` still bounds it
+            upper = None
+        index += 1
+
+
+def _step(key: str, delta: int) -> str | None:
+    """Add ``delta`` to a key read as a fixed-width base-36 number."""
+    value = 0
+    for char in key:
+        value = value * BASE + DIGITS.index(char)
+    value += delta
+    if value < 0 or value >= BASE ** len(key):
+        return None
+    digits = []
+    for _ in key:
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits))
+
+
+def key_after(key: str) -> str:
+    """
+    Return a key sorting after ``key``, keeping its length when possible.
+
+    Args:
+        key: Current last key
+
+    Returns:
+        str: A key greater than ``key``
+    """
+    _check_key(key)
+    stepped = _step(key, 1)
+    if stepped is not None and stepped.endswith("0"):
+        stepped = _step(stepped, 1)
+    return stepped if stepped is not None else key_between(key, None)
+
+
+def key_before(key: str) -> str:
+    """
+    Return a key sorting before ``key``, keeping its length when possible.
+
+    Args:
+        key: Current first key
+
+    Returns:
+        str: A key smaller than ``key``
+    """
+    _check_key(key)
+    stepped = _step(key, -1)
+    if stepped is not None and stepped.endswith("0"):
+        stepped = _step(stepped, -1)
+    return stepped if stepped is not None else key_between(None, key)
+
+
+def spaced_keys(count: int) -> list[str]:
+    """
+    Return ``count`` ascending keys of equal length, spread over the key space.
+
+    Args:
+        count: Number of keys
+
+    Returns:
+        list[str]: Keys with wide gaps for later moves
+    """
+    width = 4
+    while BASE ** (width - 2) < count + 1:
+        width += 1
+    step = BASE**width // (count + 1)
+    keys = []
+    for position in range(1, count + 1):
+        key = _step("0" * width, step * position)
+        keys.append(key if not key.endswith("0") else _step(key, 1))
+    return keys
+
+
+def next_order_key(db: Session, user_id: int) -> str:
+    """
+    Return the key placing a new task after all of a user's tasks.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+
+    Returns:
+        str: Order key for an appended task
+    """
+    last = db.scalar(select(func.max(Task.order_key)).where(Task.user_id == user_id))
+    return key_after(last) if last is not None else FIRST_KEY
+
+
+def _neighbor_key(db: Session, task: Task, anchor: Task, after: bool) -> str | None:
+    """Return the key next to ``anchor`` in list order, ignoring ``task``."""
+    position = tuple_(Task.order_key, Task.id)
+    query = select(Task.order_key).where(
+        Task.user_id == anchor.user_id, Task.id != task.id
+    )
+    if after:
+        query = query.where(position > (anchor.order_key, anchor.id)).order_by(
+            Task.order_key, Task.id
+        )
+    else:
+        query = query.where(position < (anchor.order_key, anchor.id)).order_by(
+            Task.order_key.desc(), Task.id.desc()
+        )
+    return db.scalar(query.limit(1))
+
+
+def reposition_task(
+    db: Session,
+    task: Task,
+    after: Task | None,
+    before: Task | None,
+) -> None:
+    """
+    Give a task the order key placing it between two tasks.
+
+    With only one neighbour given, the other is the task next to it in the
+    current order. Tasks created concurrently can share a key; if the move
+    falls between two such tasks, the user's keys are rebalanced first.
+
+    Args:
+        db: Database session
+        task: Task being moved
+        after: Task to place ``task`` directly after, if any
+        before: Task to place ``task`` directly before, if any
+
+    Raises:
+        ValueError: If ``after`` does not come before ``before``
+    """
+    for attempt in range(2):
+        lower = after.order_key if after is not None else None
+        upper = before.order_key if before is not None else None
+        if after is not None and before is None:
+            upper = _neighbor_key(db, task, after, after=True)
+        if before is not None and after is None:
+            lower = _neighbor_key(db, task, before, after=False)
+
+        if lower is not None and upper is not None and lower == upper and attempt == 0:
+            rebalance_order_keys(db, task.user_id)
+            continue
+        break
+
+    if lower is None and upper is None:
+        task.order_key = FIRST_KEY
+    elif upper is None:
+        task.order_key = key_after(lower)
+    elif lower is None:
+        task.order_key = key_before(upper)
+    else:
+        task.order_key = key_between(lower, upper)
+
+
+def rebalance_order_keys(db: Session, user_id: int) -> int:
+    """
+    Rewrite a user's order keys as short, evenly spaced keys.
+
+    The current order is preserved. The rows are locked for the rest of the
+    transaction; the caller commits.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+
+    Returns:
+        int: Number of tasks rewritten
+    """
+    ids = db.scalars(
+        select(Task.id)
+        .where(Task.user_id == user_id)
+        .order_by(Task.order_key, Task.id)
+        .with_for_update()
+    ).all()
+    if ids:
+        db.execute(
+            update(Task),
+            [
+                {"id": task_id, "user_id": user_id, "order_key": key}
+                for task_id, key in zip(ids, spaced_keys(len(ids)))
+            ],
+        )
+        db.expire_all()
+    return len(ids)
+
+
+def rebalance_long_keys(db: Session, max_length: int) -> int:
+    """
+    Rebalance the order keys of every user with a key longer than a limit.
+
+    Each user is rebalanced in its own transaction.
+
+    Args:
+        db: Database session
+        max_length: Longest acceptable key
+
+    Returns:
+        int: Number of users rebalanced
+    """
+    user_ids = db.scalars(
+        select(Task.user_id)
+        .where(func.length(Task.order_key) > max_length)
+        .distinct()
+    ).all()
+    for user_id in user_ids:
+        rebalance_order_keys(db, user_id)
+        db.commit()
+        task_list_cache.invalidate(user_id)
+    return len(user_ids)
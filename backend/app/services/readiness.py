@@ -0,0 +1,144 @@
+"""Readiness probe checking database connectivity and pool headroom."""
+
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.database import engine, replica_engines
+from app.sharding import shard_engines
+
+READY = "ready"
+DEGRADED = "degraded"
+UNAVAILABLE = "unavailable"
+
+
+def _pool_stats(db_engine: Engine, max_overflow: int) -> dict:
+    """Return pool occupancy for engines using a sized pool."""
+    pool = db_engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    capacity = pool.size() + max(max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "capacity": capacity,
+        "headroom": capacity - checked_out,
+    }
+
+
+class ReadinessProbe:
+    """Checks database engines and caches the outcome for a short interval."""
+
+    def __init__(
+        self,
+        engines: dict[str, Engine],
+        cache_seconds: float,
+        wait_threshold_ms: float,
+        max_overflow: int = settings.db_max_overflow,
+    ) -> None:
+        self.engines = engines
+        self.cache_seconds = cache_seconds
+        self.wait_threshold_ms = wait_threshold_ms
+        self.max_overflow = max_overflow
+        self._result: dict | None = None
+        self._checked_at = 0.0
+        # Held by the probe running a check
+        self._check_lock = threading.Lock()
+
+    def check_engine(self, db_engine: Engine) -> dict:
+        """
+        Check one engine.
+
+        The time taken to check a connection out of the pool is reported as
+        the pool wait; it grows when requests queue for connections. A pool
+        without an idle connection or room to open one is reported degraded
+        from its statistics, without queueing behind the requests.
+
+        Args:
+            db_engine: Engine to check
+
+        Returns:
+            dict: Status, pool wait in milliseconds and pool occupancy
+        """
+        pool = _pool_stats(db_engine, self.max_overflow)
+        if pool and pool["headroom"] <= 0 and not pool["idle"]:
+            # Every pooled connection is busy: the database is up but saturated
+            return {"status": DEGRADED, "error": "pool exhausted", **pool}
+
+        started = time.perf_counter()
+        try:
+            with db_engine.connect() as connection:
+                wait_ms = (time.perf_counter() - started) * 1000
+                connection.execute(text("SELECT 1"))
+        except PoolTimeoutError:
+            # The pool filled up after its statistics were read
+            return {
+                "status": DEGRADED,
+                "error": "pool exhausted",
+                **_pool_stats(db_engine, self.max_overflow),
+            }
+        except Exception as exc:
+            return {"status": UNAVAILABLE, "error": type(exc).__name__}
+
+        pool = _pool_stats(db_engine, self.max_overflow)
+        degraded = wait_ms > self.wait_threshold_ms or pool.get("headroom", 1) <= 0
+        return {
+            "status": DEGRADED if degraded else READY,
+            "pool_wait_ms": round(wait_ms, 2),
+            **pool,
+        }
+
+    def check(self) -> dict:
+        """
+        Return the readiness of every engine, cached for ``cache_seconds``.
+
+        Concurrent probes share one check instead of each hitting the
+        databases: while a check runs, the others return the previous result
+        (only the very first probes wait for it).
+
+        Returns:
+            dict: Overall status and per-engine results
+        """
+        result = self._result
+        age = time.monotonic() - self._checked_at
+        if result is not None and age < self.cache_seconds:
+            return result
+        if not self._check_lock.acquire(blocking=result is None):
+            return result
+        try:
+            if self._result is not None and self._result is not result:
+                # Another probe finished a check while this one waited
+                return self._result
+            checks = {
+                name: self.check_engine(db_engine)
+                for name, db_engine in self.engines.items()
+            }
+            statuses = {check["status"] for check in checks.values()}
+            if UNAVAILABLE in statuses:
+                overall = UNAVAILABLE
+            elif DEGRADED in statuses:
+                overall = DEGRADED
+            else:
+                overall = READY
+            self._checked_at = time.monotonic()
+            self._result = {"status": overall, "checks": checks}
+            return self._result
+        finally:
+            self._check_lock.release()
+
+
+readiness_probe = ReadinessProbe(
+    {
+        "primary": engine,
+        **{f"replica_{index}": replica for index, replica in enumerate(replica_engines)},
+        **{f"shard_{name}": shard for name, shard in shard_engines.items()},
+    },
+    cache_seconds=settings.ready_cache_seconds,
+    wait_threshold_ms=settings.ready_pool_wait_threshold_ms,
+)
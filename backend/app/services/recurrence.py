@@ -0,0 +1,266 @@
+"""Recurring tasks with lazily expanded occurrences.
+
+A recurring task stores an RRULE-style rule (RFC 5545 subset: ``FREQ`` of
+DAILY/WEEKLY/MONTHLY/YEARLY, ``INTERVAL``, ``COUNT``, ``UNTIL`` and, for
+weekly rules, ``BYDAY``) and the start of the series. Only the current
+occurrence exists as a row, its ``due_at`` being the occurrence time.
+Completing it materializes the next occurrence as a new row; later
+occurrences are only computed, never stored, when a list asks for them.
+Expansions are memoized per rule, start and window.
+"""
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterator
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.services.ordering import reposition_task
+from app.services.stats import adjust_stats
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Upper bound on the occurrences walked for one expansion
+MAX_ITERATIONS = 100_000
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Parsed recurrence rule."""
+
+    freq: str
+    interval: int = 1
+    count: int | None = None
+    until: datetime | None = None
+    byday: tuple[int, ...] = ()
+
+
+def _parse_until(value: str) -> datetime:
+    value = value.rstrip("Z")
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid UNTIL: {value}")
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(text: str) -> Rule:
+    """
+    Parse an RRULE string such as ``FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH``.
+
+    A leading ``RRULE:`` is accepted. ``UNTIL`` is read as UTC.
+
+    Args:
+        text: Rule to parse
+
+    Returns:
+        Rule: Parsed rule
+
+    Raises:
+        ValueError: If the rule is malformed or uses unsupported parts
+    """
+    text = text.strip().removeprefix("RRULE:")
+    parts: dict[str, str] = {}
+    for part in filter(None, text.split(";")):
+        name, separator, value = part.partition("=")
+        if not separator or not value:
+            raise ValueError(f"Invalid rule part: {part}")
+        parts[name.upper()] = value.upper()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError("FREQ must be one of " + ", ".join(FREQUENCIES))
+    interval = int(parts.pop("INTERVAL", "1"))
+    count = int(parts["COUNT"]) if "COUNT" in parts else None
+    parts.pop("COUNT", None)
+    until = _parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+    byday: tuple[int, ...] = ()
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+        days = parts.pop("BYDAY").split(",")
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError("BYDAY takes MO, TU, WE, TH, FR, SA or SU")
+        byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+    if parts:
+        raise ValueError("Unsupported rule parts: " + ", ".join(sorted(parts)))
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+    if count is not None and until is not None:
+        raise ValueError("COUNT and UNTIL cannot be combined")
+
+    return Rule(freq, interval, count, until, byday)
+
+
+def _add_months(start: datetime, months: int) -> datetime | None:
+    """Shift by whole months; None when the day does not exist that month."""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+def _candidates(rule: Rule, start: datetime) -> Iterator[datetime]:
+    """Yield the rule's times from ``start`` on, ignoring COUNT and UNTIL."""
+    step = 0
+    while True:
+        if rule.freq == "DAILY":
+            yield start + timedelta(days=step * rule.interval)
+        elif rule.freq == "WEEKLY" and rule.byday:
+            week = start - timedelta(days=start.weekday()) + timedelta(
+                weeks=step * rule.interval
+            )
+            for weekday in rule.byday:
+                occurrence = week + timedelta(days=weekday)
+                if occurrence >= start:
+                    yield occurrence
+        elif rule.freq == "WEEKLY":
+            yield start + timedelta(weeks=step * rule.interval)
+        else:
+            months = rule.interval * (12 if rule.freq == "YEARLY" else 1)
+            occurrence = _add_months(start, step * months)
+            if occurrence is not None:
+                yield occurrence
+        step += 1
+
+
+def _occurrences(rule: Rule, start: datetime) -> Iterator[datetime]:
+    """Yield the occurrences of a series in order."""
+    for index, occurrence in enumerate(_candidates(rule, start)):
+        if index >= MAX_ITERATIONS:
+            return
+        if rule.count is not None and index >= rule.count:
+            return
+        if rule.until is not None and occurrence > rule.until:
+            return
+        yield occurrence
+
+
+@lru_cache(maxsize=4096)
+def expand(rule: str, start: datetime, window_end: date) -> tuple[datetime, ...]:
+    """
+    Expand a series up to the end of a day, memoized.
+
+    Args:
+        rule: RRULE string
+        start: Start of the series (its first occurrence)
+        window_end: Last day to include
+
+    Returns:
+        tuple[datetime, ...]: Occurrences up to and including ``window_end``
+    """
+    limit = datetime.combine(window_end, datetime.max.time())
+    occurrences = []
+    for occurrence in _occurrences(parse_rule(rule), start):
+        if occurrence > limit:
+            break
+        occurrences.append(occurrence)
+    return tuple(occurrences)
+
+
+@lru_cache(maxsize=4096)
+def next_occurrence(rule: str, start: datetime, after: datetime) -> datetime | None:
+    """
+    Return the first occurrence of a series after a time, memoized.
+
+    Args:
+        rule: RRULE string
+        start: Start of the series
+        after: Occurrence to move past
+
+    Returns:
+        datetime | None: The next occurrence, or None when the series ended
+    """
+    for occurrence in _occurrences(parse_rule(rule), start):
+        if occurrence > after:
+            return occurrence
+    return None
+
+
+def upcoming_occurrences(task: Task, until: datetime, limit: int) -> list[datetime]:
+    """
+    List the occurrences of a recurring task after its current one.
+
+    Args:
+        task: Materialized occurrence of the series
+        until: Last time to include
+        limit: Maximum number of occurrences
+
+    Returns:
+        list[datetime]: Occurrence times, not stored anywhere
+    """
+    if not task.recurrence or task.due_at is None:
+        return []
+    occurrences = expand(task.recurrence, task.recurrence_start, until.date())
+    return [
+        occurrence
+        for occurrence in occurrences
+        if task.due_at < occurrence <= until
+    ][:limit]
+
+
+def advance_recurring_task(db: Session, task: Task) -> Task | None:
+    """
+    Materialize the occurrence following a completed recurring task.
+
+    The completed row stops being the series' current occurrence, which a
+    conditional UPDATE makes atomic, so concurrent completions create the
+    next occurrence only once. The new row keeps the title, description,
+    tags, parent, list and reminder offset, and is placed right after the
+    completed one and counted in the owner's stats. The caller commits.
+
+    Args:
+        db: Database session
+        task: Occurrence that was just completed
+
+    Returns:
+        Task | None: The next occurrence, or None if the task is not
+        recurring, was already advanced or the series has ended
+    """
+    if not task.recurrence or task.due_at is None:
+        return None
+    rule, start, due_at = task.recurrence, task.recurrence_start, task.due_at
+
+    claimed = db.execute(
+        update(Task)
+        .where(
+            Task.id == task.id,
+            Task.user_id == task.user_id,
+            Task.recurrence.isnot(None),
+        )
+        .values(recurrence=None)
+        .execution_options(synchronize_session=False)
+    )
+    task.recurrence = None
+    occurrence = next_occurrence(rule, start, due_at)
+    if claimed.rowcount != 1 or occurrence is None:
+        return None
+
+    next_task = Task(
+        title=task.title,
+        description=task.description,
+        user_id=task.user_id,
+        parent_id=task.parent_id,
+        list_id=task.list_id,
+        tags=list(task.tags),
+        recurrence=rule,
+        recurrence_start=start,
+        due_at=occurrence,
+        remind_at=(
+            occurrence + (task.remind_at - due_at) if task.remind_at else None
+        ),
+        order_key=task.order_key,
+    )
+    db.add(next_task)
+    db.flush()
+    reposition_task(db, next_task, after=task, before=None)
+    adjust_stats(db, task.user_id, total=1)
+    return next_task
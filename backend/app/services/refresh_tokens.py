@@ -0,0 +1,233 @@
+"""Refresh tokens with rotation, reuse detection and cached revocation.
+
+A login starts a token *family*. Each ``/api/auth/refresh`` marks the
+presented token used and issues its successor in the same family, so a
+client renews its access token without another bcrypt password check.
+Presenting a token that was already used means it was copied, so the whole
+family is revoked and both holders have to log in again.
+
+Tokens are random strings stored as an HMAC-SHA256 keyed with the JWT
+secret, looked up through a unique index. Access tokens carry their family
+in the ``fam`` claim; ``get_current_user`` rejects those of revoked families
+using a per-process set of the families revoked within the access token
+lifetime, reloaded at most every ``REVOKED_FAMILY_CACHE_SECONDS``.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+# Families revoked in this process or loaded from the database, and the
+# monotonic time of the last load
+_revoked_families: set[str] = set()
+_revoked_loaded_at: float | None = None
+_revoked_lock = threading.Lock()
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Hash a refresh token for storage and lookup.
+
+    Args:
+        token: Refresh token as given to the client
+
+    Returns:
+        str: Hex HMAC-SHA256 of the token
+    """
+    return hmac.new(
+        settings.jwt_secret.encode(), token.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def issue_refresh_token(
+    db: Session, user_id: int, family_id: str | None = None
+) -> tuple[str, str]:
+    """
+    Add a new refresh token to the session (the caller commits).
+
+    Args:
+        db: Session on the primary database
+        user_id: Owner of the token
+        family_id: Family to continue; a new family when None
+
+    Returns:
+        tuple[str, str]: The token and its family ID
+    """
+    token = secrets.token_urlsafe(32)
+    family_id = family_id or secrets.token_hex(16)
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=hash_refresh_token(token),
+            expires_at=datetime.utcnow()
+            + timedelta(days=settings.refresh_token_expire_days),
+        )
+    )
+    return token, family_id
+
+
+def revoke_family(db: Session, family_id: str) -> None:
+    """
+    Revoke every token of a family and commit.
+
+    Args:
+        db: Session on the primary database
+        family_id: Family to revoke
+    """
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    db.commit()
+    with _revoked_lock:
+        _revoked_families.add(family_id)
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[User, str, str]:
+    """
+    Exchange a refresh token for its successor and commit.
+
+    Args:
+        db: Session on the primary database
+        token: Refresh token presented by the client
+
+    Returns:
+        tuple[User, str, str]: Owner, new refresh token and family ID
+
+    Raises:
+        HTTPException: If the token is unknown, expired, revoked or reused;
+            a reused token revokes its family
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    stored = db.scalar(
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        )
+    )
+    now = datetime.utcnow()
+    if stored is None or stored.revoked_at is not None or stored.expires_at <= now:
+        raise invalid
+
+    # Claim the token atomically, so of two concurrent uses only one wins
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == stored.id,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(used_at=now)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        revoke_family(db, stored.family_id)
+        raise invalid
+
+    user = db.get(User, stored.user_id)
+    if user is None or user.deletion_requested_at is not None:
+        db.rollback()
+        raise invalid
+
+    new_token, family_id = issue_refresh_token(db, user.id, stored.family_id)
+    db.commit()
+    return user, new_token, family_id
+
+
+def find_family(db: Session, token: str) -> str | None:
+    """
+    Get the family of a refresh token.
+
+    Args:
+        db: Database session
+        token: Refresh token presented by the client
+
+    Returns:
+        str | None: Family ID, or None for an unknown token
+    """
+    return db.scalar(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        )
+    )
+
+
+def is_family_revoked(db: Session, family_id: str) -> bool:
+    """
+    Check a token family against the cached revocation list.
+
+    The list holds the families revoked within the access token lifetime;
+    older revocations cannot concern a valid access token.
+
+    Args:
+        db: Database session
+        family_id: Family from the access token's ``fam`` claim
+
+    Returns:
+        bool: True if the family is revoked
+    """
+    global _revoked_loaded_at
+
+    now = time.monotonic()
+    with _revoked_lock:
+        loaded_at = _revoked_loaded_at
+    if loaded_at is None or now - loaded_at >= settings.revoked_family_cache_seconds:
+        since = datetime.utcnow() - timedelta(
+            minutes=settings.access_token_expire_minutes
+        )
+        families = set(
+            db.scalars(
+                select(RefreshToken.family_id)
+                .where(RefreshToken.revoked_at >= since)
+                .distinct()
+            )
+        )
+        with _revoked_lock:
+            _revoked_families.clear()
+            _revoked_families.update(families)
+            _revoked_loaded_at = now
+
+    with _revoked_lock:
+        return family_id in _revoked_families
+
+
+def clear_revocation_cache() -> None:
+    """Drop the cached revocation list of this process."""
+    global _revoked_loaded_at
+
+    with _revoked_lock:
+        _revoked_families.clear()
+        _revoked_loaded_at = None
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    """
+    Delete expired refresh tokens.
+
+    Args:
+        db: Session on the primary database
+
+    Returns:
+        int: Number of tokens deleted
+    """
+    result = db.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,310 @@
+"""Reminder dispatcher for task ``remind_at`` times.
+
+Dispatching is split in two steps so that any number of workers can share
+the work without firing a reminder twice:
+
+* **Claim** - each tick, a worker takes up to ``batch_size`` unclaimed
+  reminders due within ``horizon`` using the partial ``remind_at`` index and
+  ``FOR UPDATE SKIP LOCKED``, stamps them with a lease
+  (``reminder_claimed_until``) and keeps them in an in-memory timer heap.
+* **Fire** - reminders whose time has come are popped from the heap and
+  marked sent with a conditional UPDATE before delivery, so a reminder that
+  was rescheduled or already sent in the meantime is dropped.
+
+Claims left behind by a crashed worker become claimable again once their
+lease expires. The cost of a tick is bounded by ``batch_size`` regardless of
+how many reminders are pending.
+
+Fired reminders invalidate the owner's cached task lists. A dispatcher run
+as a separate process reaches the API's cache only through a shared Redis
+``TASK_CACHE_URL``; the per-process ``memory://`` cache needs
+``REMINDERS_IN_PROCESS``.
+"""
+
+import heapq
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Protocol
+
+from sqlalchemy import or_, select, tuple_, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.task import Task
+from app.services.cache import task_list_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """Reminder delivered to a sink."""
+
+    task_id: int
+    user_id: int
+    title: str
+    remind_at: datetime
+    due_at: datetime | None
+
+
+class ReminderSink(Protocol):
+    """Destination for reminders (push service, e-mail, queue...)."""
+
+    def deliver(self, reminder: Reminder) -> None:
+        """Deliver one reminder; raise to have it retried later."""
+
+
+class LogReminderSink:
+    """Sink writing reminders to the application log."""
+
+    def deliver(self, reminder: Reminder) -> None:
+        logger.info(
+            "Reminder for task %s of user %s: %s",
+            reminder.task_id,
+            reminder.user_id,
+            reminder.title,
+        )
+
+
+class MemoryReminderSink:
+    """Sink collecting reminders in memory, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.delivered: list[Reminder] = []
+
+    def deliver(self, reminder: Reminder) -> None:
+        self.delivered.append(reminder)
+
+
+def create_reminder_sink(name: str) -> ReminderSink:
+    """
+    Build the sink selected by ``REMINDER_SINK``.
+
+    Args:
+        name: ``log``, ``memory`` or a ``module:ClassName`` import path
+
+    Returns:
+        ReminderSink: Sink instance
+    """
+    if name == "log":
+        return LogReminderSink()
+    if name == "memory":
+        return MemoryReminderSink()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+@dataclass(order=True)
+class _Pending:
+    remind_at: datetime
+    user_id: int
+    task_id: int
+
+
+class ReminderDispatcher:
+    """Claims due reminders from one database and fires them on time."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        sink: ReminderSink,
+        horizon: timedelta = timedelta(seconds=60),
+        batch_size: int = 500,
+        lease: timedelta = timedelta(minutes=5),
+    ) -> None:
+        self.session_factory = session_factory
+        self.sink = sink
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.lease = lease
+        self._heap: list[_Pending] = []
+        self._backlog = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of claimed reminders waiting in the timer heap."""
+        return len(self._heap)
+
+    def claim(self, now: datetime) -> int:
+        """
+        Claim reminders due within the horizon into the timer heap.
+
+        At most ``batch_size`` reminders are held in the heap, so memory and
+        the cost of each claim stay bounded.
+
+        Args:
+            now: Current time (naive UTC)
+
+        Returns:
+            int: Number of reminders claimed
+        """
+        limit = self.batch_size - len(self._heap)
+        if limit <= 0:
+            self._backlog = True
+            return 0
+
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(Task.id, Task.user_id, Task.remind_at)
+                .where(
+                    Task.remind_at <= now + self.horizon,
+                    Task.reminded_at.is_(None),
+                    or_(
+                        Task.reminder_claimed_until.is_(None),
+                        Task.reminder_claimed_until < now,
+                    ),
+                )
+                .order_by(Task.remind_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if rows:
+                db.execute(
+                    update(Task)
+                    .where(
+                        tuple_(Task.id, Task.user_id).in_(
+                            [(task_id, user_id) for task_id, user_id, _ in rows]
+                        )
+                    )
+                    .values(reminder_claimed_until=now + self.horizon + self.lease)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        finally:
+            db.close()
+
+        for task_id, user_id, remind_at in rows:
+            heapq.heappush(self._heap, _Pending(remind_at, user_id, task_id))
+        # A full batch means more reminders may be waiting to be claimed
+        self._backlog = len(rows) == limit
+        return len(rows)
+
+    def fire_due(self, now: datetime) -> int:
+        """
+        Deliver every claimed reminder whose time has come.
+
+        Args:
+            now: Current time (naive UTC)
+
+        Returns:
+            int: Number of reminders delivered
+        """
+        delivered = 0
+        db = self.session_factory()
+        try:
+            while self._heap and self._heap[0].remind_at <= now:
+                pending = heapq.heappop(self._heap)
+                # Mark sent only if the reminder was not rescheduled or sent
+                result = db.execute(
+                    update(Task)
+                    .where(
+                        Task.id == pending.task_id,
+                        Task.user_id == pending.user_id,
+                        Task.remind_at == pending.remind_at,
+                        Task.reminded_at.is_(None),
+                    )
+                    .values(reminded_at=now)
+                    .returning(Task.title, Task.due_at)
+                    .execution_options(synchronize_session=False)
+                )
+                row = result.first()
+                db.commit()
+                if row is None:
+                    continue
+                # Listed tasks show reminded_at
+                task_list_cache.invalidate(pending.user_id)
+
+                reminder = Reminder(
+                    task_id=pending.task_id,
+                    user_id=pending.user_id,
+                    title=row.title,
+                    remind_at=pending.remind_at,
+                    due_at=row.due_at,
+                )
+                try:
+                    self.sink.deliver(reminder)
+                except Exception:
+                    logger.exception("Reminder delivery failed; retried after lease")
+                    db.execute(
+                        update(Task)
+                        .where(
+                            Task.id == pending.task_id,
+                            Task.user_id == pending.user_id,
+                        )
+                        .values(reminded_at=None)
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+                    task_list_cache.invalidate(pending.user_id)
+                    continue
+                delivered += 1
+        finally:
+            db.close()
+        return delivered
+
+    def tick(self, now: datetime | None = None) -> int:
+        """
+        Claim upcoming reminders and fire the due ones.
+
+        Args:
+            now: Current time (naive UTC); defaults to the wall clock
+
+        Returns:
+            int: Number of reminders delivered
+        """
+        now = now or datetime.utcnow()
+        self.claim(now)
+        return self.fire_due(now)
+
+    def run(self, poll_interval: float) -> None:
+        """
+        Dispatch until ``stop`` is called.
+
+        Sleeps until the next reminder in the heap is due, but at most
+        ``poll_interval`` seconds so new reminders are picked up, and not at
+        all while a backlog of due reminders is being worked off.
+
+        Args:
+            poll_interval: Longest sleep between ticks in seconds
+        """
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Reminder dispatch tick failed")
+            wait = 0.0 if self._backlog else poll_interval
+            if self._heap:
+                next_at = self._heap[0].remind_at
+                until_next = (next_at - datetime.utcnow()).total_seconds()
+                wait = max(0.0, min(wait, until_next))
+            self._stop.wait(wait)
+
+    def start(self, poll_interval: float) -> None:
+        """Run the dispatcher in a daemon thread."""
+        self._thread = threading.Thread(
+            target=self.run, args=(poll_interval,), name="reminders", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the dispatcher thread and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def create_dispatcher(session_factory: sessionmaker) -> ReminderDispatcher:
+    """Build a dispatcher configured from the ``REMINDER_*`` settings."""
+    return ReminderDispatcher(
+        session_factory,
+        create_reminder_sink(settings.reminder_sink),
+        horizon=timedelta(seconds=settings.reminder_horizon_seconds),
+        batch_size=settings.reminder_batch_size,
+        lease=timedelta(seconds=settings.reminder_lease_seconds),
+    )
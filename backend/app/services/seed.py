@@ -0,0 +1,244 @@
+"""Synthetic dataset generation for load and scale testing."""
+
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.user import User
+from app.services.auth import create_access_token, get_password_hash
+from app.services.ordering import spaced_keys
+from app.services.stats import reconcile_stats
+
+# Every generated user shares this password so only one bcrypt hash is computed
+DEFAULT_PASSWORD = "loadtest-password"
+
+TASK_VERBS = ["Write", "Review", "Fix", "Plan", "Call", "Buy", "Clean", "Ship", "Read"]
+TASK_OBJECTS = ["report", "groceries", "bug", "roadmap", "invoice", "docs", "garden"]
+
+TASK_COLUMNS = [
+    "title",
+    "description",
+    "completed",
+    "completed_at",
+    "user_id",
+    "created_at",
+    "updated_at",
+    "order_key",
+]
+
+
+def task_distribution(
+    rng: random.Random, user_count: int, total_tasks: int, skew: float
+) -> list[int]:
+    """
+    Split a task budget across users following a Zipf-like distribution.
+
+    A handful of users ("whales") receive most of the tasks while the long
+    tail receives a few each. The ranking is shuffled so whales are not
+    always the first users created.
+
+    Args:
+        rng: Seeded random generator
+        user_count: Number of users to distribute tasks across
+        total_tasks: Total number of tasks to distribute
+        skew: Zipf exponent; 0 gives a uniform distribution
+
+    Returns:
+        list[int]: Number of tasks per user, summing to total_tasks
+    """
+    if user_count <= 0:
+        return []
+
+    weights = [1.0 / (rank**skew) for rank in range(1, user_count + 1)]
+    scale = total_tasks / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+
+    # Hand out the remainder lost to rounding, heaviest users first
+    for index in range(total_tasks - sum(counts)):
+        counts[index % user_count] += 1
+
+    rng.shuffle(counts)
+    return counts
+
+
+def generate_users(seed: int, count: int, hashed_password: str) -> list[dict]:
+    """
+    Build deterministic user rows for a seed.
+
+    Args:
+        seed: Dataset seed, embedded in usernames so datasets don't collide
+        count: Number of users to build
+        hashed_password: Pre-computed password hash shared by all users
+
+    Returns:
+        list[dict]: User rows ready for a bulk insert
+    """
+    now = datetime.utcnow()
+    return [
+        {
+            "username": f"load_{seed}_{index:06d}",
+            "email": f"load_{seed}_{index:06d}@example.com",
+            "hashed_password": hashed_password,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def generate_tasks(
+    rng: random.Random,
+    user_ids: list[int],
+    counts: list[int],
+    completed_ratio: float,
+) -> Iterator[dict]:
+    """
+    Lazily generate task rows for each user.
+
+    Args:
+        rng: Seeded random generator
+        user_ids: Database IDs of the generated users
+        counts: Number of tasks per user, aligned with user_ids
+        completed_ratio: Probability that a generated task is completed
+
+    Yields:
+        dict: Task row ready for a bulk insert
+    """
+    epoch = datetime(2025, 1, 1)
+    for user_id, count in zip(user_ids, counts):
+        for index, order_key in enumerate(spaced_keys(count)):
+            created_at = epoch + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            title = f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)} #{index}"
+            description = None if rng.random() < 0.5 else f"Details for {title}"
+            completed = rng.random() < completed_ratio
+            yield {
+                "title": title,
+                "description": description,
+                "completed": completed,
+                "completed_at": created_at if completed else None,
+                "user_id": user_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "order_key": order_key,
+            }
+
+
+def _batched(rows: Iterator[dict], batch_size: int) -> Iterator[list[dict]]:
+    """Group an iterator of rows into lists of at most batch_size."""
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_tasks(db: Session, batch: list[dict]) -> None:
+    """Load a batch of task rows with PostgreSQL COPY."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow(
+            ["\\N" if row[column] is None else row[column] for column in TASK_COLUMNS]
+        )
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY tasks ({', '.join(TASK_COLUMNS)}) FROM STDIN "
+            "WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def seed_database(
+    db: Session,
+    users: int = 1000,
+    tasks: int = 100_000,
+    seed: int = 42,
+    skew: float = 1.1,
+    completed_ratio: float = 0.6,
+    batch_size: int = 10_000,
+    password: str = DEFAULT_PASSWORD,
+) -> list[User]:
+    """
+    Generate and load a synthetic dataset.
+
+    The same arguments always produce the same users and tasks. Tasks are
+    loaded with COPY on PostgreSQL and with executemany bulk inserts on
+    other databases, committing once per batch; the task counters are then
+    computed with ``reconcile_stats``.
+
+    Args:
+        db: Database session
+        users: Number of users to create
+        tasks: Total number of tasks to create
+        seed: Random seed controlling every generated value
+        skew: Zipf exponent for the tasks-per-user distribution
+        completed_ratio: Fraction of tasks marked completed
+        batch_size: Rows per insert batch
+        password: Password shared by every generated user
+
+    Returns:
+        list[User]: The created users
+    """
+    rng = random.Random(seed)
+
+    user_rows = generate_users(seed, users, get_password_hash(password))
+    # Rows come back in user_rows order, so each user gets the same task count
+    # for a given seed
+    created_users = list(
+        db.scalars(
+            insert(User).returning(User, sort_by_parameter_order=True), user_rows
+        ).all()
+    )
+    db.commit()
+
+    counts = task_distribution(rng, len(created_users), tasks, skew)
+    user_ids = [user.id for user in created_users]
+    use_copy = db.get_bind().dialect.name == "postgresql"
+
+    for batch in _batched(
+        generate_tasks(rng, user_ids, counts, completed_ratio), batch_size
+    ):
+        if use_copy:
+            _copy_tasks(db, batch)
+        else:
+            db.execute(insert(Task), batch)
+        db.commit()
+    reconcile_stats(db)
+
+    return created_users
+
+
+def mint_tokens(users: list[User], expires_minutes: int) -> list[tuple[int, str, str]]:
+    """
+    Create access tokens for generated users.
+
+    Args:
+        users: Users to mint tokens for
+        expires_minutes: Token lifetime in minutes
+
+    Returns:
+        list[tuple[int, str, str]]: (user_id, username, access_token) rows
+    """
+    expires_delta = timedelta(minutes=expires_minutes)
+    return [
+        (
+            user.id,
+            user.username,
+            create_access_token(data={"sub": str(user.id)}, expires_delta=expires_delta),
+        )
+        for user in users
+    ]
@@ -0,0 +1,219 @@
+"""Shared task lists and their cached access control.
+
+A list belongs to its owner and its tasks stay on the owner's shard. Other
+users are added as members with a ``viewer`` or ``editor`` role. Each
+process keeps a map of every user's memberships (list ID to role and
+owner), loaded with one query on first use, so permission checks on list
+requests do not query the database. Every cached map records the user's
+membership version in the task cache's version store, which membership
+changes bump, and is only used while that version is unchanged, so a member
+who was removed or downgraded loses access in every process at once. Without
+a cache backend (``TASK_CACHE_URL`` empty) there is nothing to check the
+versions against and memberships are loaded on every request.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.archive import ArchivedTask
+from app.models.task import Task
+from app.models.task_list import ListMember, TaskList
+from app.services.cache import task_list_cache
+
+VIEWER = "viewer"
+EDITOR = "editor"
+OWNER = "owner"
+
+# Roles in increasing order of permissions
+ROLES = (VIEWER, EDITOR, OWNER)
+
+
+@dataclass(frozen=True)
+class Membership:
+    """Access of one user to one list."""
+
+    list_id: int
+    owner_id: int
+    name: str
+    role: str
+
+    def allows(self, role: str) -> bool:
+        """Return True if this membership grants at least ``role``."""
+        return ROLES.index(self.role) >= ROLES.index(role)
+
+
+# user_id -> (list_id -> membership, version, cached_at)
+_membership_cache: dict[int, tuple[dict[int, Membership], int, float]] = {}
+_membership_lock = threading.Lock()
+
+
+def invalidate_memberships(*user_ids: int) -> None:
+    """Invalidate the cached memberships of users in every process."""
+    backend = task_list_cache.backend
+    with _membership_lock:
+        for user_id in user_ids:
+            _membership_cache.pop(user_id, None)
+    if backend is not None:
+        for user_id in user_ids:
+            backend.bump_version(f"memberships:{user_id}")
+
+
+def clear_membership_cache() -> None:
+    """Drop every cached membership in this process."""
+    with _membership_lock:
+        _membership_cache.clear()
+
+
+def load_memberships(db: Session, user_id: int) -> dict[int, Membership]:
+    """
+    Load every list a user owns or is a member of, in one query.
+
+    Args:
+        db: Session on the primary database (or a replica of it)
+        user_id: User ID
+
+    Returns:
+        dict[int, Membership]: Memberships by list ID
+    """
+    rows = db.execute(
+        select(TaskList.id, TaskList.owner_id, TaskList.name, ListMember.role)
+        .outerjoin(
+            ListMember,
+            and_(ListMember.list_id == TaskList.id, ListMember.user_id == user_id),
+        )
+        .where(or_(TaskList.owner_id == user_id, ListMember.user_id == user_id))
+    ).all()
+    return {
+        list_id: Membership(
+            list_id, owner_id, name, OWNER if owner_id == user_id else role
+        )
+        for list_id, owner_id, name, role in rows
+    }
+
+
+def get_memberships(db: Session, user_id: int) -> dict[int, Membership]:
+    """
+    Get a user's memberships, cached per process while their version holds.
+
+    Args:
+        db: Session on the primary database (or a replica of it)
+        user_id: User ID
+
+    Returns:
+        dict[int, Membership]: Memberships by list ID
+    """
+    backend = task_list_cache.backend
+    if backend is None:
+        return load_memberships(db, user_id)
+
+    # Read the version first, so a change committed during the load leaves
+    # the loaded map under a version that is already stale
+    version = backend.get_version(f"memberships:{user_id}")
+    now = time.monotonic()
+    with _membership_lock:
+        cached = _membership_cache.get(user_id)
+    if (
+        cached
+        and cached[1] == version
+        and now - cached[2] < settings.membership_cache_seconds
+    ):
+        return cached[0]
+
+    memberships = load_memberships(db, user_id)
+    with _membership_lock:
+        _membership_cache[user_id] = (memberships, version, now)
+    return memberships
+
+
+def create_list(db: Session, owner_id: int, name: str) -> TaskList:
+    """
+    Create a list owned by a user.
+
+    Args:
+        db: Session on the primary database
+        owner_id: Owner of the list
+        name: List name
+
+    Returns:
+        TaskList: Created list
+    """
+    task_list = TaskList(owner_id=owner_id, name=name)
+    db.add(task_list)
+    db.commit()
+    db.refresh(task_list)
+    invalidate_memberships(owner_id)
+    return task_list
+
+
+def set_member(db: Session, list_id: int, user_id: int, role: str) -> None:
+    """
+    Add a user to a list or change their role.
+
+    Args:
+        db: Session on the primary database
+        list_id: List ID
+        user_id: Member to add
+        role: ``viewer`` or ``editor``
+    """
+    member = db.get(ListMember, (list_id, user_id))
+    if member is None:
+        db.add(ListMember(list_id=list_id, user_id=user_id, role=role))
+    else:
+        member.role = role
+    db.commit()
+    invalidate_memberships(user_id)
+
+
+def remove_member(db: Session, list_id: int, user_id: int) -> bool:
+    """
+    Remove a user from a list.
+
+    Args:
+        db: Session on the primary database
+        list_id: List ID
+        user_id: Member to remove
+
+    Returns:
+        bool: False if the user was not a member
+    """
+    member = db.get(ListMember, (list_id, user_id))
+    if member is None:
+        return False
+    db.delete(member)
+    db.commit()
+    invalidate_memberships(user_id)
+    return True
+
+
+def delete_list(db: Session, shard_db: Session, task_list: TaskList) -> None:
+    """
+    Delete a list; its tasks stay with the owner, outside of any list.
+
+    Args:
+        db: Session on the primary database
+        shard_db: Session on the owner's shard (may be ``db``)
+        task_list: List to delete
+    """
+    list_id, owner_id = task_list.id, task_list.owner_id
+    member_ids = db.scalars(
+        select(ListMember.user_id).where(ListMember.list_id == list_id)
+    ).all()
+    for model in (Task, ArchivedTask):
+        shard_db.execute(
+            update(model)
+            .where(model.user_id == owner_id, model.list_id == list_id)
+            .values(list_id=None)
+            .execution_options(synchronize_session=False)
+        )
+    if shard_db is not db:
+        shard_db.commit()
+    db.execute(delete(ListMember).where(ListMember.list_id == list_id))
+    db.delete(task_list)
+    db.commit()
+    task_list_cache.invalidate(owner_id)
+    invalidate_memberships(owner_id, *member_ids)
@@ -0,0 +1,352 @@
+"""Incrementally maintained task statistics.
+
+Every task write adjusts the owner's ``user_task_stats`` row (total and
+completed counts) and the ``task_daily_stats`` row of the day a task was
+completed, with upserts in the write's own transaction, so the counters
+commit or roll back with it and reading them costs one row lookup plus one
+row per day shown. Archived tasks stay counted.
+
+A write that changes completion state first locks the owner's
+``user_task_stats`` row (``lock_stats``) and only then reads the state it
+counts from, so concurrent changes of a user's tasks wait for each other
+and every change is counted once. Always taking this lock before the task
+rows also keeps such writes from deadlocking each other.
+
+``reconcile_stats`` recomputes the counters from the task tables while
+holding those rows locked. It repairs drift from any source, such as
+writes that bypass this module (manual SQL, bulk loads) or a bug.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, func, select, union, union_all
+from sqlalchemy.orm import Session
+
+from app.models.archive import ArchivedTask
+from app.models.stats import TaskDailyStats, UserTaskStats
+from app.models.task import Task
+
+
+def _insert(db: Session, model):
+    """Dialect-specific INSERT supporting ``on_conflict_do_*``."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def completion_day(column):
+    """SQL expression of the UTC day of a ``completed_at`` column."""
+    return func.date(column, type_=Date)
+
+
+def adjust_stats(
+    db: Session,
+    user_id: int,
+    total: int = 0,
+    completed: int = 0,
+    days: Counter[date] | dict[date, int] | None = None,
+) -> None:
+    """
+    Add deltas to a user's counters (the caller commits).
+
+    Args:
+        db: Session on the user's shard
+        user_id: Owner of the tasks
+        total: Change in the number of tasks
+        completed: Change in the number of completed tasks
+        days: Change in the number of tasks completed, by day
+    """
+    statement = _insert(db, UserTaskStats).values(
+        user_id=user_id,
+        total=total,
+        completed=completed,
+        updated_at=datetime.utcnow(),
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserTaskStats.user_id],
+            set_={
+                "total": UserTaskStats.total + statement.excluded.total,
+                "completed": UserTaskStats.completed + statement.excluded.completed,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+    rows = [
+        {"user_id": user_id, "day": day, "completed": delta}
+        for day, delta in sorted((days or {}).items())
+        if delta
+    ]
+    if rows:
+        statement = _insert(db, TaskDailyStats)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[TaskDailyStats.user_id, TaskDailyStats.day],
+                set_={
+                    "completed": TaskDailyStats.completed
+                    + statement.excluded.completed
+                },
+            ),
+            rows,
+        )
+
+
+def lock_stats(db: Session, user_id: int) -> None:
+    """
+    Lock a user's counters row, creating it if needed, until the commit.
+
+    Args:
+        db: Session on the user's shard
+        user_id: Owner of the tasks
+    """
+    adjust_stats(db, user_id)
+
+
+def track_completion(
+    db: Session, user_id: int, task: Task, was_completed: bool
+) -> None:
+    """
+    Set ``completed_at`` and adjust the counters after a completion change.
+
+    ``was_completed`` must have been read after ``lock_stats``, otherwise
+    two concurrent changes may both count the same completion.
+
+    Args:
+        db: Session on the user's shard
+        user_id: Owner of the task
+        task: Task whose ``completed`` flag was just set
+        was_completed: Previous value of the flag
+    """
+    if task.completed == was_completed:
+        return
+    if task.completed:
+        task.completed_at = datetime.utcnow()
+        adjust_stats(db, user_id, completed=1, days={task.completed_at.date(): 1})
+    else:
+        days = {task.completed_at.date(): -1} if task.completed_at else None
+        task.completed_at = None
+        adjust_stats(db, user_id, completed=-1, days=days)
+
+
+def track_bulk_completion(
+    db: Session, user_id: int, condition, completed: bool, completed_at: datetime
+) -> None:
+    """
+    Adjust the counters before tasks are completed or reopened in bulk.
+
+    The counters row is locked before the tasks are counted, so the count
+    matches what the caller's UPDATE in the same transaction changes.
+
+    Args:
+        db: Session on the user's shard
+        user_id: Owner of the tasks
+        condition: Filter selecting the tasks
+        completed: New completion state
+        completed_at: Completion time set on the completed tasks
+    """
+    lock_stats(db, user_id)
+    rows = db.execute(
+        select(completion_day(Task.completed_at), func.count())
+        .where(Task.user_id == user_id, condition, Task.completed.is_(not completed))
+        .group_by(completion_day(Task.completed_at))
+    ).all()
+    changed = sum(count for _, count in rows)
+    if not changed:
+        return
+    if completed:
+        adjust_stats(
+            db, user_id, completed=changed, days={completed_at.date(): changed}
+        )
+    else:
+        days = Counter({day: -count for day, count in rows if day is not None})
+        adjust_stats(db, user_id, completed=-changed, days=days)
+
+
+def track_bulk_delete(db: Session, user_id: int, condition) -> None:
+    """
+    Adjust the counters before tasks are deleted in bulk.
+
+    The counters row is locked before the tasks are counted, so the count
+    matches what the caller's DELETE in the same transaction removes.
+
+    Args:
+        db: Session on the user's shard
+        user_id: Owner of the tasks
+        condition: Filter selecting the tasks
+    """
+    lock_stats(db, user_id)
+    rows = db.execute(
+        select(Task.completed, completion_day(Task.completed_at), func.count())
+        .where(Task.user_id == user_id, condition)
+        .group_by(Task.completed, completion_day(Task.completed_at))
+    ).all()
+    if not rows:
+        return
+    days: Counter[date] = Counter()
+    for completed, day, count in rows:
+        if completed and day is not None:
+            days[day] -= count
+    adjust_stats(
+        db,
+        user_id,
+        total=-sum(count for _, _, count in rows),
+        completed=-sum(count for completed, _, count in rows if completed),
+        days=days,
+    )
+
+
+def get_stats(
+    db: Session, user_id: int, today: date, days: int
+) -> tuple[int, int, list[tuple[date, int]]]:
+    """
+    Read a user's counters.
+
+    Args:
+        db: Session on the user's shard
+        user_id: Owner of the tasks
+        today: Last day of the daily series
+        days: Number of days in the daily series
+
+    Returns:
+        tuple[int, int, list[tuple[date, int]]]: Total and completed counts,
+        and the tasks completed on each day, oldest first (zero-filled)
+    """
+    stats = db.get(UserTaskStats, user_id)
+    first = today - timedelta(days=days - 1)
+    completed_on = dict(
+        db.execute(
+            select(TaskDailyStats.day, TaskDailyStats.completed).where(
+                TaskDailyStats.user_id == user_id,
+                TaskDailyStats.day.between(first, today),
+            )
+        ).all()
+    )
+    series = [
+        (day, completed_on.get(day, 0))
+        for day in (first + timedelta(days=offset) for offset in range(days))
+    ]
+    if stats is None:
+        return 0, 0, series
+    return stats.total, stats.completed, series
+
+
+def _actual_stats(
+    db: Session, user_ids: list[int]
+) -> tuple[dict[int, tuple[int, int]], dict[int, Counter[date]]]:
+    """Count the tasks of users from the task tables."""
+    totals: dict[int, tuple[int, int]] = {user_id: (0, 0) for user_id in user_ids}
+    for user_id, total, completed in db.execute(
+        select(
+            Task.user_id,
+            func.count(),
+            func.count().filter(Task.completed.is_(True)),
+        )
+        .where(Task.user_id.in_(user_ids))
+        .group_by(Task.user_id)
+    ):
+        totals[user_id] = (total, completed)
+    for user_id, count in db.execute(
+        select(ArchivedTask.user_id, func.count())
+        .where(ArchivedTask.user_id.in_(user_ids))
+        .group_by(ArchivedTask.user_id)
+    ):
+        total, completed = totals[user_id]
+        totals[user_id] = (total + count, completed + count)
+
+    completions = union_all(
+        select(Task.user_id, completion_day(Task.completed_at).label("day")).where(
+            Task.user_id.in_(user_ids),
+            Task.completed.is_(True),
+            Task.completed_at.isnot(None),
+        ),
+        select(
+            ArchivedTask.user_id, completion_day(ArchivedTask.completed_at).label("day")
+        ).where(
+            ArchivedTask.user_id.in_(user_ids), ArchivedTask.completed_at.isnot(None)
+        ),
+    ).subquery()
+    days: dict[int, Counter[date]] = {user_id: Counter() for user_id in user_ids}
+    for user_id, day, count in db.execute(
+        select(completions.c.user_id, completions.c.day, func.count()).group_by(
+            completions.c.user_id, completions.c.day
+        )
+    ):
+        days[user_id][day] = count
+    return totals, days
+
+
+def reconcile_stats(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute every user's counters from the task tables and fix drift.
+
+    Users are processed in batches, one transaction each. A batch first
+    locks its users' ``user_task_stats`` rows, so concurrent task writes
+    wait and are applied on top of the recomputed counts.
+
+    Args:
+        db: Session on one shard
+        batch_size: Users per transaction
+
+    Returns:
+        int: Number of users whose counters were repaired
+    """
+    repaired = 0
+    after = 0
+    users = union(
+        select(Task.user_id),
+        select(ArchivedTask.user_id),
+        select(UserTaskStats.user_id),
+    ).subquery()
+    while True:
+        user_ids = list(
+            db.scalars(
+                select(users.c.user_id)
+                .where(users.c.user_id > after)
+                .order_by(users.c.user_id)
+                .limit(batch_size)
+            )
+        )
+        if not user_ids:
+            break
+        after = user_ids[-1]
+
+        db.execute(
+            _insert(db, UserTaskStats)
+            .values([{"user_id": user_id} for user_id in user_ids])
+            .on_conflict_do_nothing(index_elements=[UserTaskStats.user_id])
+        )
+        stored = {
+            stats.user_id: stats
+            for stats in db.scalars(
+                select(UserTaskStats)
+                .where(UserTaskStats.user_id.in_(user_ids))
+                .with_for_update()
+            )
+        }
+        stored_days: dict[int, Counter[date]] = {
+            user_id: Counter() for user_id in user_ids
+        }
+        for row in db.scalars(
+            select(TaskDailyStats).where(TaskDailyStats.user_id.in_(user_ids))
+        ):
+            stored_days[row.user_id][row.day] = row.completed
+
+        totals, days = _actual_stats(db, user_ids)
+        for user_id in user_ids:
+            stats = stored[user_id]
+            drift = (stats.total, stats.completed) != totals[user_id]
+            stats.total, stats.completed = totals[user_id]
+            # Subtracting yields only the nonzero differences
+            delta = Counter(days[user_id])
+            delta.subtract(stored_days[user_id])
+            delta = Counter({day: count for day, count in delta.items() if count})
+            if delta:
+                drift = True
+                adjust_stats(db, user_id, days=delta)
+            repaired += drift
+        db.commit()
+    return repaired
@@ -0,0 +1,118 @@
+"""Task tags: name normalization, lookup and tag filters."""
+
+from typing import Literal
+
+from sqlalchemy import ColumnElement, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.tag import Tag, task_tags
+from app.models.task import Task
+
+TagMatch = Literal["any", "all"]
+
+
+def normalize_tag_names(names: list[str]) -> list[str]:
+    """
+    Normalize tag names: trimmed, lowercase, without a leading ``#``.
+
+    Args:
+        names: Tag names as given by the client
+
+    Returns:
+        list[str]: Distinct non-empty names in their original order
+    """
+    normalized = (name.strip().lstrip("#").strip().lower() for name in names)
+    return list(dict.fromkeys(name for name in normalized if name))
+
+
+def resolve_tags(db: Session, user_id: int, names: list[str]) -> list[Tag]:
+    """
+    Return a user's tags with the given names, creating missing ones.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tags
+        names: Normalized tag names
+
+    Returns:
+        list[Tag]: Tags in the order of ``names``
+    """
+    if not names:
+        return []
+
+    tags = {
+        tag.name: tag
+        for tag in db.scalars(
+            select(Tag).where(Tag.user_id == user_id, Tag.name.in_(names))
+        )
+    }
+    for name in names:
+        if name in tags:
+            continue
+        try:
+            # Savepoint: a concurrent request may create the same tag
+            with db.begin_nested():
+                tag = Tag(user_id=user_id, name=name)
+                db.add(tag)
+        except IntegrityError:
+            tag = db.scalars(
+                select(Tag).where(Tag.user_id == user_id, Tag.name == name)
+            ).one()
+        tags[name] = tag
+    return [tags[name] for name in names]
+
+
+def tag_filter(user_id: int, names: list[str], match: TagMatch) -> ColumnElement:
+    """
+    Build a filter on tasks carrying any or all of the given tags.
+
+    The subquery resolves tag names through the ``(user_id, name)`` unique
+    index and task IDs through the ``(user_id, tag_id, task_id)`` index.
+
+    Args:
+        user_id: Owner of the tasks
+        names: Normalized tag names
+        match: ``any`` for tasks with at least one tag, ``all`` for tasks
+            carrying every tag
+
+    Returns:
+        ColumnElement: Condition to apply to a ``Task`` query
+    """
+    tagged = (
+        select(task_tags.c.task_id)
+        .join(Tag, Tag.id == task_tags.c.tag_id)
+        .where(task_tags.c.user_id == user_id, Tag.user_id == user_id)
+        .where(Tag.name.in_(names))
+    )
+    if match == "all":
+        tagged = tagged.group_by(task_tags.c.task_id).having(
+            func.count() == len(names)
+        )
+    return Task.id.in_(tagged)
+
+
+def list_tag_counts(db: Session, user_id: int) -> list[tuple[str, int]]:
+    """
+    List a user's tags with the number of tasks carrying each.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tags
+
+    Returns:
+        list[tuple[str, int]]: ``(name, task_count)`` ordered by name
+    """
+    return [
+        (name, count)
+        for name, count in db.execute(
+            select(Tag.name, func.count(task_tags.c.task_id))
+            .outerjoin(
+                task_tags,
+                (task_tags.c.tag_id == Tag.id) & (task_tags.c.user_id == user_id),
+            )
+            .where(Tag.user_id == user_id)
+            .group_by(Tag.id, Tag.name)
+            .order_by(Tag.name)
+        )
+    ]
@@ -0,0 +1,114 @@
+"""Task update logic shared by the task write endpoints."""
+
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.schemas.task import TaskUpdate
+from app.services.history import (
+    CREATED,
+    TRACKED_FIELDS,
+    UPDATED,
+    created_changes,
+    diff_values,
+    stage_event,
+    task_values,
+)
+from app.services.recurrence import advance_recurring_task
+from app.services.stats import lock_stats, track_completion
+from app.services.tags import normalize_tag_names, resolve_tags
+
+
+def check_task_update(due_at: datetime | None, task_data: TaskUpdate) -> None:
+    """
+    Check an update against the state of the task it applies to.
+
+    Args:
+        due_at: Due date of the task before the update
+        task_data: Task update data
+
+    Raises:
+        HTTPException: If a recurrence is set on a task without a due date
+    """
+    if "due_at" in task_data.model_fields_set:
+        due_at = task_data.due_at
+    if (
+        "recurrence" in task_data.model_fields_set
+        and task_data.recurrence is not None
+        and due_at is None
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="due_at is required for a recurring task",
+        )
+
+
+def apply_task_update(
+    db: Session,
+    user_id: int,
+    task: Task,
+    task_data: TaskUpdate,
+    actor_id: int | None = None,
+) -> None:
+    """
+    Apply the fields of a task update to a loaded task.
+
+    Completing an occurrence of a recurring task creates the next
+    occurrence. The changed fields are staged as a history event and the
+    owner's counters adjusted. The caller commits.
+
+    Args:
+        db: Database session on the owner's shard
+        user_id: Owner of the task
+        task: Task to update
+        task_data: Task update data
+        actor_id: User making the change
+
+    Raises:
+        HTTPException: If a recurrence is set on a task without a due date
+    """
+    check_task_update(task.due_at, task_data)
+    if task_data.completed is not None:
+        # Re-read the state under the counters lock, so of two concurrent
+        # completions only one is counted and advances a recurring task
+        lock_stats(db, user_id)
+        db.refresh(task, ["completed", "completed_at"], with_for_update=True)
+    was_completed = task.completed
+    fields = [field for field in TRACKED_FIELDS if field in task_data.model_fields_set]
+    before = task_values(task, fields)
+
+    # Update only provided fields
+    if task_data.title is not None:
+        task.title = task_data.title
+    if task_data.description is not None:
+        task.description = task_data.description
+    if task_data.completed is not None:
+        task.completed = task_data.completed
+        track_completion(db, user_id, task, was_completed)
+    if task_data.tags is not None:
+        task.tags = resolve_tags(db, user_id, normalize_tag_names(task_data.tags))
+    # Dates can be cleared with an explicit null
+    if "due_at" in task_data.model_fields_set:
+        task.due_at = task_data.due_at
+    if "remind_at" in task_data.model_fields_set:
+        # A rescheduled reminder fires again, whoever had claimed it
+        task.remind_at = task_data.remind_at
+        task.reminded_at = None
+        task.reminder_claimed_until = None
+    if "recurrence" in task_data.model_fields_set:
+        # A new rule starts a new series at the current due date
+        task.recurrence = task_data.recurrence
+        task.recurrence_start = task.due_at if task_data.recurrence else None
+
+    changes = diff_values(before, task_values(task, fields))
+    if changes:
+        stage_event(db, user_id, task.id, UPDATED, changes, actor_id)
+
+    if task.completed and not was_completed:
+        next_task = advance_recurring_task(db, task)
+        if next_task is not None:
+            stage_event(
+                db, user_id, next_task.id, CREATED, created_changes(next_task), actor_id
+            )
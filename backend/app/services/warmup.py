@@ -0,0 +1,64 @@
+"""Worker warm-up run before the application accepts traffic."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.database import engine, replica_engines
+from app.services.auth import pwd_context
+from app.sharding import shard_engines
+
+logger = logging.getLogger(__name__)
+
+
+def _open_connection(db_engine: Engine) -> None:
+    with db_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def warm_db_pools() -> None:
+    """
+    Fill every engine's connection pool up to ``db_pool_size``.
+
+    Connections are opened concurrently so they are all checked out at the
+    same time and the pool has to create each one. A database that cannot
+    be reached is logged and left to the readiness probe.
+    """
+    engines = [engine, *replica_engines, *shard_engines.values()]
+    with ThreadPoolExecutor(max_workers=settings.db_pool_size) as executor:
+        for db_engine in engines:
+            futures = [
+                executor.submit(_open_connection, db_engine)
+                for _ in range(settings.db_pool_size)
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    logger.warning(
+                        "Could not warm connection pool for %s",
+                        db_engine.url.render_as_string(hide_password=True),
+                        exc_info=True,
+                    )
+                    break
+
+
+def warm_password_hashing() -> None:
+    """Load the bcrypt backend so the first login does not pay for it."""
+    pwd_context.verify("warm-up", pwd_context.hash("warm-up"))
+
+
+def warm_up(app: FastAPI) -> None:
+    """
+    Warm a worker: database pools, bcrypt and the OpenAPI schema.
+
+    Args:
+        app: Application being started
+    """
+    warm_db_pools()
+    warm_password_hashing()
+    app.openapi()
@@ -0,0 +1,483 @@
+"""Routing of per-user task data across database shards.
+
+Users live in the primary database together with the ``shard_assignments``
+directory. Each user's tasks live on exactly one shard: ``default`` is the
+primary database and further shards are configured through ``SHARD_URLS``.
+Users without a directory entry are on the default shard.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Annotated, Iterator
+
+from fastapi import Depends, HTTPException, Path, status
+from sqlalchemy import Table, create_engine, delete, func, insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import RoutingSession, SessionLocal, get_read_db, get_write_db
+from app.models.archive import ArchivedTask
+from app.models.idempotency import IdempotencyKey
+from app.models.shard import ShardAssignment
+from app.models.stats import TaskDailyStats, UserTaskStats
+from app.models.tag import Tag, task_tags
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.models.user import User
+
+DEFAULT_SHARD = "default"
+
+# Tables holding per-user task data, copied in order when a user is rebalanced
+SHARDED_TABLES: list[Table] = [
+    Task.__table__,
+    ArchivedTask.__table__,
+    IdempotencyKey.__table__,
+    Tag.__table__,
+    task_tags,
+    TaskEvent.__table__,
+    UserTaskStats.__table__,
+    TaskDailyStats.__table__,
+]
+
+# Sequences of the IDs kept when a user moves, with the tables using them
+# (archived tasks keep their task IDs)
+ID_SEQUENCES: dict[str, list[Table]] = {
+    "tasks_id_seq": [Task.__table__, ArchivedTask.__table__],
+    "tags_id_seq": [Tag.__table__],
+    "task_events_id_seq": [TaskEvent.__table__],
+}
+
+shard_engines: dict[str, Engine] = {
+    name: create_engine(
+        url,
+        echo=settings.debug,
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
+    for name, url in settings.shard_urls_map.items()
+}
+
+shard_sessionmakers: dict[str, sessionmaker] = {
+    name: sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False, bind=shard_engine
+    )
+    for name, shard_engine in shard_engines.items()
+}
+
+# user_id -> (shard, moving, cached_at)
+_directory_cache: dict[int, tuple[str, bool, float]] = {}
+_directory_lock = threading.Lock()
+
+
+def sharding_enabled() -> bool:
+    """Return True when at least one extra shard is configured."""
+    return bool(shard_engines)
+
+
+def shard_names() -> list[str]:
+    """Return all shard names, default first."""
+    return [DEFAULT_SHARD, *shard_engines]
+
+
+def get_sessionmaker(shard: str) -> sessionmaker:
+    """
+    Get the session factory for a shard.
+
+    Args:
+        shard: Shard name
+
+    Returns:
+        sessionmaker: Session factory bound to the shard
+
+    Raises:
+        KeyError: If the shard is not configured
+    """
+    if shard == DEFAULT_SHARD:
+        return SessionLocal
+    return shard_sessionmakers[shard]
+
+
+def invalidate_shard_cache(user_id: int) -> None:
+    """Drop a user's cached shard assignment in this process."""
+    with _directory_lock:
+        _directory_cache.pop(user_id, None)
+
+
+def lookup_shard(db: Session, user_id: int) -> tuple[str, bool]:
+    """
+    Look up the shard holding a user's tasks.
+
+    Assignments are cached per process for ``shard_map_cache_seconds``.
+
+    Args:
+        db: Session on the primary database (or a replica of it)
+        user_id: User ID
+
+    Returns:
+        tuple[str, bool]: Shard name and whether the user is being moved
+    """
+    if not sharding_enabled():
+        return DEFAULT_SHARD, False
+
+    now = time.monotonic()
+    with _directory_lock:
+        cached = _directory_cache.get(user_id)
+    if cached and now - cached[2] < settings.shard_map_cache_seconds:
+        return cached[0], cached[1]
+
+    assignment = db.get(ShardAssignment, user_id)
+    shard, moving = (
+        (assignment.shard, assignment.moving) if assignment else (DEFAULT_SHARD, False)
+    )
+    with _directory_lock:
+        _directory_cache[user_id] = (shard, moving, now)
+    return shard, moving
+
+
+def _mirror_user(user: User, shard: str) -> None:
+    """Copy a user row onto a shard so task foreign keys resolve there."""
+    shard_db = get_sessionmaker(shard)()
+    try:
+        if shard_db.get(User, user.id) is None:
+            shard_db.execute(
+                insert(User).values(
+                    id=user.id,
+                    username=user.username,
+                    email=user.email,
+                    hashed_password=user.hashed_password,
+                    created_at=user.created_at,
+                    updated_at=user.updated_at,
+                )
+            )
+            shard_db.commit()
+    finally:
+        shard_db.close()
+
+
+def assign_shard(db: Session, user: User) -> str:
+    """
+    Place a newly registered user on a shard.
+
+    Users are spread across shards by ID. Nothing is recorded when sharding
+    is disabled.
+
+    Args:
+        db: Session on the primary database
+        user: Newly created user
+
+    Returns:
+        str: Name of the assigned shard
+    """
+    if not sharding_enabled():
+        return DEFAULT_SHARD
+
+    names = shard_names()
+    shard = names[user.id % len(names)]
+    if shard != DEFAULT_SHARD:
+        _mirror_user(user, shard)
+    db.add(ShardAssignment(user_id=user.id, shard=shard))
+    db.commit()
+    return shard
+
+
+def shard_session(db: Session, user_id: int) -> Iterator[Session]:
+    """
+    Yield the session for a user's shard, reusing db for the default shard.
+
+    Args:
+        db: Request session on the primary database (or a replica of it)
+        user_id: Owner of the task data
+
+    Yields:
+        Session: Session bound to the user's shard
+
+    Raises:
+        HTTPException: 503 while the user is being moved between shards
+    """
+    shard, moving = lookup_shard(db, user_id)
+    if moving:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Account is being migrated, retry shortly",
+            headers={"Retry-After": str(int(settings.shard_map_cache_seconds))},
+        )
+
+    if shard == DEFAULT_SHARD:
+        yield db
+        return
+
+    shard_db = get_sessionmaker(shard)()
+    try:
+        yield shard_db
+    finally:
+        shard_db.close()
+
+
+def get_shard_db(
+    user_id: Annotated[int, Path()],
+    db: Annotated[Session, Depends(get_write_db)],
+):
+    """
+    Dependency that provides a primary session on the path user's shard.
+
+    Yields:
+        Session: Session bound to the shard holding the user's tasks
+    """
+    yield from shard_session(db, user_id)
+
+
+def get_shard_read_db(
+    user_id: Annotated[int, Path()],
+    db: Annotated[Session, Depends(get_read_db)],
+):
+    """
+    Dependency that provides a read session on the path user's shard.
+
+    Yields:
+        Session: Session bound to the shard holding the user's tasks
+    """
+    yield from shard_session(db, user_id)
+
+
+@contextmanager
+def session_for_user(user_id: int) -> Iterator[Session]:
+    """
+    Open a session on a user's shard outside of a request.
+
+    Args:
+        user_id: User ID
+
+    Yields:
+        Session: Session bound to the user's shard
+    """
+    directory_db = SessionLocal()
+    try:
+        shard, _ = lookup_shard(directory_db, user_id)
+    finally:
+        directory_db.close()
+
+    db = get_sessionmaker(shard)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _sequence_range(db: Session, sequence: str) -> tuple[int, int] | None:
+    """Return the IDs a PostgreSQL sequence has yet to hand out, if known."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    row = db.execute(
+        text(
+            "SELECT coalesce(last_value + increment_by, start_value), max_value "
+            "FROM pg_sequences WHERE sequencename = :sequence"
+        ),
+        {"sequence": sequence},
+    ).first()
+    return (row[0], row[1]) if row else None
+
+
+def check_ids_free(
+    source_db: Session, target_db: Session, user_id: int, batch_size: int = 5000
+) -> None:
+    """
+    Check that a user's IDs can be copied to another shard as they are.
+
+    Every ID must be unused on the target and outside the range its
+    sequence on the target has yet to hand out; otherwise rows would
+    collide now or once the sequence catches up.
+
+    Args:
+        source_db: Session on the user's current shard
+        target_db: Session on the destination shard
+        user_id: User to move
+        batch_size: IDs looked up on the target per query
+
+    Raises:
+        ValueError: If an ID is taken or will be handed out on the target
+    """
+    for sequence, tables in ID_SEQUENCES.items():
+        upcoming = _sequence_range(target_db, sequence)
+        for table in tables:
+            if upcoming is not None:
+                reserved = source_db.scalar(
+                    select(func.count())
+                    .select_from(table)
+                    .where(table.c.user_id == user_id, table.c.id.between(*upcoming))
+                )
+                if reserved:
+                    raise ValueError(
+                        f"{reserved} {table.name} IDs of user {user_id} are in the "
+                        f"range of {sequence} on the target shard; give shards "
+                        "disjoint ID ranges (assign-id-ranges)"
+                    )
+
+            result = source_db.execute(
+                select(table.c.id).where(table.c.user_id == user_id),
+                execution_options={"yield_per": batch_size},
+            )
+            for ids in result.scalars().partitions():
+                taken = target_db.scalar(
+                    select(func.count()).select_from(table).where(table.c.id.in_(ids))
+                )
+                if taken:
+                    raise ValueError(
+                        f"{taken} {table.name} IDs of user {user_id} are already "
+                        "used on the target shard"
+                    )
+
+
+def assign_id_ranges(range_size: int) -> list[tuple[str, int, int]]:
+    """
+    Give every shard's ID sequences a disjoint range (PostgreSQL).
+
+    Shard ``n`` in ``shard_names()`` order gets IDs ``n * range_size + 1``
+    to ``(n + 1) * range_size``; a sequence below its range restarts at the
+    start of it. Rerunning with the same size changes nothing.
+
+    Args:
+        range_size: Number of IDs per shard
+
+    Returns:
+        list[tuple[str, int, int]]: Shard name, first and last ID
+
+    Raises:
+        ValueError: If a sequence is already past the end of its range
+    """
+    ranges = []
+    for index, name in enumerate(shard_names()):
+        first, last = index * range_size + 1, (index + 1) * range_size
+        db = get_sessionmaker(name)()
+        try:
+            for sequence in ID_SEQUENCES:
+                used = db.scalar(
+                    text(
+                        "SELECT coalesce(last_value, 0) FROM pg_sequences "
+                        "WHERE sequencename = :sequence"
+                    ),
+                    {"sequence": sequence},
+                )
+                if used > last:
+                    raise ValueError(
+                        f"{sequence} on shard '{name}' is at {used}, past the end "
+                        f"of its range {first}-{last}"
+                    )
+                restart = f" RESTART WITH {first}" if used < first else ""
+                db.execute(
+                    text(
+                        f"ALTER SEQUENCE {sequence} MINVALUE {first} "
+                        f"MAXVALUE {last} START WITH {first}{restart}"
+                    )
+                )
+            db.commit()
+        finally:
+            db.close()
+        ranges.append((name, first, last))
+    return ranges
+
+
+def rebalance_user(
+    user_id: int,
+    target: str,
+    batch_size: int = 5000,
+    wait: bool = True,
+) -> int:
+    """
+    Move a user's task data to another shard.
+
+    The user is first flagged as moving so workers reject their task
+    requests (after at most ``shard_map_cache_seconds``). Rows are then
+    copied in batches keeping their IDs, the directory entry is switched and
+    the rows are removed from the source shard. Shards must therefore hand
+    out IDs from disjoint sequence ranges (``assign_id_ranges``); the move
+    is refused before anything changes if an ID would collide on the target.
+
+    Args:
+        user_id: User to move
+        target: Destination shard name
+        batch_size: Rows copied per batch
+        wait: Wait for cached assignments to expire before copying
+
+    Returns:
+        int: Number of task rows moved
+
+    Raises:
+        KeyError: If the shard or the user is unknown
+        ValueError: If the user's IDs would collide on the target shard
+    """
+    if target not in shard_names():
+        raise KeyError(f"Unknown shard '{target}'")
+
+    directory_db = SessionLocal()
+    try:
+        user = directory_db.get(User, user_id)
+        if user is None:
+            raise KeyError(f"Unknown user {user_id}")
+
+        assignment = directory_db.get(ShardAssignment, user_id)
+        if assignment is None:
+            assignment = ShardAssignment(user_id=user_id, shard=DEFAULT_SHARD)
+            directory_db.add(assignment)
+        source = assignment.shard
+        if source == target:
+            directory_db.commit()
+            return 0
+
+        source_db = get_sessionmaker(source)()
+        target_db = get_sessionmaker(target)()
+        try:
+            check_ids_free(source_db, target_db, user_id, batch_size)
+        finally:
+            source_db.close()
+            target_db.close()
+
+        assignment.moving = True
+        directory_db.commit()
+        invalidate_shard_cache(user_id)
+        if wait:
+            time.sleep(settings.shard_map_cache_seconds)
+
+        if target != DEFAULT_SHARD:
+            _mirror_user(user, target)
+
+        moved = 0
+        source_db = get_sessionmaker(source)()
+        target_db = get_sessionmaker(target)()
+        try:
+            try:
+                for table in SHARDED_TABLES:
+                    result = source_db.execute(
+                        select(table).where(table.c.user_id == user_id),
+                        execution_options={"yield_per": batch_size},
+                    )
+                    for rows in result.mappings().partitions():
+                        target_db.execute(insert(table), [dict(row) for row in rows])
+                        if table is Task.__table__:
+                            moved += len(rows)
+                target_db.commit()
+            except Exception:
+                target_db.rollback()
+                assignment.moving = False
+                directory_db.commit()
+                invalidate_shard_cache(user_id)
+                raise
+
+            assignment.shard = target
+            assignment.moving = False
+            directory_db.commit()
+            invalidate_shard_cache(user_id)
+
+            # Children first so foreign keys between sharded tables hold
+            for table in reversed(SHARDED_TABLES):
+                source_db.execute(delete(table).where(table.c.user_id == user_id))
+            source_db.commit()
+        finally:
+            source_db.close()
+            target_db.close()
+
+        return moved
+    finally:
+        directory_db.close()
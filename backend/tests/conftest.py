@@ -1,13 +1,26 @@
 """Pytest configuration and fixtures."""
 
+import fnmatch
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from app.config import settings
+from app.database import Base, RoutingSession, get_db, get_session_factory
 from app.main import app
+from app.services.cache import MemoryCacheBackend, task_list_cache
+from app.services.coalescing import write_coalescer
+from app.services.history import history_recorder
+from app.services.refresh_tokens import clear_revocation_cache
+from app.services.sharing import clear_membership_cache
+
+# The tests run in one process, so they can exercise the in-process cache
+task_list_cache.backend = MemoryCacheBackend(
+    settings.task_cache_max_bytes, settings.task_cache_ttl_seconds
+)
 
 # Create in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -17,7 +30,39 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
+
+
+class FakeRedis:
+    """The subset of ``redis.Redis`` used by the cache, over a dict."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    def set(self, key: str, value, ex: int | None = None, nx: bool = False) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def incr(self, key: str) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def scan_iter(self, match: str):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    def flushdb(self) -> None:
+        self.data.clear()
 
 
 @pytest.fixture
@@ -41,7 +86,14 @@ def client(db_session):
         finally:
             pass
 
+    task_list_cache.clear()
+    clear_membership_cache()
+    clear_revocation_cache()
+    history_recorder.clear()
+    history_recorder.session_factory = TestingSessionLocal
+    write_coalescer.session_factory = TestingSessionLocal
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -71,5 +123,6 @@ def test_user(client):
     return {
         "user": user,
         "token": token_data["access_token"],
+        "refresh_token": token_data["refresh_token"],
         "password": user_data["password"],
     }
@@ -0,0 +1,109 @@
+"""Tests for task archival."""
+
+from datetime import datetime, timedelta
+
+from app.models.archive import ArchivedTask
+from app.models.task import Task
+from app.services.archive import archive_completed_tasks, restore_archived_task
+from app.services.tags import resolve_tags
+
+
+def _create_tasks(db_session, user_id):
+    """Create an old completed, a recent completed and an open task."""
+    old = datetime.utcnow() - timedelta(days=90)
+    db_session.add_all(
+        [
+            Task(title="Old done", completed=True, user_id=user_id,
+                 created_at=old, updated_at=old, order_key="a"),
+            Task(title="Recent done", completed=True, user_id=user_id,
+                 order_key="b"),
+            Task(title="Open", completed=False, user_id=user_id,
+                 created_at=old, updated_at=old, order_key="c"),
+        ]
+    )
+    db_session.commit()
+
+
+def test_archive_job_moves_old_completed_tasks(db_session, test_user):
+    """Test that only old completed tasks are archived."""
+    _create_tasks(db_session, test_user["user"]["id"])
+
+    archived = archive_completed_tasks(db_session, timedelta(days=30), batch_size=1)
+    assert archived == 1
+    assert db_session.query(Task).count() == 2
+    assert db_session.query(ArchivedTask).one().title == "Old done"
+
+
+def test_list_and_restore_archived_tasks(client, db_session, test_user):
+    """Test listing archived tasks and restoring one."""
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    _create_tasks(db_session, user_id)
+    archive_completed_tasks(db_session, timedelta(days=30))
+
+    response = client.get(f"/api/{user_id}/tasks", headers=headers)
+    assert len(response.json()) == 2
+
+    response = client.get(
+        f"/api/{user_id}/tasks", params={"include_archived": True}, headers=headers
+    )
+    assert [task["archived"] for task in response.json()] == [False, False, True]
+
+    response = client.get(f"/api/{user_id}/archive", headers=headers)
+    assert response.status_code == 200
+    task_id = response.json()[0]["id"]
+
+    response = client.post(f"/api/{user_id}/archive/{task_id}/restore", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Old done"
+    assert response.json()["archived"] is False
+    # Back in its original position
+    assert response.json()["order_key"] == "a"
+    assert db_session.query(ArchivedTask).count() == 0
+
+    response = client.post(f"/api/{user_id}/archive/{task_id}/restore", headers=headers)
+    assert response.status_code == 404
+
+
+def test_archive_job_skips_tasks_with_subtasks(db_session, test_user):
+    """Test that completed parents stay while they still have subtasks."""
+    user_id = test_user["user"]["id"]
+    old = datetime.utcnow() - timedelta(days=90)
+    parent = Task(title="Parent", completed=True, user_id=user_id,
+                  created_at=old, updated_at=old, order_key="a")
+    db_session.add(parent)
+    db_session.commit()
+    db_session.add(
+        Task(title="Child", completed=False, user_id=user_id, parent_id=parent.id,
+             order_key="b")
+    )
+    db_session.commit()
+
+    assert archive_completed_tasks(db_session, timedelta(days=30)) == 0
+    assert db_session.query(Task).count() == 2
+
+
+def test_archive_keeps_task_fields(db_session, test_user):
+    """Test that tags, dates and recurrence survive an archive round trip."""
+    user_id = test_user["user"]["id"]
+    old = datetime.utcnow() - timedelta(days=90)
+    due_at = datetime(2026, 1, 5, 9, 0)
+    task = Task(title="Weekly", completed=True, user_id=user_id, created_at=old,
+                updated_at=old, order_key="m", due_at=due_at,
+                recurrence="FREQ=WEEKLY", recurrence_start=due_at)
+    task.tags = resolve_tags(db_session, user_id, ["home", "work"])
+    db_session.add(task)
+    db_session.commit()
+    task_id = task.id
+
+    assert archive_completed_tasks(db_session, timedelta(days=30)) == 1
+    assert db_session.query(ArchivedTask).one().tags == ["home", "work"]
+    # Another task took the position meanwhile
+    db_session.add(Task(id=task_id + 1, title="New", user_id=user_id, order_key="m"))
+    db_session.commit()
+
+    restored = restore_archived_task(db_session, user_id, task_id)
+    assert [tag.name for tag in restored.tags] == ["home", "work"]
+    assert (restored.due_at, restored.recurrence) == (due_at, "FREQ=WEEKLY")
+    assert restored.recurrence_start == due_at
+    assert restored.order_key > "m"
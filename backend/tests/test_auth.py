@@ -106,3 +106,77 @@ def test_get_current_user_invalid_token(client):
         headers={"Authorization": "Bearer invalid_token"},
     )
     assert response.status_code == 401
+
+
+def test_delete_account(client, test_user, db_session):
+    """Test that deleting the account disables it and removes its data."""
+    from app.models.task import Task
+    from app.models.user import User
+
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    for index in range(3):
+        client.post(f"/api/{user_id}/tasks", json={"title": f"T{index}"}, headers=headers)
+
+    response = client.delete("/api/auth/me", headers=headers)
+    assert response.status_code == 202
+
+    db_session.expire_all()
+    assert db_session.get(User, user_id) is None
+    assert db_session.query(Task).count() == 0
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_refresh_rotates_token(client, test_user, db_session):
+    """A refresh returns a new token pair; only hashes are stored."""
+    from app.models.refresh_token import RefreshToken
+
+    response = client.post(
+        "/api/auth/refresh", json={"refresh_token": test_user["refresh_token"]}
+    )
+    assert response.status_code == 200
+    tokens = response.json()
+    assert tokens["refresh_token"] != test_user["refresh_token"]
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    stored = db_session.query(RefreshToken).order_by(RefreshToken.id).all()
+    assert len(stored) == 2
+    assert len({token.family_id for token in stored}) == 1
+    assert stored[0].used_at is not None
+    assert test_user["refresh_token"] not in {token.token_hash for token in stored}
+
+
+def test_refresh_token_reuse_revokes_family(client, test_user):
+    """Replaying a used refresh token logs out every holder of the family."""
+    old = test_user["refresh_token"]
+    rotated = client.post("/api/auth/refresh", json={"refresh_token": old}).json()
+
+    reused = client.post("/api/auth/refresh", json={"refresh_token": old})
+    assert reused.status_code == 401
+
+    successor = client.post(
+        "/api/auth/refresh", json={"refresh_token": rotated["refresh_token"]}
+    )
+    assert successor.status_code == 401
+    for token in (test_user["token"], rotated["access_token"]):
+        response = client.get(
+            "/api/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+
+
+def test_logout_revokes_tokens(client, test_user):
+    """Logging out invalidates the refresh token and its access tokens."""
+    response = client.post(
+        "/api/auth/logout", json={"refresh_token": test_user["refresh_token"]}
+    )
+    assert response.status_code == 204
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert (
+        client.post(
+            "/api/auth/refresh", json={"refresh_token": test_user["refresh_token"]}
+        ).status_code
+        == 401
+    )
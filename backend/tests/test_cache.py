@@ -0,0 +1,73 @@
+"""Tests for the task list cache backends."""
+
+from app.services.cache import MemoryCacheBackend, RedisCacheBackend, TaskListCache
+from tests.conftest import FakeRedis
+
+
+def test_memory_backend_evicts_least_recently_used():
+    """Test that the memory backend stays within its byte budget."""
+    backend = MemoryCacheBackend(max_bytes=10, ttl_seconds=60)
+    backend.set("a", b"1234")
+    backend.set("b", b"1234")
+    backend.get("a")
+    backend.set("c", b"1234")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1234"
+    assert backend.stats()["bytes"] <= 10
+    assert backend.stats()["evictions"] == 1
+
+
+def test_version_bump_invalidates_entries():
+    """Test that invalidating a user makes their entries unreachable."""
+    cache = TaskListCache(MemoryCacheBackend(max_bytes=1024, ttl_seconds=60))
+    _, version = cache.lookup(1, "p")
+    cache.store(1, "p", version, b"[]")
+    assert cache.lookup(1, "p")[0] == b"[]"
+
+    cache.invalidate(1)
+    assert cache.lookup(1, "p")[0] is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_versions_are_bounded():
+    """Test that dropped versions never make stale entries readable again."""
+    cache = TaskListCache(
+        MemoryCacheBackend(max_bytes=1024, ttl_seconds=60, max_versions=4)
+    )
+    _, version = cache.lookup(1, "p")
+    cache.store(1, "p", version, b"old")
+    cache.invalidate(1)
+    for user_id in range(2, 8):
+        cache.invalidate(user_id)
+
+    assert cache.backend.stats()["versions"] <= 4
+    assert cache.lookup(1, "p")[0] is None
+
+
+def test_redis_versions_are_not_reused_after_a_flush():
+    """Test that a lost version key does not make old entries readable again."""
+    client = FakeRedis()
+    cache = TaskListCache(RedisCacheBackend(client, ttl_seconds=60))
+    _, version = cache.lookup(1, "p")
+    cache.store(1, "p", version, b"old")
+    cache.invalidate(1)
+    stale_entries = {k: v for k, v in client.data.items() if "version" not in k}
+
+    client.flushdb()
+    client.data.update(stale_entries)
+    assert cache.lookup(1, "p")[0] is None
+    cache.invalidate(1)
+    assert cache.lookup(1, "p")[0] is None
+
+
+def test_redis_clear_only_touches_its_namespace():
+    """Test that clearing the cache leaves unrelated keys alone."""
+    client = FakeRedis()
+    client.set("tasks-export:1", b"keep")
+    cache = TaskListCache(RedisCacheBackend(client, ttl_seconds=60))
+    _, version = cache.lookup(1, "p")
+    cache.store(1, "p", version, b"[]")
+
+    cache.clear()
+    assert client.data == {"tasks-export:1": b"keep"}
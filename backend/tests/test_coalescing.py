@@ -0,0 +1,201 @@
+"""Tests for write coalescing of task updates."""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.schemas.task import TaskUpdate
+from app.services import coalescing
+from app.services.coalescing import WriteCoalescer, merge_updates, write_coalescer
+from tests.conftest import TestingSessionLocal, engine
+
+
+def auth(test_user):
+    return {"Authorization": f"Bearer {test_user['token']}"}
+
+
+def create_task(client, test_user, title):
+    return client.post(
+        f"/api/{test_user['user']['id']}/tasks",
+        json={"title": title},
+        headers=auth(test_user),
+    ).json()
+
+
+def test_merge_updates_later_fields_win():
+    """Merged updates keep every field set, the later value winning."""
+    merged = merge_updates(
+        TaskUpdate(title="First", completed=True), TaskUpdate(completed=False)
+    )
+    assert merged.model_fields_set == {"title", "completed"}
+    assert (merged.title, merged.completed) == ("First", False)
+
+
+def test_burst_is_written_with_one_update_and_commit(client, test_user):
+    """Updates to one task within a window become one UPDATE and one commit."""
+    task = create_task(client, test_user, "Toggle")
+    coalescer = WriteCoalescer(TestingSessionLocal, window=60)
+    user_id = test_user["user"]["id"]
+    futures = [
+        coalescer.submit(user_id, task["id"], TaskUpdate(completed=True)),
+        coalescer.submit(user_id, task["id"], TaskUpdate(completed=False)),
+        coalescer.submit(user_id, task["id"], TaskUpdate(title="Renamed")),
+    ]
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert coalescer.flush() == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        coalescer.stop()
+
+    assert statements.count("UPDATE") == 1
+    results = [future.result() for future in futures]
+    assert all(result.title == "Renamed" for result in results)
+    assert not results[0].completed
+    assert results[0].updated_at >= results[0].created_at
+
+
+def test_failed_update_fails_alone(client, test_user):
+    """An update of a missing task does not affect the rest of its batch."""
+    task = create_task(client, test_user, "Kept")
+    coalescer = WriteCoalescer(TestingSessionLocal, window=60)
+    user_id = test_user["user"]["id"]
+    missing = coalescer.submit(user_id, 9999, TaskUpdate(title="Nope"))
+    found = coalescer.submit(user_id, task["id"], TaskUpdate(completed=True))
+    coalescer.flush()
+    coalescer.stop()
+
+    with pytest.raises(HTTPException) as exc_info:
+        missing.result()
+    assert exc_info.value.status_code == 404
+    assert found.result().completed
+
+
+def test_invalid_update_does_not_fail_merged_requests(client, test_user):
+    """An update that is invalid for the task fails without its neighbours."""
+    task = create_task(client, test_user, "Plain")
+    coalescer = WriteCoalescer(TestingSessionLocal, window=60)
+    user_id = test_user["user"]["id"]
+    renamed = coalescer.submit(user_id, task["id"], TaskUpdate(title="Renamed"))
+    recurring = coalescer.submit(
+        user_id, task["id"], TaskUpdate(recurrence="FREQ=DAILY")
+    )
+    coalescer.flush()
+    coalescer.stop()
+
+    with pytest.raises(HTTPException) as exc_info:
+        recurring.result()
+    assert exc_info.value.status_code == 422
+    assert renamed.result().title == "Renamed"
+    assert renamed.result().recurrence is None
+
+
+def test_database_error_fails_only_its_task(client, test_user, monkeypatch):
+    """A task the database rejects fails alone; the rest of the batch commits."""
+    failing = create_task(client, test_user, "Failing")
+    other = create_task(client, test_user, "Other")
+    apply_task_update = coalescing.apply_task_update
+
+    def apply_or_raise(db, user_id, task, task_data, actor_id):
+        if task.id == failing["id"]:
+            raise IntegrityError("UPDATE tasks", {}, Exception("constraint"))
+        apply_task_update(db, user_id, task, task_data, actor_id)
+
+    monkeypatch.setattr(coalescing, "apply_task_update", apply_or_raise)
+    coalescer = WriteCoalescer(TestingSessionLocal, window=60)
+    user_id = test_user["user"]["id"]
+    failed = coalescer.submit(user_id, failing["id"], TaskUpdate(title="Lost"))
+    written = coalescer.submit(user_id, other["id"], TaskUpdate(title="Kept"))
+    coalescer.flush()
+    coalescer.stop()
+
+    with pytest.raises(IntegrityError):
+        failed.result()
+    assert written.result().title == "Kept"
+    tasks = client.get(f"/api/{user_id}/tasks", headers=auth(test_user)).json()
+    assert sorted(task["title"] for task in tasks) == ["Failing", "Kept"]
+
+
+def test_put_is_coalesced_when_enabled(client, test_user, monkeypatch):
+    """PUT goes through the coalescer when a window is configured."""
+    task = create_task(client, test_user, "Task")
+    monkeypatch.setattr(write_coalescer, "window", 0.01)
+    try:
+        response = client.put(
+            f"/api/{test_user['user']['id']}/tasks/{task['id']}",
+            json={"completed": True},
+            headers=auth(test_user),
+        )
+    finally:
+        write_coalescer.stop()
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+    tasks = client.get(
+        f"/api/{test_user['user']['id']}/tasks", headers=auth(test_user)
+    ).json()
+    assert tasks[0]["completed"] is True
+
+
+def test_coalesced_put_with_bounded_pool(client, tmp_path, monkeypatch):
+    """Waiting requests do not hold the connections the writer needs."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import QueuePool
+
+    from app.database import Base, RoutingSession, get_db
+    from app.main import app
+
+    bounded = create_engine(
+        f"sqlite:///{tmp_path / 'bounded.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=2,
+    )
+    Base.metadata.create_all(bind=bounded)
+    BoundedSession = sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False, bind=bounded
+    )
+
+    def bounded_get_db():
+        db = BoundedSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, bounded_get_db)
+    monkeypatch.setattr(write_coalescer, "session_factory", BoundedSession)
+    monkeypatch.setattr(write_coalescer, "window", 0.01)
+
+    credentials = {"username": "pooled", "password": "testpassword123"}
+    client.post(
+        "/api/auth/register", json={**credentials, "email": "pooled@example.com"}
+    )
+    login = client.post("/api/auth/login", json=credentials).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    user_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    task = client.post(
+        f"/api/{user_id}/tasks", json={"title": "Pooled"}, headers=headers
+    ).json()
+
+    try:
+        response = client.put(
+            f"/api/{user_id}/tasks/{task['id']}",
+            json={"completed": True},
+            headers=headers,
+        )
+    finally:
+        write_coalescer.stop()
+        bounded.dispose()
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
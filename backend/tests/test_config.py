@@ -0,0 +1,31 @@
+"""Tests for settings parsing."""
+
+import pytest
+from pydantic import ValidationError
+
+from app import server
+from app.config import Settings, settings
+
+
+def test_empty_web_concurrency_is_unset():
+    """An empty WEB_CONCURRENCY, as in .env.example, means the default."""
+    assert Settings(_env_file=None, web_concurrency="").web_concurrency is None
+    assert Settings(_env_file=None, web_concurrency="3").web_concurrency == 3
+
+
+def test_memory_cache_refused_with_several_workers():
+    """The per-process task cache cannot be invalidated across workers."""
+    with pytest.raises(ValidationError, match="memory://"):
+        Settings(_env_file=None, task_cache_url="memory://", web_concurrency=4)
+    assert Settings(_env_file=None, task_cache_url="memory://", web_concurrency=1)
+    assert Settings(_env_file=None, task_cache_url="", web_concurrency=4)
+
+
+def test_server_refuses_memory_cache_with_several_workers(monkeypatch):
+    """The launcher checks the CPU-derived worker count too."""
+    monkeypatch.setattr(settings, "task_cache_url", "memory://")
+    monkeypatch.setattr(server, "worker_count", lambda: 4)
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: None)
+
+    with pytest.raises(SystemExit, match="memory://"):
+        server.main()
@@ -0,0 +1,79 @@
+"""Tests for database session routing."""
+
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import app.database as database
+from app.database import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, Base
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Configure an empty in-memory read replica."""
+    replica_engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(database, "replica_engines", [replica_engine])
+    yield replica_engine
+    replica_engine.dispose()
+
+
+def test_reads_go_to_replica(replica, client, test_user):
+    """Test that list reads are served by the replica."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    client.post(url, json={"title": "Primary only"}, headers=headers)
+    client.cookies.clear()
+
+    # The replica has not received the task yet
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_read_your_writes(replica, client, test_user):
+    """Test that a client reads from the primary right after writing."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    create_response = client.post(url, json={"title": "Fresh"}, headers=headers)
+    assert LAST_WRITE_COOKIE in create_response.cookies
+
+    client.cookies.set(LAST_WRITE_COOKIE, f"{time.time():.3f}")
+    response = client.get(url, headers=headers)
+    assert [task["title"] for task in response.json()] == ["Fresh"]
+
+
+def test_read_your_writes_cross_site(replica, client, test_user):
+    """Test that a cross-site client without the cookie echoes the header."""
+    headers = {
+        "Authorization": f"Bearer {test_user['token']}",
+        "Origin": "http://localhost:3000",
+    }
+    url = f"/api/{test_user['user']['id']}/tasks"
+    create_response = client.post(url, json={"title": "Fresh"}, headers=headers)
+    last_write = create_response.headers[LAST_WRITE_HEADER]
+    exposed = create_response.headers["access-control-expose-headers"]
+    assert LAST_WRITE_HEADER.lower() in exposed.lower()
+    # Browsers drop the SameSite=Lax cookie on cross-site requests
+    client.cookies.clear()
+
+    response = client.get(url, headers={**headers, LAST_WRITE_HEADER: last_write})
+    assert [task["title"] for task in response.json()] == ["Fresh"]
+
+
+def test_cross_site_cookie(replica, client, test_user, monkeypatch):
+    """Test that the cookie can be sent cross-site when configured."""
+    monkeypatch.setattr(database.settings, "read_your_writes_cross_site", True)
+    response = client.post(
+        f"/api/{test_user['user']['id']}/tasks",
+        json={"title": "Fresh"},
+        headers={"Authorization": f"Bearer {test_user['token']}"},
+    )
+    cookie = response.headers["set-cookie"]
+    assert "SameSite=none" in cookie and "Secure" in cookie
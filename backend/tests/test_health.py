@@ -0,0 +1,62 @@
+"""Tests for health and readiness endpoints."""
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+import app.main as main
+from app.services.readiness import DEGRADED, READY, UNAVAILABLE, ReadinessProbe
+from tests.conftest import engine as test_engine
+
+
+def test_health_check(client):
+    """Test the liveness endpoint."""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
+
+
+def test_ready_when_database_reachable(client, monkeypatch):
+    """Test that /ready reports ready for a reachable database."""
+    probe = ReadinessProbe({"primary": test_engine}, 60, wait_threshold_ms=1000)
+    monkeypatch.setattr(main, "readiness_probe", probe)
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == READY
+
+
+def test_ready_unavailable_database(client, monkeypatch):
+    """Test that /ready returns 503 when a database cannot be reached."""
+    broken = create_engine("sqlite:////nonexistent/dir/db.sqlite")
+    probe = ReadinessProbe({"primary": broken}, 60, wait_threshold_ms=1000)
+    monkeypatch.setattr(main, "readiness_probe", probe)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["primary"]["status"] == UNAVAILABLE
+
+
+def test_ready_degraded_when_pool_exhausted():
+    """Test that an exhausted pool reports degraded and results are cached."""
+    pooled = create_engine(
+        "sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    probe = ReadinessProbe(
+        {"primary": pooled}, 60, wait_threshold_ms=1000, max_overflow=0
+    )
+
+    with pooled.connect():
+        result = probe.check()
+    assert result["checks"]["primary"]["headroom"] == 0
+    assert result["status"] == DEGRADED
+    assert probe.check() is result
+
+
+def test_ready_returns_previous_result_during_check():
+    """Test that probes do not queue behind a check in progress."""
+    probe = ReadinessProbe({"primary": test_engine}, 0, wait_threshold_ms=1000)
+    first = probe.check()
+
+    with probe._check_lock:
+        assert probe.check() is first
+    assert probe.check() is not first
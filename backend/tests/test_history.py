@@ -0,0 +1,116 @@
+"""Tests for task activity history."""
+
+from app.models.task_event import TaskEvent
+from app.services.history import CREATED, HistoryRecorder, history_recorder, stage_event
+from tests.conftest import TestingSessionLocal
+
+
+def auth(test_user):
+    return {"Authorization": f"Bearer {test_user['token']}"}
+
+
+def test_history_of_task_writes(client, test_user):
+    """Creates, updates and deletes are recorded with field diffs."""
+    user_id = test_user["user"]["id"]
+    task = client.post(
+        f"/api/{user_id}/tasks",
+        json={"title": "Draft", "tags": ["work"]},
+        headers=auth(test_user),
+    ).json()
+    client.put(
+        f"/api/{user_id}/tasks/{task['id']}",
+        json={"title": "Final", "description": None, "tags": ["work", "urgent"]},
+        headers=auth(test_user),
+    )
+    client.delete(f"/api/{user_id}/tasks/{task['id']}", headers=auth(test_user))
+
+    # Nothing is written on the request path
+    assert history_recorder.pending == 3
+    assert history_recorder.drain() == 3
+
+    response = client.get(
+        f"/api/{user_id}/tasks/{task['id']}/history", headers=auth(test_user)
+    )
+    assert response.status_code == 200
+    events = response.json()
+    assert [event["action"] for event in events] == ["deleted", "updated", "created"]
+    assert events[1]["changes"] == {
+        "title": ["Draft", "Final"],
+        "tags": [["work"], ["urgent", "work"]],
+    }
+    assert events[2]["changes"]["title"] == [None, "Draft"]
+    assert events[2]["actor_id"] == user_id
+
+
+def test_history_pagination(client, test_user):
+    """History pages are keyed by event ID, newest first."""
+    user_id = test_user["user"]["id"]
+    task = client.post(
+        f"/api/{user_id}/tasks", json={"title": "Task 0"}, headers=auth(test_user)
+    ).json()
+    for number in range(1, 4):
+        client.put(
+            f"/api/{user_id}/tasks/{task['id']}",
+            json={"title": f"Task {number}"},
+            headers=auth(test_user),
+        )
+    history_recorder.drain()
+
+    url = f"/api/{user_id}/tasks/{task['id']}/history"
+    first = client.get(url, params={"limit": 2}, headers=auth(test_user)).json()
+    second = client.get(
+        url, params={"limit": 2, "before_id": first[-1]["id"]}, headers=auth(test_user)
+    ).json()
+    titles = [event["changes"]["title"][1] for event in first + second]
+    assert titles == ["Task 3", "Task 2", "Task 1", "Task 0"]
+
+
+def test_rolled_back_events_are_discarded(db_session):
+    """Events staged in a transaction that rolls back are never recorded."""
+    history_recorder.clear()
+    db_session.query(TaskEvent).count()
+    stage_event(db_session, 1, 1, CREATED, {})
+    db_session.rollback()
+    db_session.commit()
+    assert history_recorder.pending == 0
+
+
+def test_full_queue_drops_events():
+    """Recording never blocks longer than the enqueue timeout."""
+    recorder = HistoryRecorder(TestingSessionLocal, max_events=1, enqueue_timeout=0)
+    assert recorder.record(1, 1, CREATED, {})
+    assert not recorder.record(1, 2, CREATED, {})
+    assert recorder.dropped == 1
+
+
+def test_unwritten_events_are_spooled(db_session, tmp_path):
+    """Events that cannot be written on shutdown are written by the next run."""
+
+    def unavailable():
+        raise ConnectionError("database unavailable")
+
+    recorder = HistoryRecorder(unavailable, spool_dir=str(tmp_path))
+    recorder.record(1, 7, CREATED, {"title": [None, "Spooled"]})
+    recorder.stop()
+    assert len(list(tmp_path.glob("*.jsonl"))) == 1
+
+    restarted = HistoryRecorder(TestingSessionLocal, spool_dir=str(tmp_path))
+    restarted.start()
+    restarted.stop()
+    assert list(tmp_path.iterdir()) == []
+    event = db_session.query(TaskEvent).one()
+    assert (event.task_id, event.changes) == (7, {"title": [None, "Spooled"]})
+
+
+def test_rejected_event_is_dead_lettered(db_session):
+    """An event the database rejects does not hold back the others."""
+    recorder = HistoryRecorder(TestingSessionLocal)
+    recorder.record(1, 1, CREATED, {"title": [None, "First"]})
+    recorder.record(1, 2, CREATED, {"title": [None, object()]})
+    recorder.record(1, 3, CREATED, {"title": [None, "Third"]})
+
+    assert recorder.flush() == 2
+    assert recorder.pending == 0
+    assert recorder.dead_lettered == 1
+    task_ids = {event.task_id for event in db_session.query(TaskEvent)}
+    assert task_ids == {1, 3}
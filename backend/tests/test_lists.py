@@ -0,0 +1,221 @@
+"""Tests for shared task lists."""
+
+import pytest
+from sqlalchemy import event
+
+from app.models.task_list import ListMember
+from app.services.cache import task_list_cache
+from app.services.sharing import EDITOR, OWNER, VIEWER, Membership
+from tests.conftest import engine
+
+
+def auth(user):
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+@pytest.fixture
+def other_user(client):
+    """Create a second user and return user data with token."""
+    user_data = {
+        "username": "otheruser",
+        "email": "other@example.com",
+        "password": "otherpassword123",
+    }
+    user = client.post("/api/auth/register", json=user_data).json()
+    token = client.post(
+        "/api/auth/login",
+        json={"username": user_data["username"], "password": user_data["password"]},
+    ).json()["access_token"]
+    return {"user": user, "token": token}
+
+
+@pytest.fixture
+def shared_list(client, test_user, other_user):
+    """Create a list owned by test_user with other_user as a viewer."""
+    response = client.post("/api/lists", json={"name": "Team"}, headers=auth(test_user))
+    assert response.status_code == 201
+    list_id = response.json()["id"]
+    response = client.put(
+        f"/api/lists/{list_id}/members",
+        json={"username": "otheruser", "role": "viewer"},
+        headers=auth(test_user),
+    )
+    assert response.status_code == 204
+    return list_id
+
+
+def test_membership_roles():
+    """Roles grant everything below them."""
+    editor = Membership(1, 1, "Team", EDITOR)
+    assert editor.allows(VIEWER) and editor.allows(EDITOR)
+    assert not editor.allows(OWNER)
+
+
+def test_list_visible_to_members_only(client, test_user, other_user, shared_list):
+    """Members see the list with their role; others get a 404."""
+    response = client.get("/api/lists", headers=auth(other_user))
+    assert response.json() == [
+        {
+            "id": shared_list,
+            "owner_id": test_user["user"]["id"],
+            "name": "Team",
+            "role": "viewer",
+        }
+    ]
+    assert client.get("/api/lists", headers=auth(test_user)).json()[0]["role"] == (
+        "owner"
+    )
+
+    client.delete(
+        f"/api/lists/{shared_list}/members/{other_user['user']['id']}",
+        headers=auth(test_user),
+    )
+    response = client.get(f"/api/lists/{shared_list}/tasks", headers=auth(other_user))
+    assert response.status_code == 404
+
+
+def test_viewer_reads_editor_writes(client, test_user, other_user, shared_list):
+    """Viewers can list the tasks; editing requires the editor role."""
+    created = client.post(
+        f"/api/lists/{shared_list}/tasks",
+        json={"title": "Shared"},
+        headers=auth(test_user),
+    ).json()
+    assert created["user_id"] == test_user["user"]["id"]
+    assert created["list_id"] == shared_list
+
+    response = client.get(f"/api/lists/{shared_list}/tasks", headers=auth(other_user))
+    assert [task["title"] for task in response.json()] == ["Shared"]
+    response = client.post(
+        f"/api/lists/{shared_list}/tasks",
+        json={"title": "Denied"},
+        headers=auth(other_user),
+    )
+    assert response.status_code == 403
+
+    client.put(
+        f"/api/lists/{shared_list}/members",
+        json={"username": "otheruser", "role": "editor"},
+        headers=auth(test_user),
+    )
+    response = client.put(
+        f"/api/lists/{shared_list}/tasks/{created['id']}",
+        json={"completed": True},
+        headers=auth(other_user),
+    )
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+    # The owner's own task list sees the member's change
+    tasks = client.get(
+        f"/api/{test_user['user']['id']}/tasks", headers=auth(test_user)
+    ).json()
+    assert tasks[0]["completed"] is True
+
+
+def test_list_tasks_exclude_other_tasks(client, test_user, other_user, shared_list):
+    """Only tasks of the list are shared."""
+    client.post(
+        f"/api/{test_user['user']['id']}/tasks",
+        json={"title": "Private"},
+        headers=auth(test_user),
+    )
+    client.post(
+        f"/api/lists/{shared_list}/tasks",
+        json={"title": "Shared"},
+        headers=auth(test_user),
+    )
+    response = client.get(f"/api/lists/{shared_list}/tasks", headers=auth(other_user))
+    assert [task["title"] for task in response.json()] == ["Shared"]
+
+
+def test_access_check_uses_cached_memberships(client, other_user, shared_list):
+    """Once memberships are cached, checks do not query the database."""
+    client.get(f"/api/lists/{shared_list}/tasks", headers=auth(other_user))
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(
+            f"/api/lists/{shared_list}/tasks", headers=auth(other_user)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert not any("list_members" in statement for statement in statements)
+
+
+def test_removed_member_loses_access_everywhere(
+    client, db_session, other_user, shared_list
+):
+    """A membership removed by another worker is not served from this one's cache."""
+    url = f"/api/lists/{shared_list}/tasks"
+    assert client.get(url, headers=auth(other_user)).status_code == 200
+
+    # What remove_member does in another worker: this one's map stays cached
+    user_id = other_user["user"]["id"]
+    db_session.delete(db_session.get(ListMember, (shared_list, user_id)))
+    db_session.commit()
+    task_list_cache.backend.bump_version(f"memberships:{user_id}")
+
+    assert client.get(url, headers=auth(other_user)).status_code == 404
+
+
+def test_delete_list_keeps_tasks(client, test_user, other_user, shared_list):
+    """Deleting a list unshares its tasks without deleting them."""
+    client.post(
+        f"/api/lists/{shared_list}/tasks",
+        json={"title": "Shared"},
+        headers=auth(test_user),
+    )
+    response = client.delete(f"/api/lists/{shared_list}", headers=auth(other_user))
+    assert response.status_code == 403
+
+    response = client.delete(f"/api/lists/{shared_list}", headers=auth(test_user))
+    assert response.status_code == 204
+    assert client.get("/api/lists", headers=auth(other_user)).json() == []
+    tasks = client.get(
+        f"/api/{test_user['user']['id']}/tasks", headers=auth(test_user)
+    ).json()
+    assert [(task["title"], task["list_id"]) for task in tasks] == [("Shared", None)]
+
+
+def test_editor_cannot_delete_unshared_subtasks(
+    client, test_user, other_user, shared_list
+):
+    """A member deleting a shared task must not take the owner's private subtasks."""
+    client.put(
+        f"/api/lists/{shared_list}/members",
+        json={"username": "otheruser", "role": "editor"},
+        headers=auth(test_user),
+    )
+    parent = client.post(
+        f"/api/lists/{shared_list}/tasks",
+        json={"title": "Shared"},
+        headers=auth(test_user),
+    ).json()
+    tasks_url = f"/api/{test_user['user']['id']}/tasks"
+    client.post(
+        tasks_url,
+        json={"title": "Private", "parent_id": parent["id"]},
+        headers=auth(test_user),
+    )
+
+    response = client.delete(
+        f"/api/lists/{shared_list}/tasks/{parent['id']}", headers=auth(other_user)
+    )
+    assert response.status_code == 409
+    tasks = client.get(tasks_url, headers=auth(test_user)).json()
+    assert sorted(task["title"] for task in tasks) == ["Private", "Shared"]
+
+    # The owner may delete their own subtree
+    response = client.delete(
+        f"/api/lists/{shared_list}/tasks/{parent['id']}", headers=auth(test_user)
+    )
+    assert response.status_code == 204
+    assert client.get(tasks_url, headers=auth(test_user)).json() == []
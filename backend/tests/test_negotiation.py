@@ -0,0 +1,122 @@
+"""Tests for MessagePack and CBOR content negotiation."""
+
+from datetime import datetime, timezone
+
+import cbor2
+import fastapi.routing
+import msgpack
+
+import app.database as database
+from app.database import LAST_WRITE_HEADER
+from app.negotiation import CBOR, JSON, MSGPACK, benchmark_formats, negotiate
+from tests.conftest import engine
+
+
+def auth(test_user, **headers):
+    return {"Authorization": f"Bearer {test_user['token']}", **headers}
+
+
+def test_negotiate_accept_header():
+    """The highest-quality supported format wins; JSON is the fallback."""
+    assert negotiate(None) == JSON
+    assert negotiate("text/html") == JSON
+    assert negotiate("application/x-msgpack") == MSGPACK
+    assert negotiate("application/msgpack;q=0.5, application/cbor") == CBOR
+    assert negotiate("application/cbor;q=0.2, */*;q=0.8") == JSON
+
+
+def test_task_routes_speak_msgpack(client, test_user):
+    """MessagePack bodies are accepted and returned with native timestamps."""
+    user_id = test_user["user"]["id"]
+    headers = auth(test_user, accept=MSGPACK, **{"content-type": MSGPACK})
+    due_at = datetime(2030, 5, 1, 9, 30, tzinfo=timezone.utc)
+
+    response = client.post(
+        f"/api/{user_id}/tasks",
+        content=msgpack.packb(
+            {"title": "Packed", "due_at": due_at}, datetime=True
+        ),
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert response.headers["content-type"] == MSGPACK
+    created = msgpack.unpackb(response.content, timestamp=3)
+    assert created["title"] == "Packed"
+    assert "Accept" in response.headers["vary"].split(", ")
+    assert created["due_at"] == due_at
+    assert isinstance(created["created_at"], datetime)
+
+    listed = client.get(f"/api/{user_id}/tasks", headers=headers)
+    assert listed.headers["content-type"] == MSGPACK
+    assert [task["id"] for task in msgpack.unpackb(listed.content)] == [
+        created["id"]
+    ]
+    # The JSON representation is cached separately
+    as_json = client.get(f"/api/{user_id}/tasks", headers=auth(test_user))
+    assert as_json.json()[0]["due_at"] == "2030-05-01T09:30:00"
+    assert "Accept" in as_json.headers["vary"].split(", ")
+
+
+def test_binary_response_is_serialized_once(client, test_user, monkeypatch):
+    """A binary response is encoded from the return value, not from JSON."""
+    serialize_response = fastapi.routing.serialize_response
+    json_serializations = []
+
+    async def counting_serialize_response(**kwargs):
+        json_serializations.append(kwargs)
+        return await serialize_response(**kwargs)
+
+    monkeypatch.setattr(
+        fastapi.routing, "serialize_response", counting_serialize_response
+    )
+    # With a replica configured, writes send X-Last-Write-At
+    monkeypatch.setattr(database, "replica_engines", [engine])
+    user_id = test_user["user"]["id"]
+    response = client.post(
+        f"/api/{user_id}/tasks",
+        json={"title": "Packed"},
+        headers=auth(test_user, accept=MSGPACK),
+    )
+    assert response.status_code == 201
+    assert msgpack.unpackb(response.content)["title"] == "Packed"
+    assert json_serializations == []
+
+    # Headers set by dependencies are kept
+    assert LAST_WRITE_HEADER in response.headers
+
+    client.post(
+        f"/api/{user_id}/tasks", json={"title": "Plain"}, headers=auth(test_user)
+    )
+    assert len(json_serializations) == 1
+
+
+def test_cbor_responses_and_json_errors(client, test_user):
+    """CBOR is negotiated for the auth ``me`` endpoint; errors stay JSON."""
+    response = client.get("/api/auth/me", headers=auth(test_user, accept=CBOR))
+    assert response.headers["content-type"] == CBOR
+    assert cbor2.loads(response.content)["username"] == test_user["user"]["username"]
+
+    user_id = test_user["user"]["id"]
+    missing = client.get(
+        f"/api/{user_id}/tasks/999", headers=auth(test_user, accept=CBOR)
+    )
+    assert missing.status_code == 404
+    assert missing.json() == {"detail": "Task not found"}
+
+
+def test_invalid_binary_body_is_rejected(client, test_user):
+    """A body that does not decode is a validation error."""
+    user_id = test_user["user"]["id"]
+    response = client.post(
+        f"/api/{user_id}/tasks",
+        content=b"\xc1",
+        headers=auth(test_user, **{"content-type": MSGPACK}),
+    )
+    assert response.status_code == 422
+
+
+def test_benchmark_formats():
+    """Binary formats are smaller than JSON for task lists."""
+    rows = {row["format"]: row for row in benchmark_formats(50, repeat=1)}
+    assert rows[MSGPACK]["bytes"] < rows[JSON]["bytes"]
+    assert rows[CBOR]["bytes"] < rows[JSON]["bytes"]
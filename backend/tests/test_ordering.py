@@ -0,0 +1,69 @@
+"""Tests for fractional order keys."""
+
+import random
+
+import pytest
+
+from app.services.ordering import (
+    FIRST_KEY,
+    key_after,
+    key_before,
+    key_between,
+    spaced_keys,
+)
+
+
+def test_key_between_sorts_between_bounds():
+    """Test that generated keys sort strictly between their bounds."""
+    assert "a" < key_between("a", "b") < "b"
+    assert "a" < key_between("a", "a1") < "a1"
+    assert "zz" < key_between("zz", None)
+    assert key_between(None, "01") < "01"
+    assert key_between(None, None) == "i"
+
+
+def test_key_between_rejects_invalid_bounds():
+    """Test that unordered bounds and keys ending in 0 are rejected."""
+    with pytest.raises(ValueError):
+        key_between("b", "a")
+    with pytest.raises(ValueError):
+        key_between("a", "a")
+    with pytest.raises(ValueError):
+        key_between("a0", None)
+
+
+def test_repeated_inserts_keep_order():
+    """Test random insertions into a list keep keys ordered and valid."""
+    rng = random.Random(7)
+    keys = [FIRST_KEY]
+    for _ in range(500):
+        position = rng.randrange(len(keys) + 1)
+        lower = keys[position - 1] if position > 0 else None
+        upper = keys[position] if position < len(keys) else None
+        if upper is None:
+            key = key_after(lower)
+        elif lower is None:
+            key = key_before(upper)
+        else:
+            key = key_between(lower, upper)
+        keys.insert(position, key)
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert not any(key.endswith("0") for key in keys)
+
+
+def test_appends_keep_key_length():
+    """Test that appending does not grow keys."""
+    key = FIRST_KEY
+    for _ in range(1000):
+        key = key_after(key)
+    assert len(key) == len(FIRST_KEY)
+
+
+def test_spaced_keys():
+    """Test that rebalanced keys are short, ordered and unique."""
+    keys = spaced_keys(5000)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 5000
+    assert len({len(key) for key in keys}) == 1
@@ -0,0 +1,78 @@
+"""Tests for on-demand request profiling."""
+
+import json
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.profiling import RequestProfile, current_profile
+from tests.conftest import engine
+
+
+def _enable_profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_token", "secret-token")
+    monkeypatch.setattr(settings, "profiling_output_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_interval_ms", 1.0)
+
+
+def test_profile_with_token(client, test_user, monkeypatch, tmp_path):
+    """Test that a request with the profiling token writes a speedscope file."""
+    _enable_profiling(monkeypatch, tmp_path)
+
+    response = client.get(
+        f"/api/{test_user['user']['id']}/tasks",
+        headers={
+            "Authorization": f"Bearer {test_user['token']}",
+            "X-Profile-Token": "secret-token",
+        },
+    )
+    assert response.status_code == 200
+    profile_file = tmp_path / response.headers["X-Profile-File"]
+    profile = json.loads(profile_file.read_text())
+
+    sampled, evented = profile["profiles"]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    assert evented["type"] == "evented"
+    sql_frames = [
+        profile["shared"]["frames"][event["frame"]]["name"]
+        for event in evented["events"]
+    ]
+    assert any("tasks.user_id" in name for name in sql_frames)
+
+
+def test_no_profile_without_token(client, test_user, monkeypatch, tmp_path):
+    """Test that requests with a missing or wrong token are not profiled."""
+    _enable_profiling(monkeypatch, tmp_path)
+
+    for headers in ({}, {"X-Profile-Token": "wrong"}):
+        response = client.get(
+            f"/api/{test_user['user']['id']}/tasks",
+            headers={"Authorization": f"Bearer {test_user['token']}", **headers},
+        )
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_statement_does_not_skew_timings():
+    """Test that a statement that raises leaves no start time behind."""
+    profile = RequestProfile("test", interval_ms=1.0)
+    token = current_profile.set(profile)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+            assert not connection.info["query_started"]
+            time.sleep(0.05)
+            before = time.perf_counter()
+            connection.execute(text("SELECT 1"))
+    finally:
+        current_profile.reset(token)
+
+    started, _, statement = profile.sql[-1]
+    assert statement == "SELECT 1"
+    assert started >= before
@@ -0,0 +1,117 @@
+"""Tests for recurring tasks."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.recurrence import expand, next_occurrence, parse_rule
+
+
+def test_parse_rule():
+    """Test parsing supported rules and rejecting unsupported ones."""
+    rule = parse_rule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TH,MO")
+    assert (rule.freq, rule.interval, rule.byday) == ("WEEKLY", 2, (0, 3))
+    assert parse_rule("FREQ=DAILY;UNTIL=20261231").until == datetime(2026, 12, 31)
+
+    for invalid in ("FREQ=HOURLY", "FREQ=DAILY;BYDAY=MO", "FREQ=DAILY;BYHOUR=9"):
+        with pytest.raises(ValueError):
+            parse_rule(invalid)
+
+
+def test_expand_rules():
+    """Test expanding daily, weekly, monthly and counted series."""
+    start = datetime(2026, 1, 31, 9, 0)
+
+    assert expand("FREQ=DAILY;INTERVAL=2", start, datetime(2026, 2, 4).date()) == (
+        datetime(2026, 1, 31, 9),
+        datetime(2026, 2, 2, 9),
+        datetime(2026, 2, 4, 9),
+    )
+    # Months without a 31st are skipped
+    monthly = expand("FREQ=MONTHLY;COUNT=3", start, datetime(2027, 1, 1).date())
+    assert [occurrence.month for occurrence in monthly] == [1, 3, 5]
+
+    monday = datetime(2026, 10, 19, 8)
+    weekly = expand("FREQ=WEEKLY;BYDAY=MO,FR", monday, datetime(2026, 10, 27).date())
+    assert [occurrence.day for occurrence in weekly] == [19, 23, 26]
+
+    second = start + timedelta(days=1)
+    assert next_occurrence("FREQ=DAILY;COUNT=2", start, start) == second
+    assert next_occurrence("FREQ=DAILY;COUNT=2", start, second) is None
+
+
+def test_completing_occurrence_materializes_next(client, test_user):
+    """Test that completing an occurrence creates only the next one."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    due = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+
+    response = client.post(
+        url,
+        json={
+            "title": "Water plants",
+            "due_at": due.isoformat(),
+            "remind_at": (due - timedelta(hours=1)).isoformat(),
+            "recurrence": "FREQ=DAILY",
+            "tags": ["home"],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    first = response.json()
+    client.post(url, json={"title": "Other"}, headers=headers)
+
+    response = client.put(
+        f"{url}/{first['id']}", json={"completed": True}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["recurrence"] is None
+
+    tasks = client.get(url, headers=headers).json()
+    titles = [task["title"] for task in tasks]
+    assert titles == ["Water plants", "Water plants", "Other"]
+    second = tasks[1]
+    assert second["completed"] is False
+    assert second["recurrence"] == "FREQ=DAILY"
+    assert second["tags"] == ["home"]
+    assert second["due_at"] == (due + timedelta(days=1)).isoformat()
+    assert second["remind_at"] == (due + timedelta(days=1, hours=-1)).isoformat()
+
+    # Completing again does not materialize another occurrence
+    client.put(f"{url}/{first['id']}", json={"completed": True}, headers=headers)
+    assert len(client.get(url, headers=headers).json()) == 3
+
+
+def test_list_upcoming_occurrences(client, test_user):
+    """Test that upcoming occurrences are listed without being stored."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    due = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+    client.post(
+        url,
+        json={
+            "title": "Standup",
+            "due_at": due.isoformat(),
+            "recurrence": "FREQ=DAILY",
+        },
+        headers=headers,
+    )
+
+    until = due + timedelta(days=3)
+    tasks = client.get(
+        url, params={"occurrences_until": until.isoformat()}, headers=headers
+    ).json()
+    assert [task["virtual"] for task in tasks] == [False, True, True, True]
+    assert tasks[-1]["due_at"] == until.isoformat()
+    assert len(client.get(url, headers=headers).json()) == 1
+
+    too_far = datetime.utcnow() + timedelta(days=1000)
+    response = client.get(
+        url, params={"occurrences_until": too_far.isoformat()}, headers=headers
+    )
+    assert response.status_code == 422
+
+    response = client.post(
+        url, json={"title": "No anchor", "recurrence": "FREQ=DAILY"}, headers=headers
+    )
+    assert response.status_code == 422
@@ -0,0 +1,149 @@
+"""Tests for due dates and the reminder dispatcher."""
+
+from datetime import datetime, timedelta
+
+from app.models.task import Task
+from app.routers import tasks as tasks_router
+from app.services import reminders
+from app.services.cache import RedisCacheBackend, TaskListCache
+from app.services.reminders import MemoryReminderSink, ReminderDispatcher
+from tests.conftest import FakeRedis, TestingSessionLocal
+
+
+def _add_reminder(db_session, user_id, title, remind_at):
+    task = Task(title=title, user_id=user_id, order_key="i", remind_at=remind_at)
+    db_session.add(task)
+    db_session.commit()
+    return task.id
+
+
+def test_reminders_fire_once_across_dispatchers(db_session, test_user):
+    """Test that due reminders are delivered once even with two workers."""
+    user_id = test_user["user"]["id"]
+    now = datetime.utcnow()
+    _add_reminder(db_session, user_id, "Soon", now + timedelta(seconds=30))
+    _add_reminder(db_session, user_id, "Later", now + timedelta(hours=2))
+
+    sinks = [MemoryReminderSink(), MemoryReminderSink()]
+    dispatchers = [ReminderDispatcher(TestingSessionLocal, sink) for sink in sinks]
+
+    assert [dispatcher.tick(now) for dispatcher in dispatchers] == [0, 0]
+    assert [dispatcher.pending for dispatcher in dispatchers] == [1, 0]
+
+    later = now + timedelta(seconds=31)
+    assert sum(dispatcher.tick(later) for dispatcher in dispatchers) == 1
+    assert [reminder.title for reminder in sinks[0].delivered] == ["Soon"]
+    assert sinks[1].delivered == []
+    assert sum(dispatcher.tick(later) for dispatcher in dispatchers) == 0
+
+
+def test_rescheduled_reminder_is_not_fired_early(client, db_session, test_user):
+    """Test that a claimed reminder moved to a later time is dropped."""
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    now = datetime.utcnow()
+    task_id = _add_reminder(db_session, user_id, "Moved", now + timedelta(seconds=10))
+
+    sink = MemoryReminderSink()
+    dispatcher = ReminderDispatcher(TestingSessionLocal, sink)
+    dispatcher.tick(now)
+    assert dispatcher.pending == 1
+
+    new_time = now + timedelta(minutes=30)
+    response = client.put(
+        f"/api/{user_id}/tasks/{task_id}",
+        json={"remind_at": new_time.isoformat()},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    assert dispatcher.tick(now + timedelta(seconds=11)) == 0
+    assert dispatcher.tick(new_time) == 1
+    assert sink.delivered[0].remind_at == new_time
+
+
+def test_failed_delivery_is_retried_after_lease(db_session, test_user):
+    """Test that a reminder whose delivery failed is claimed again later."""
+
+    class FailingSink:
+        def deliver(self, reminder):
+            raise RuntimeError("push service down")
+
+    user_id = test_user["user"]["id"]
+    now = datetime.utcnow()
+    _add_reminder(db_session, user_id, "Retry", now)
+
+    lease = timedelta(minutes=5)
+    failing = ReminderDispatcher(TestingSessionLocal, FailingSink(), lease=lease)
+    assert failing.tick(now) == 0
+
+    sink = MemoryReminderSink()
+    dispatcher = ReminderDispatcher(TestingSessionLocal, sink, lease=lease)
+    assert dispatcher.tick(now + timedelta(minutes=1)) == 0
+    assert dispatcher.tick(now + timedelta(minutes=7)) == 1
+
+
+def test_due_dates_in_task_api(client, test_user):
+    """Test setting and clearing due and reminder times through the API."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+
+    response = client.post(
+        url,
+        json={
+            "title": "Pay rent",
+            "due_at": "2026-11-01T09:00:00+01:00",
+            "remind_at": "2026-10-31T18:00:00Z",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    task = response.json()
+    assert task["due_at"] == "2026-11-01T08:00:00"
+    assert task["remind_at"] == "2026-10-31T18:00:00"
+
+    response = client.put(
+        f"{url}/{task['id']}", json={"remind_at": None}, headers=headers
+    )
+    assert response.json()["remind_at"] is None
+    assert response.json()["due_at"] == "2026-11-01T08:00:00"
+
+
+def test_fired_reminder_shows_in_cached_list(client, db_session, test_user):
+    """Test that firing a reminder invalidates the owner's cached lists."""
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    now = datetime.utcnow()
+    _add_reminder(db_session, user_id, "Ping", now + timedelta(seconds=5))
+    url = f"/api/{user_id}/tasks"
+    assert client.get(url, headers=headers).json()[0]["reminded_at"] is None
+
+    dispatcher = ReminderDispatcher(TestingSessionLocal, MemoryReminderSink())
+    dispatcher.tick(now)
+    assert dispatcher.tick(now + timedelta(seconds=6)) == 1
+    assert client.get(url, headers=headers).json()[0]["reminded_at"] is not None
+
+
+def test_out_of_process_dispatcher_invalidates_shared_cache(
+    client, db_session, test_user, monkeypatch
+):
+    """Test that a separate dispatcher invalidates the API's lists via Redis."""
+    redis_client = FakeRedis()
+    api_cache = TaskListCache(RedisCacheBackend(redis_client, ttl_seconds=60))
+    # The dispatcher process has its own cache object on the same Redis
+    dispatcher_cache = TaskListCache(RedisCacheBackend(redis_client, ttl_seconds=60))
+    monkeypatch.setattr(tasks_router, "task_list_cache", api_cache)
+    monkeypatch.setattr(reminders, "task_list_cache", dispatcher_cache)
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    now = datetime.utcnow()
+    _add_reminder(db_session, user_id, "Ping", now + timedelta(seconds=5))
+    url = f"/api/{user_id}/tasks"
+    assert client.get(url, headers=headers).json()[0]["reminded_at"] is None
+    assert client.get(url, headers=headers).json()[0]["reminded_at"] is None
+    assert api_cache.hits == 1
+
+    dispatcher = ReminderDispatcher(TestingSessionLocal, MemoryReminderSink())
+    dispatcher.tick(now)
+    assert dispatcher.tick(now + timedelta(seconds=6)) == 1
+    assert client.get(url, headers=headers).json()[0]["reminded_at"] is not None
@@ -0,0 +1,45 @@
+"""Tests for the synthetic dataset generator."""
+
+import random
+
+from app.models.task import Task
+from app.services.seed import (
+    generate_users,
+    mint_tokens,
+    seed_database,
+    task_distribution,
+)
+
+
+def test_task_distribution_is_skewed_and_deterministic():
+    """Test that the distribution sums to the budget and favours a few users."""
+    counts = task_distribution(random.Random(7), 100, 10_000, skew=1.2)
+    assert sum(counts) == 10_000
+    assert counts == task_distribution(random.Random(7), 100, 10_000, skew=1.2)
+
+    top_five = sum(sorted(counts, reverse=True)[:5])
+    assert top_five > 10_000 * 0.3
+
+
+def test_seed_database(db_session):
+    """Test seeding users and tasks into the database."""
+    users = seed_database(db_session, users=20, tasks=500, seed=3, batch_size=64)
+    assert len(users) == 20
+    assert db_session.query(Task).count() == 500
+    assert [user.username for user in users] == [
+        row["username"] for row in generate_users(3, 20, "hash")
+    ]
+
+
+def test_minted_tokens_authenticate(client, db_session):
+    """Test that minted tokens can be replayed against the API."""
+    users = seed_database(db_session, users=3, tasks=30, seed=1)
+    user_id, _, token = mint_tokens(users, expires_minutes=5)[0]
+
+    response = client.get(
+        f"/api/{user_id}/tasks",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    expected = db_session.query(Task).filter(Task.user_id == user_id).count()
+    assert len(response.json()) == expected
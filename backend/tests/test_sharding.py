@@ -0,0 +1,83 @@
+"""Tests for shard routing."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.sharding as sharding
+from app.database import Base, RoutingSession
+from app.models.shard import ShardAssignment
+from app.models.task import Task
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def shard(monkeypatch):
+    """Configure a second in-memory shard named "eu"."""
+    shard_engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=shard_engine)
+    monkeypatch.setattr(sharding, "shard_engines", {"eu": shard_engine})
+    monkeypatch.setattr(
+        sharding,
+        "shard_sessionmakers",
+        {"eu": sessionmaker(class_=RoutingSession, bind=shard_engine)},
+    )
+    monkeypatch.setattr(sharding, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(sharding, "_directory_cache", {})
+    yield "eu"
+    shard_engine.dispose()
+
+
+def test_tasks_follow_rebalanced_user(client, test_user, db_session, shard):
+    """Test that a rebalanced user's tasks are served from the new shard."""
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    client.post(f"/api/{user_id}/tasks", json={"title": "Portable"}, headers=headers)
+    db_session.commit()
+
+    moved = sharding.rebalance_user(user_id, shard, wait=False)
+    assert moved == 1
+    db_session.expire_all()
+    assert db_session.query(Task).count() == 0
+    assert db_session.get(ShardAssignment, user_id).shard == shard
+
+    response = client.get(f"/api/{user_id}/tasks", headers=headers)
+    assert [task["title"] for task in response.json()] == ["Portable"]
+
+
+def test_moving_user_is_rejected(client, test_user, db_session, shard):
+    """Test that requests for a user being moved get 503."""
+    user_id = test_user["user"]["id"]
+    db_session.merge(ShardAssignment(user_id=user_id, shard="default", moving=True))
+    db_session.commit()
+
+    response = client.get(
+        f"/api/{user_id}/tasks",
+        headers={"Authorization": f"Bearer {test_user['token']}"},
+    )
+    assert response.status_code == 503
+
+
+def test_rebalance_refuses_colliding_ids(client, test_user, db_session, shard):
+    """Test that a move fails before anything changes if an ID is taken."""
+    user_id = test_user["user"]["id"]
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    task = client.post(
+        f"/api/{user_id}/tasks", json={"title": "Clash"}, headers=headers
+    ).json()
+    target_db = sharding.get_sessionmaker(shard)()
+    target_db.add(Task(id=task["id"], title="Other", user_id=user_id + 1, order_key="a"))
+    target_db.commit()
+    target_db.close()
+
+    with pytest.raises(ValueError, match="already used"):
+        sharding.rebalance_user(user_id, shard, wait=False)
+    db_session.expire_all()
+    assert db_session.query(Task).count() == 1
+    assignment = db_session.get(ShardAssignment, user_id)
+    assert assignment is None or not assignment.moving
@@ -0,0 +1,106 @@
+"""Tests for the incrementally maintained task statistics."""
+
+from datetime import date, datetime
+
+from app.models.archive import ArchivedTask
+from app.models.stats import TaskDailyStats, UserTaskStats
+from app.services.stats import reconcile_stats
+
+
+def auth(test_user):
+    return {"Authorization": f"Bearer {test_user['token']}"}
+
+
+def get_stats(client, test_user, **params):
+    user_id = test_user["user"]["id"]
+    response = client.get(
+        f"/api/{user_id}/tasks/stats", params=params, headers=auth(test_user)
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_counters_follow_task_writes(client, test_user, db_session):
+    """Task writes of every kind keep the counters up to date."""
+    user_id = test_user["user"]["id"]
+    url = f"/api/{user_id}/tasks"
+    ids = [
+        client.post(url, json={"title": f"T{n}"}, headers=auth(test_user)).json()["id"]
+        for n in range(3)
+    ]
+    child = client.post(
+        url, json={"title": "Child", "parent_id": ids[1]}, headers=auth(test_user)
+    ).json()
+
+    client.put(f"{url}/{ids[0]}", json={"completed": True}, headers=auth(test_user))
+    client.post(f"{url}/{ids[1]}/complete", headers=auth(test_user))
+    today = datetime.utcnow().date().isoformat()
+    stats = get_stats(client, test_user, days=2)
+    assert (stats["total"], stats["completed"], stats["open"]) == (4, 3, 1)
+    assert stats["daily"][-1] == {"day": today, "completed": 3}
+    assert len(stats["daily"]) == 2
+
+    # Reopening and deleting take completions back
+    client.put(f"{url}/{ids[0]}", json={"completed": False}, headers=auth(test_user))
+    client.delete(f"{url}/{ids[1]}", headers=auth(test_user))
+    stats = get_stats(client, test_user, days=1)
+    assert (stats["total"], stats["completed"], stats["open"]) == (2, 0, 2)
+    assert stats["daily"] == [{"day": today, "completed": 0}]
+    deleted = client.get(f"{url}/{child['id']}", headers=auth(test_user))
+    assert deleted.status_code == 404
+
+    # The counters agree with the tables
+    assert reconcile_stats(db_session) == 0
+
+
+def test_reconcile_repairs_drift(client, test_user, db_session):
+    """Reconciliation recomputes counters, counting archived tasks."""
+    user_id = test_user["user"]["id"]
+    client.post(
+        f"/api/{user_id}/tasks", json={"title": "Live"}, headers=auth(test_user)
+    )
+    completed_at = datetime(2026, 3, 14, 12, 0)
+    db_session.add(
+        ArchivedTask(
+            id=999,
+            user_id=user_id,
+            title="Archived",
+            created_at=completed_at,
+            updated_at=completed_at,
+            completed_at=completed_at,
+        )
+    )
+    db_session.add(TaskDailyStats(user_id=user_id, day=date(2026, 1, 1), completed=5))
+    db_session.commit()
+
+    assert reconcile_stats(db_session) == 1
+    stats = db_session.get(UserTaskStats, user_id)
+    assert (stats.total, stats.completed) == (2, 1)
+    daily = {
+        row.day: row.completed
+        for row in db_session.query(TaskDailyStats).filter_by(user_id=user_id)
+    }
+    assert daily[date(2026, 3, 14)] == 1
+    assert daily[date(2026, 1, 1)] == 0
+    assert reconcile_stats(db_session) == 0
+
+
+def test_concurrent_completion_counts_once(client, test_user, db_session):
+    """A completion applied to a stale copy of the task is not counted again."""
+    from app.models.task import Task
+    from app.schemas.task import TaskUpdate
+    from app.services.task_updates import apply_task_update
+
+    user_id = test_user["user"]["id"]
+    url = f"/api/{user_id}/tasks"
+    created = client.post(url, json={"title": "Once"}, headers=auth(test_user))
+    task_id = created.json()["id"]
+    stale = db_session.get(Task, (task_id, user_id))
+    assert not stale.completed
+
+    client.put(f"{url}/{task_id}", json={"completed": True}, headers=auth(test_user))
+    apply_task_update(db_session, user_id, stale, TaskUpdate(completed=True))
+    db_session.commit()
+
+    assert get_stats(client, test_user)["completed"] == 1
+    assert reconcile_stats(db_session) == 0
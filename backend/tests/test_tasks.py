@@ -131,3 +131,268 @@ def test_forbidden_access_other_user_tasks(client, test_user):
         headers={"Authorization": f"Bearer {test_user['token']}"},
     )
     assert response.status_code == 403
+
+
+def test_create_task_idempotency_key(client, test_user):
+    """Test that retrying a create with the same Idempotency-Key replays it."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {
+        "Authorization": f"Bearer {test_user['token']}",
+        "Idempotency-Key": "create-1",
+    }
+    first = client.post(url, json={"title": "Once"}, headers=headers)
+    retry = client.post(url, json={"title": "Once"}, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    tasks = client.get(url, headers={"Authorization": f"Bearer {test_user['token']}"})
+    assert len(tasks.json()) == 1
+
+    mismatch = client.post(url, json={"title": "Other"}, headers=headers)
+    assert mismatch.status_code == 422
+
+
+def test_delete_task_idempotency_key(client, test_user):
+    """Test that retrying a delete with the same Idempotency-Key returns 204."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    auth = {"Authorization": f"Bearer {test_user['token']}"}
+    task_id = client.post(url, json={"title": "Doomed"}, headers=auth).json()["id"]
+
+    headers = {**auth, "Idempotency-Key": "delete-1"}
+    assert client.delete(f"{url}/{task_id}", headers=headers).status_code == 204
+    assert client.delete(f"{url}/{task_id}", headers=headers).status_code == 204
+
+
+def test_task_list_cache_invalidated_by_writes(client, test_user):
+    """Test that list responses are cached and invalidated by writes."""
+    from app.services.cache import task_list_cache
+
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    client.post(url, json={"title": "First"}, headers=headers)
+
+    assert len(client.get(url, headers=headers).json()) == 1
+    assert len(client.get(url, headers=headers).json()) == 1
+    assert task_list_cache.stats()["hits"] == 1
+
+    client.post(url, json={"title": "Second"}, headers=headers)
+    assert len(client.get(url, headers=headers).json()) == 2
+
+
+def test_move_task(client, test_user):
+    """Test reordering tasks with the move endpoint."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    a, b, c = (
+        client.post(url, json={"title": title}, headers=headers).json()["id"]
+        for title in ("A", "B", "C")
+    )
+
+    response = client.post(f"{url}/{c}/move", json={"after_id": a}, headers=headers)
+    assert response.status_code == 200
+    titles = [task["title"] for task in client.get(url, headers=headers).json()]
+    assert titles == ["A", "C", "B"]
+
+    client.post(f"{url}/{a}/move", json={"after_id": b}, headers=headers)
+    client.post(f"{url}/{b}/move", json={"before_id": c}, headers=headers)
+    titles = [task["title"] for task in client.get(url, headers=headers).json()]
+    assert titles == ["B", "C", "A"]
+
+    response = client.post(
+        f"{url}/{a}/move", json={"after_id": c, "before_id": b}, headers=headers
+    )
+    assert response.status_code == 422
+    response = client.post(f"{url}/{a}/move", json={}, headers=headers)
+    assert response.status_code == 422
+    response = client.post(f"{url}/{a}/move", json={"after_id": 999}, headers=headers)
+    assert response.status_code == 404
+
+
+def test_move_between_tasks_sharing_a_key(client, db_session, test_user):
+    """Test that moving between tasks with equal keys rebalances the list."""
+    from app.models.task import Task
+
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    a, b, c = (
+        client.post(url, json={"title": title}, headers=headers).json()["id"]
+        for title in ("A", "B", "C")
+    )
+    # Simulate two concurrent creates that read the same last key
+    db_session.query(Task).filter(Task.id == b).update({"order_key": "i0000001"})
+    db_session.commit()
+
+    response = client.post(f"{url}/{c}/move", json={"after_id": a}, headers=headers)
+    assert response.status_code == 200
+    tasks = client.get(url, headers=headers).json()
+    assert [task["title"] for task in tasks] == ["A", "C", "B"]
+    assert len({task["order_key"] for task in tasks}) == 3
+
+
+def test_subtasks(client, test_user):
+    """Test subtree fetch, cascading completion and subtree deletion."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+
+    def create(title, parent_id=None):
+        response = client.post(
+            url, json={"title": title, "parent_id": parent_id}, headers=headers
+        )
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    root = create("Root")
+    child = create("Child", root)
+    grandchild = create("Grandchild", child)
+    other = create("Other")
+
+    response = client.get(f"{url}/{root}/subtree", headers=headers)
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [root, child, grandchild]
+    assert response.json()[2]["parent_id"] == child
+
+    response = client.post(f"{url}/{child}/complete", headers=headers)
+    assert response.status_code == 200
+    assert [task["completed"] for task in response.json()] == [True, True]
+    assert client.get(f"{url}/{root}", headers=headers).json()["completed"] is False
+
+    assert client.delete(f"{url}/{child}", headers=headers).status_code == 204
+    remaining = [task["id"] for task in client.get(url, headers=headers).json()]
+    assert remaining == [root, other]
+
+    assert client.get(f"{url}/999/subtree", headers=headers).status_code == 404
+    response = client.post(
+        url, json={"title": "Orphan", "parent_id": 999}, headers=headers
+    )
+    assert response.status_code == 404
+
+
+def test_move_subtree(client, test_user):
+    """Test moving a subtree under another parent and rejecting cycles."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    root = client.post(url, json={"title": "Root"}, headers=headers).json()["id"]
+    child = client.post(
+        url, json={"title": "Child", "parent_id": root}, headers=headers
+    ).json()["id"]
+    other = client.post(url, json={"title": "Other"}, headers=headers).json()["id"]
+
+    response = client.put(
+        f"{url}/{root}/parent", json={"parent_id": other}, headers=headers
+    )
+    assert response.status_code == 200
+    subtree = client.get(f"{url}/{other}/subtree", headers=headers).json()
+    assert [task["id"] for task in subtree] == [other, root, child]
+
+    response = client.put(
+        f"{url}/{other}/parent", json={"parent_id": child}, headers=headers
+    )
+    assert response.status_code == 422
+
+    response = client.put(
+        f"{url}/{root}/parent", json={"parent_id": None}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["parent_id"] is None
+
+
+def test_task_tags(client, test_user):
+    """Test creating, replacing and filtering tasks by tags."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+
+    response = client.post(
+        url, json={"title": "Report", "tags": ["#Work", "urgent"]}, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["tags"] == ["urgent", "work"]
+    report = response.json()["id"]
+    client.post(url, json={"title": "Slides", "tags": ["work"]}, headers=headers)
+    client.post(url, json={"title": "Groceries", "tags": ["home"]}, headers=headers)
+
+    def titles(**params):
+        response = client.get(url, params=params, headers=headers)
+        return [task["title"] for task in response.json()]
+
+    assert titles(tag="work") == ["Report", "Slides"]
+    assert titles(tag=["urgent", "home"]) == ["Report", "Groceries"]
+    assert titles(tag=["work", "urgent"], match="all") == ["Report"]
+
+    response = client.put(f"{url}/{report}", json={"tags": ["home"]}, headers=headers)
+    assert response.json()["tags"] == ["home"]
+    assert titles(tag="urgent") == []
+    assert titles(tag="home") == ["Report", "Groceries"]
+
+    tags = client.get(f"/api/{test_user['user']['id']}/tags", headers=headers).json()
+    assert tags == [
+        {"name": "home", "task_count": 2},
+        {"name": "urgent", "task_count": 0},
+        {"name": "work", "task_count": 1},
+    ]
+
+
+def test_task_list_loads_tags_in_one_query(client, test_user):
+    """Test that listing tasks does not lazy-load tags per task."""
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    for index in range(5):
+        client.post(
+            url, json={"title": f"T{index}", "tags": ["a", "b"]}, headers=headers
+        )
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        tasks = client.get(url, headers=headers).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert all(task["tags"] == ["a", "b"] for task in tasks)
+    assert len([s for s in statements if "JOIN task_tags" in s]) == 1
+
+
+def test_batch_fetch(client, test_user):
+    """Test fetching tasks by ID in request order, reporting missing IDs."""
+    url = f"/api/{test_user['user']['id']}/tasks"
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    ids = [
+        client.post(url, json={"title": f"T{index}"}, headers=headers).json()["id"]
+        for index in range(3)
+    ]
+    requested = [ids[2], 999, ids[0], ids[2]]
+
+    response = client.get(
+        f"{url}/batch",
+        params={"ids": ",".join(map(str, requested))},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["id"] for task in data["tasks"]] == [ids[2], ids[0]]
+    assert data["missing"] == [999]
+
+    posted = client.post(f"{url}/batch", json={"ids": requested}, headers=headers)
+    assert posted.json() == data
+
+    invalid = client.get(f"{url}/batch", params={"ids": "1,x"}, headers=headers)
+    assert invalid.status_code == 422
+    too_many = client.post(
+        f"{url}/batch", json={"ids": list(range(1, 102))}, headers=headers
+    )
+    assert too_many.status_code == 422
+    out_of_range = client.get(
+        f"{url}/batch", params={"ids": f"1,{2**31}"}, headers=headers
+    )
+    assert out_of_range.status_code == 422
+    assert out_of_range.json()["detail"][0]["loc"] == ["query", "ids", 1]
+    zero = client.post(f"{url}/batch", json={"ids": [0]}, headers=headers)
+    assert zero.status_code == 422
@@ -15,8 +15,13 @@ import {
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+// Time of this client's last write; echoed back so reads right after a write
+// are served by the primary database (the cookie is not sent cross-site)
+const LAST_WRITE_HEADER = "X-Last-Write-At";
+
 class ApiClient {
   private client: AxiosInstance;
+  private lastWriteAt: string | null = null;
 
   constructor() {
     this.client = axios.create({
@@ -35,12 +40,21 @@ class ApiClient {
           config.headers.Authorization = `Bearer ${token}`;
         }
       }
+      if (this.lastWriteAt) {
+        config.headers[LAST_WRITE_HEADER] = this.lastWriteAt;
+      }
       return config;
     });
 
-    // Handle 401 errors (token expired)
+    // Remember the last write time and handle 401 errors (token expired)
     this.client.interceptors.response.use(
-      (response) => response,
+      (response) => {
+        const lastWriteAt = response.headers[LAST_WRITE_HEADER.toLowerCase()];
+        if (lastWriteAt) {
+          this.lastWriteAt = lastWriteAt;
+        }
+        return response;
+      },
       (error) => {
         if (error.response?.status === 401) {
           if (typeof window !== "undefined") {